@@ -0,0 +1,163 @@
+"""
+Synthetic job corpus
+Deterministic LinkedIn-like jobs for benchmarks: realistic title / company /
+location mixes, long-tailed description lengths (median ~2.5k chars, up to
+~12k) in English, Dutch or mixed, and a share of analyzed, applied and
+duplicate postings.
+"""
+
+import json
+import math
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database.enhanced_database import JobDatabase
+from database.migrations import compute_job_hash
+from database.normalization import backfill as normalize_jobs
+
+TITLES = [
+    'Python Developer', 'Backend Engineer', 'Junior Software Engineer', 'Data Engineer', 'Full Stack Developer',
+    'Django Developer', 'Graduate Software Engineer', 'Machine Learning Engineer', 'DevOps Engineer',
+    'Medior Python Developer', 'Senior Backend Developer', 'Data Scientist', 'AI Engineer', 'Platform Engineer',
+    'Software Developer', 'Frontend Developer', 'Cloud Engineer', 'Site Reliability Engineer', 'QA Engineer',
+    'Embedded Software Engineer',
+]
+SENIORITY = ['', '', '', 'Junior ', 'Medior ', 'Senior ', 'Lead ']
+COMPANIES = [
+    'Adyen', 'Booking.com', 'Picnic', 'Mollie', 'bunq', 'Bol', 'Elastic', 'Catawiki', 'Miro', 'Backbase',
+    'MessageBird', 'Mews', 'Takeaway.com', 'TomTom', 'Exact', 'Rabobank', 'ING', 'ABN AMRO', 'Philips', 'ASML',
+    'Randstad', 'Nationale-Nederlanden', 'KPN', 'Coolblue', 'Ahold Delhaize', 'NS', 'Schiphol', 'Shell',
+]
+CITIES = [
+    ('Amsterdam', 'North Holland'), ('Rotterdam', 'South Holland'), ('The Hague', 'South Holland'),
+    ('Utrecht', 'Utrecht'), ('Eindhoven', 'North Brabant'), ('Groningen', 'Groningen'), ('Enschede', 'Overijssel'),
+    ('Nijmegen', 'Gelderland'), ('Breda', 'North Brabant'), ('Delft', 'South Holland'),
+]
+
+EN_PARAGRAPHS = [
+    "About the role\nWe are looking for a {title} to join our platform team. You will design, build and run "
+    "the services behind our core product, working closely with product managers and data scientists.",
+    "Responsibilities\n- Build and maintain backend services in Python (Django, FastAPI)\n- Design REST APIs "
+    "and event-driven integrations\n- Write automated tests and take part in code reviews\n- Own services in "
+    "production: monitoring, on-call and incident follow-up",
+    "Requirements\n- Bachelor's degree in Computer Science or a related field is required\n- {years}+ years of "
+    "experience with Python\n- Experience with PostgreSQL, Docker and Kubernetes\n- Familiarity with AWS or GCP",
+    "Qualifications\n- Master's degree is a plus\n- Strong communication skills in English\n- Experience with "
+    "machine learning pipelines, PyTorch or TensorFlow is a bonus",
+    "What we offer\n- Salary between EUR {low},000 and {high},000 per month\n- Hybrid working: three days at "
+    "the office in {city}\n- Learning budget and 27 vacation days\n- Visa sponsorship for international talent",
+    "About us\n{company} is a fast-growing technology company with offices across Europe. Our engineering "
+    "culture values ownership, small teams and continuous delivery.",
+]
+NL_PARAGRAPHS = [
+    "Over de functie\nWij zijn op zoek naar een {title} voor het team in {city}. Je bent verantwoordelijk "
+    "voor de ontwikkeling van het platform en werkt samen met de product owner aan de backend van de applicatie.",
+    "Wat vragen wij\n- Een afgeronde HBO of WO opleiding in de informatica\n- Minimaal {years} jaar ervaring "
+    "met Python en Django\n- Kennis van PostgreSQL en Docker is een pre\n- Het is van belang dat je goed "
+    "communiceert in het Nederlands en het Engels",
+    "Wat bieden wij\n- Een salaris van EUR {low}.000 tot {high}.000 per maand\n- Een leuk team met veel ruimte "
+    "voor eigen initiatief\n- Een goede pensioenregeling en een reiskostenvergoeding voor het OV",
+    "Over {company}\n{company} is een snelgroeiend bedrijf met kantoren in heel Nederland. Bij ons krijg je de "
+    "ruimte om te leren en te groeien in een team van ervaren ontwikkelaars.",
+]
+
+
+def _description(rng, job):
+    """Description of about lognormal(median 2500) chars built from the paragraph pools"""
+    target = min(12000, max(300, int(rng.lognormvariate(math.log(2500), 0.6))))
+    language = rng.choices(['english', 'dutch', 'mixed'], weights=[75, 15, 10])[0]
+    pool = {'english': EN_PARAGRAPHS, 'dutch': NL_PARAGRAPHS, 'mixed': EN_PARAGRAPHS + NL_PARAGRAPHS}[language]
+    values = {'title': job['title'], 'company': job['company'], 'city': job['city'],
+              'years': rng.randint(1, 8), 'low': rng.randint(3, 5), 'high': rng.randint(6, 9)}
+    parts, length = [], 0
+    while length < target:
+        paragraph = rng.choice(pool).format(**values)
+        parts.append(paragraph)
+        length += len(paragraph) + 2
+    return '\n\n'.join(parts)[:target]
+
+
+def generate_jobs(n, seed=0, duplicate_rate=0.03, analyzed_rate=0.4, applied_rate=0.05, first_posting_id=4000000000):
+    """Yield n job dicts, each shaped like a scraped job plus benchmark-only extras
+
+    first_posting_id: LinkedIn posting id of the first job; ids count up from it
+    duplicate_rate: share of jobs reposting an earlier title + company + location
+    analyzed_rate / applied_rate: share carrying an ai_score / applied status
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    recent = []
+    for i in range(n):
+        if recent and rng.random() < duplicate_rate:
+            title, company, city, region = rng.choice(recent)
+        else:
+            title = rng.choice(SENIORITY) + rng.choice(TITLES)
+            company = rng.choice(COMPANIES) if rng.random() < 0.7 else f'Company {rng.randint(1, max(10, n // 20))}'
+            city, region = rng.choice(CITIES)
+            recent.append((title, company, city, region))
+            recent = recent[-1000:]
+        posting_id = first_posting_id + i
+        job = {
+            'title': title,
+            'company': company,
+            'city': city,
+            'location': f'{city}, {region}, Netherlands',
+            'url': f'https://nl.linkedin.com/jobs/view/{posting_id}?position={i % 25 + 1}&trk=public_jobs',
+            'job_id': str(posting_id),
+            'source': 'linkedin',
+            'scraped_at': (start + timedelta(minutes=i * 5)).isoformat(),
+        }
+        job['description'] = _description(rng, job)
+        job['ai_score'] = rng.randint(20, 98) if rng.random() < analyzed_rate else None
+        job['status'] = 'applied' if job['ai_score'] is not None and rng.random() < applied_rate else 'new'
+        yield job
+
+
+def build_database(db_path, n, seed=0, batch_size=5000):
+    """Create a migrated jobs database holding n synthetic jobs; returns its path
+
+    Rows are bulk-inserted (bypassing add_job's per-row dedup) so million-row
+    corpora build in minutes; FTS and every index are maintained as usual, and
+    city / company ids are filled in afterwards.
+    """
+    JobDatabase(db_path).close()
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA synchronous = OFF')
+    batch = []
+
+    def flush():
+        conn.executemany('''
+            INSERT INTO jobs (job_id, title, company, location, url, job_hash, description, source,
+                              scraped_at, ai_score, ai_strengths, ai_concerns, analyzed_at, status, applied_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        conn.commit()
+        batch.clear()
+
+    for job in generate_jobs(n, seed):
+        analyzed = job['ai_score'] is not None
+        batch.append((
+            job['job_id'], job['title'], job['company'], job['location'],
+            f"https://www.linkedin.com/jobs/view/{job['job_id']}",
+            compute_job_hash(job['title'], job['company'], job['location']),
+            job['description'], job['source'], job['scraped_at'], job['ai_score'],
+            json.dumps(['Python experience']) if analyzed else None,
+            json.dumps(['Seniority']) if analyzed else None,
+            job['scraped_at'] if analyzed else None,
+            job['status'],
+            job['scraped_at'] if job['status'] == 'applied' else None,
+        ))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    normalize_jobs(conn)
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+    return db_path
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite
+Times the hot paths of the job pipeline against a synthetic corpus and writes
+the results as JSON, for before/after comparisons:
+
+    python benchmarks/run_benchmarks.py --rows 100000 --output before.json
+    ... change something ...
+    python benchmarks/run_benchmarks.py --rows 100000 --output after.json
+    python benchmarks/run_benchmarks.py compare before.json after.json
+
+Pass --db to keep the generated corpus and reuse it between runs; building a
+million-row corpus takes a while.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.corpus import build_database, generate_jobs
+from database.enhanced_database import JobDatabase
+from database.rows import JOB_CARD_FIELDS
+
+SEARCH_QUERIES = ['python', 'machine learning', 'django developer', 'amsterdam', 'kubernetes', 'ervaring']
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register fn(ctx) -> list of per-operation seconds under name"""
+    def register(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return register
+
+
+def time_each(fn, items):
+    """Seconds taken by fn(item) for each item"""
+    timings = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        'ops': len(ordered),
+        'total_s': round(total, 6),
+        'mean_ms': round(total / len(ordered) * 1000, 4),
+        'p50_ms': round(statistics.median(ordered) * 1000, 4),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        'ops_per_s': round(len(ordered) / total, 2) if total else None,
+    }
+
+
+class Context:
+    """Corpus database and samples shared by the benchmarks"""
+
+    def __init__(self, db_path, rows, seed, sample):
+        self.rows = rows
+        self.sample = sample
+        self.rng = random.Random(seed)
+        self.db = JobDatabase(db_path)
+        self.stored = [dict(row) for row in self.db.conn.execute(
+            'SELECT title, company, location, url, description FROM jobs WHERE id IN '
+            '(SELECT id FROM jobs ORDER BY RANDOM() LIMIT ?)', (sample,)
+        )]
+        # Unseen postings (ids past the corpus); most still repeat a stored title + company
+        self.fresh = list(generate_jobs(sample, seed=seed + 1, first_posting_id=5000000000))
+        self.descriptions = [job['description'] for job in self.stored]
+
+    def close(self):
+        self.db.close()
+
+
+# --- dedup and stats -------------------------------------------------------
+
+@benchmark('dedup.job_exists_advanced.hit')
+def bench_dedup_hit(ctx):
+    return time_each(ctx.db.job_exists_advanced, ctx.stored)
+
+
+@benchmark('dedup.job_exists_advanced.miss')
+def bench_dedup_miss(ctx):
+    unique = [dict(job, title=f"{job['title']} {i}") for i, job in enumerate(ctx.fresh)]
+    return time_each(ctx.db.job_exists_advanced, unique)
+
+
+@benchmark('dedup.near_duplicate_signature')
+def bench_signature(ctx):
+    from database.near_duplicates import HASHER
+    return time_each(lambda text: HASHER.band_keys(HASHER.signature(text)), ctx.descriptions)
+
+
+@benchmark('stats.get_statistics')
+def bench_statistics(ctx):
+    return time_each(lambda _: ctx.db.get_statistics(), range(5))
+
+
+@benchmark('stats.get_analytics')
+def bench_analytics(ctx):
+    return time_each(lambda _: ctx.db.get_analytics(), range(5))
+
+
+@benchmark('stats.get_statistics.cached')
+def bench_statistics_cached(ctx):
+    ctx.db.cached(ctx.db.get_statistics)
+    return time_each(lambda _: ctx.db.cached(ctx.db.get_statistics), range(1000))
+
+
+@benchmark('analysis.get_jobs_for_analysis')
+def bench_jobs_for_analysis(ctx):
+    return time_each(lambda _: len(ctx.db.get_jobs_for_analysis()), range(3))
+
+
+# --- text processing -------------------------------------------------------
+
+def _validated_enricher():
+    from scrapers.validated_enricher import ValidatedEnricher
+    # Only the text methods are timed; they never touch the driver
+    return ValidatedEnricher.__new__(ValidatedEnricher)
+
+
+@benchmark('extract.detect_language')
+def bench_detect_language(ctx):
+    return time_each(_validated_enricher()._detect_language, ctx.descriptions)
+
+
+@benchmark('extract.degree_requirement')
+def bench_degree(ctx):
+    return time_each(_validated_enricher()._extract_degree_requirement, ctx.descriptions)
+
+
+@benchmark('extract.experience_years')
+def bench_experience(ctx):
+    return time_each(_validated_enricher()._extract_experience_years, ctx.descriptions)
+
+
+@benchmark('extract.quality_score')
+def bench_quality(ctx):
+    return time_each(_validated_enricher()._calculate_quality_score, ctx.descriptions)
+
+
+@benchmark('extract.requirements')
+def bench_requirements(ctx):
+    # Everything the four accessors above return, in one pass
+    from scrapers.requirement_extractor import extract_requirements
+    return time_each(extract_requirements, ctx.descriptions)
+
+
+@benchmark('analysis.parse_analysis_response')
+def bench_parse_response(ctx):
+    from analyzers.analyzer_ai import AIJobAnalyzer
+    from analyzers.llm_client import FakeLLMClient
+
+    analyzer = AIJobAnalyzer(profile_path=str(ROOT / 'config' / 'yigit_profile.json'), client=FakeLLMClient())
+    responses = [FakeLLMClient.respond(f"SCORE: {job['title']} {job['company']} {job['url']}") for job in ctx.stored]
+    return time_each(analyzer._parse_analysis_response, responses)
+
+
+# --- UI query paths --------------------------------------------------------
+
+@benchmark('ui.jobs_page.first')
+def bench_first_page(ctx):
+    return time_each(lambda _: ctx.db.get_jobs_page(limit=25), range(20))
+
+
+@benchmark('ui.jobs_page.deep')
+def bench_deep_pages(ctx):
+    cursor = None
+    timings = []
+    for _ in range(50):
+        start = time.perf_counter()
+        rows, cursor = ctx.db.get_jobs_page(after=cursor, limit=25)
+        timings.append(time.perf_counter() - start)
+        if cursor is None:
+            break
+    return timings
+
+
+@benchmark('ui.jobs_page.min_score')
+def bench_min_score_page(ctx):
+    return time_each(lambda _: ctx.db.get_jobs_page(limit=25, min_score=80, fields=JOB_CARD_FIELDS), range(20))
+
+
+@benchmark('ui.search_jobs')
+def bench_search(ctx):
+    return time_each(ctx.db.search_jobs, SEARCH_QUERIES * 3)
+
+
+@benchmark('ui.jobs_by_score')
+def bench_jobs_by_score(ctx):
+    return time_each(lambda _: ctx.db.get_jobs_by_score(80, fields=('title', 'company', 'ai_score')), range(3))
+
+
+@benchmark('ui.applied_jobs')
+def bench_applied(ctx):
+    return time_each(lambda _: ctx.db.get_applied_jobs(), range(3))
+
+
+@benchmark('ui.map_location_counts')
+def bench_map(ctx):
+    # The aggregate behind ui/netherlands_map.create_job_map
+    return time_each(lambda _: ctx.db.get_city_job_counts(), range(3))
+
+
+# --- email ------------------------------------------------------------------
+
+def _emails(ctx):
+    from utils.mailbox_sources import MailMessage
+    return [
+        MailMessage(f'<{i}@bench>', f"Recruiting <talent@{job['company'].split()[0].lower()}.com>",
+                    f"Interview for {job['title']}", None, f"Thank you for applying to {job['company']}.")
+        for i, job in enumerate(ctx.stored)
+    ]
+
+
+@benchmark('email.matcher_load')
+def bench_matcher_load(ctx):
+    from email_matcher import EmailMatcher
+    return time_each(lambda _: EmailMatcher.load(ctx.db), range(3))
+
+
+@benchmark('email.match_batch.100')
+def bench_email_match(ctx):
+    from email_matcher import EmailMatcher
+    matcher = EmailMatcher.load(ctx.db)
+    emails = _emails(ctx)
+    return time_each(matcher.match_batch, [emails[i:i + 100] for i in range(0, len(emails), 100)])
+
+
+@benchmark('email.classify_batch.1000')
+def bench_email_classify(ctx):
+    from analyzers.email_classifier import default_classifier
+    classifier = default_classifier()
+    emails = _emails(ctx)
+    batches = [emails[i:i + 1000] for i in range(0, len(emails), 1000)]
+    return time_each(lambda batch: classifier.classify([e.subject for e in batch], [e.body for e in batch]), batches)
+
+
+# --- writes (last: they grow the corpus) -----------------------------------
+
+@benchmark('ingest.add_job')
+def bench_add_job(ctx):
+    return time_each(ctx.db.add_job, [dict(job) for job in ctx.fresh])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(rows, db_path=None, seed=0, sample=1000, only=None):
+    """Run the (matching) benchmarks; returns the JSON-ready results"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = db_path or str(Path(tmpdir) / 'bench.db')
+        if not Path(db_path).exists():
+            print(f"🏗  Building {rows:,}-job corpus at {db_path}...")
+            start = time.perf_counter()
+            build_database(db_path, rows, seed)
+            print(f"   built in {time.perf_counter() - start:.1f}s")
+
+        ctx = Context(db_path, rows, seed, sample)
+        results = {}
+        try:
+            for name, fn in BENCHMARKS:
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                results[name] = summarize(fn(ctx))
+                print(f"  {name:40} {results[name]['p50_ms']:>10.3f} ms p50  {results[name]['ops_per_s'] or 0:>12,.1f} ops/s")
+            corpus_rows = ctx.db.conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+        finally:
+            ctx.close()
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'rows': rows,
+            'corpus_rows_after': corpus_rows,
+            'seed': seed,
+            'sample': sample,
+        },
+        'results': results,
+    }
+
+
+def compare(before_path, after_path):
+    """Print p50 latency changes between two result files"""
+    before = json.loads(Path(before_path).read_text())['results']
+    after = json.loads(Path(after_path).read_text())['results']
+    print(f"{'benchmark':40} {'before ms':>12} {'after ms':>12} {'speedup':>9}")
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name]['p50_ms'], after[name]['p50_ms']
+        speedup = f'{old / new:.2f}x' if new else 'n/a'
+        print(f'{name:40} {old:>12.3f} {new:>12.3f} {speedup:>9}')
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        parser = argparse.ArgumentParser(prog='run_benchmarks.py compare')
+        parser.add_argument('before')
+        parser.add_argument('after')
+        args = parser.parse_args(sys.argv[2:])
+        compare(args.before, args.after)
+        return
+
+    parser = argparse.ArgumentParser(description='Benchmark the job pipeline on a synthetic corpus')
+    parser.add_argument('--rows', type=int, default=10000, help='Corpus size (default: 10000)')
+    parser.add_argument('--db', help='Corpus database to reuse, built there if missing')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sample', type=int, default=1000, help='Inputs per per-item benchmark (default: 1000)')
+    parser.add_argument('--only', nargs='+', metavar='PREFIX', help='Run only benchmarks with these name prefixes')
+    parser.add_argument('--output', '-o', help='Write results JSON here (default: stdout)')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.db, args.seed, args.sample, args.only)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+        print(f"📄 Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,17 +11,30 @@ Usage:
     python main.py scrape                   # Scrape only
     python main.py enrich                   # Enrich only
     python main.py analyze                  # Analyze only
+    python main.py extract                  # Store requirements read from descriptions
+    python main.py worker                   # Consume the background task queue
+    python main.py emails --mailbox PATH    # Track employer replies from an mbox, Maildir or IMAP folder
+    python main.py prepare --jobs 12 15     # Company research, apply links and cover letters in one batch
+    python main.py companies --limit 50     # Refresh the research of the companies with the most jobs
+    python main.py full --resume 12         # Resume an interrupted run from its ledger
+
+Every stage accepts --concurrency, --rate, --limit and --since, e.g. from cron:
+    python main.py scrape --since 1d --rate 0.5
+    python main.py scrape --incremental     # Only postings newer than the last scrape
+    python main.py enrich --since 1d --concurrency 2 --limit 50
+    python main.py analyze --since 1d --concurrency 4 --rate 2
 """
 
 import argparse
 import logging
+import os
 import sys
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from run_pipeline import JobPipeline
+from run_pipeline import JobPipeline, parse_since
 
 
 def parse_args():
@@ -32,13 +45,18 @@ def parse_args():
                '  python main.py                           # Full pipeline\n'
                '  python main.py scrape --queries "AI"      # Scrape only\n'
                '  python main.py enrich --limit 10          # Enrich 10 jobs\n'
+               '  python main.py analyze --since 1d -c 4    # Analyze today\'s jobs, 4 at a time\n'
                '  python main.py analyze                    # Analyze all\n'
-               '  python main.py --no-headless              # Show browser\n',
+               '  python main.py extract                    # Re-extract changed descriptions\n'
+               '  python main.py --no-headless              # Show browser\n'
+               '  LINKEDIN_BASE_URL=http://127.0.0.1:8765 python main.py --no-browser  # Offline replay\n'
+               '  python main.py worker --types analyze     # Analysis worker\n'
+               '  python main.py emails --mailbox imaps://imap.gmail.com/INBOX --imap-user me@gmail.com\n',
     )
 
     parser.add_argument(
         'command', nargs='?', default='full',
-        choices=['full', 'scrape', 'enrich', 'analyze'],
+        choices=['full', 'scrape', 'enrich', 'extract', 'analyze', 'worker', 'emails', 'prepare', 'companies'],
         help='Pipeline step to run (default: full)',
     )
     parser.add_argument(
@@ -58,8 +76,54 @@ def parse_args():
         help='Show browser windows instead of running headless',
     )
     parser.add_argument(
-        '--limit', type=int, default=20,
-        help='Max jobs to enrich/analyze per run (default: 20)',
+        '--no-browser', action='store_true',
+        help='Enrich over plain HTTP from public job pages instead of Selenium',
+    )
+    parser.add_argument(
+        '--limit', type=int, default=None,
+        help='Max jobs to enrich/analyze per run (default: 20; extract: all), or per query when scraping',
+    )
+    parser.add_argument(
+        '--concurrency', '-c', type=int, default=None,
+        help='Worker threads per stage, processes for extract, LLM calls for prepare and companies '
+             '(default: 1; extract: one per CPU; prepare, companies: 8)',
+    )
+    parser.add_argument(
+        '--rate', type=float, default=None,
+        help='Max requests per second per stage (default: unlimited)',
+    )
+    parser.add_argument(
+        '--since',
+        help='Only postings/jobs from this window: 12h, 3d, 2w, day, week, month',
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='Scrape only postings newer than the last run of each query',
+    )
+    parser.add_argument(
+        '--resume', type=int, metavar='RUN_ID',
+        help='Resume an interrupted full run where it stopped',
+    )
+    parser.add_argument(
+        '--types', nargs='+',
+        choices=['enrich', 'analyze', 'apply_link', 'cover_letter'],
+        help='Task types a worker consumes (default: all)',
+    )
+    parser.add_argument(
+        '--mailbox',
+        help='Mailbox the emails command reads: mbox file, Maildir, or imap[s]://host[:port]/folder',
+    )
+    parser.add_argument(
+        '--imap-user', default=os.environ.get('IMAP_USER'),
+        help='IMAP login (default: $IMAP_USER); the password is read from $IMAP_PASSWORD',
+    )
+    parser.add_argument(
+        '--jobs', nargs='+', type=int, metavar='JOB_ID',
+        help='Jobs the prepare command prepares applications for',
+    )
+    parser.add_argument(
+        '--db', default='data/jobs.db',
+        help='Database path (default: data/jobs.db)',
     )
     parser.add_argument(
         '--verbose', '-v', action='store_true',
@@ -69,6 +133,66 @@ def parse_args():
     return parser.parse_args()
 
 
+def run_worker(args):
+    from database.enhanced_database import JobDatabase
+    from worker import Worker
+
+    db = JobDatabase(args.db)
+    worker = Worker(db, task_types=args.types)
+    logging.info('Worker %s consuming %s', worker.worker_id, ', '.join(worker.task_types))
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+    logging.info('Worker stopped after %d tasks', worker.processed)
+
+
+def run_emails(args):
+    from database.enhanced_database import JobDatabase
+    from email_monitor import EmailMonitor
+    from utils.mailbox_sources import open_source
+
+    if not args.mailbox:
+        sys.exit('emails needs --mailbox')
+    source = open_source(args.mailbox, user=args.imap_user, password=os.environ.get('IMAP_PASSWORD'))
+    db = JobDatabase(args.db)
+    try:
+        EmailMonitor(db).check_application_responses(source)
+    finally:
+        db.close()
+
+
+def run_prepare(args):
+    from analyzers.analyzer_ai import AIJobAnalyzer
+    from application_manager import ApplicationManager
+    from database.enhanced_database import JobDatabase
+
+    if not args.jobs:
+        sys.exit('prepare needs --jobs')
+    db = JobDatabase(args.db)
+    try:
+        manager = ApplicationManager(db, AIJobAnalyzer(), concurrency=args.concurrency or 8)
+        for application in manager.prepare_applications(args.jobs):
+            print(f"✅ {application['title']} at {application['company']}: {application['apply_url']}")
+    finally:
+        db.close()
+
+
+def run_companies(args):
+    from analyzers.analyzer_ai import AIJobAnalyzer
+    from company_research import CompanyResearch
+    from database.enhanced_database import JobDatabase
+
+    db = JobDatabase(args.db)
+    try:
+        research = CompanyResearch(db, AIJobAnalyzer(), concurrency=args.concurrency or 8)
+        print(f'✅ Researched {research.refresh(limit=args.limit)} companies')
+    finally:
+        db.close()
+
+
 def main():
     args = parse_args()
 
@@ -77,21 +201,54 @@ def main():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     )
 
-    pipeline = JobPipeline(headless=not args.no_headless)
+    if args.command == 'worker':
+        run_worker(args)
+        return
+    if args.command == 'emails':
+        run_emails(args)
+        return
+    if args.command == 'prepare':
+        run_prepare(args)
+        return
+    if args.command == 'companies':
+        run_companies(args)
+        return
 
-    if args.command == 'scrape':
-        pipeline.scrape(args.queries or pipeline._default_queries(), args.location)
-    elif args.command == 'enrich':
-        pipeline.enrich(limit=args.limit)
-    elif args.command == 'analyze':
-        pipeline.analyze(limit=args.limit)
-    else:
-        pipeline.run_full_pipeline(
-            queries=args.queries,
-            location=args.location,
-            skip_enrich=args.skip_enrich,
-        )
+    try:
+        parse_since(args.since)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    pipeline = JobPipeline(
+        db_path=args.db,
+        headless=not args.no_headless,
+        concurrency=args.concurrency or 1,
+        rate=args.rate,
+        browser=not args.no_browser,
+    )
 
+    try:
+        if args.command == 'scrape':
+            pipeline.scrape(args.queries, args.location, since=args.since, limit=args.limit,
+                            incremental=args.incremental)
+        elif args.command == 'enrich':
+            pipeline.enrich(limit=args.limit or 20, since=args.since)
+        elif args.command == 'extract':
+            pipeline.extract(limit=args.limit)
+        elif args.command == 'analyze':
+            pipeline.analyze(limit=args.limit or 20, since=args.since)
+        else:
+            # Checkpointed in the run ledger, so an interrupted run can be resumed
+            pipeline.run_full_pipeline(
+                queries=args.queries,
+                location=args.location,
+                skip_enrich=args.skip_enrich,
+                since=args.since,
+                limit=args.limit,
+                resume=args.resume,
+            )
+    finally:
+        pipeline.close()
 
 if __name__ == '__main__':
     main()
@@ -4,39 +4,35 @@ Provides intelligent job matching and cover letter generation"""
 import json
 import os
 import re
+import sys
+import time
+from pathlib import Path
 from typing import Dict, Optional, Tuple
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-    print('⚠️  Warning: anthropic package not installed. Run: pip install anthropic')
+# Ensure src is on the path when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analyzers.llm_client import RateLimitError, create_client
+
+DEGREE_HIERARCHY = {'bachelors': 1, 'masters': 2, 'phd': 3}
 
 
 class AIJobAnalyzer:
     """Use Claude to analyze job fit and generate application materials"""
     
-    def __init__(self, api_key: Optional[str] = None, profile_path: str = 'config/yigit_profile.json'):
-        """Initialize analyzer with Claude API"""
-        if not ANTHROPIC_AVAILABLE:
-            raise ImportError('anthropic package not installed. Install with: pip install anthropic')
-        
-        # Get API key from environment or parameter
-        self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
-        if not self.api_key:
-            raise ValueError(
-                'Anthropic API key required. Set ANTHROPIC_API_KEY environment variable or pass api_key parameter.\\n'
-                'Get your key at: https://console.anthropic.com/'
-            )
-        
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+    def __init__(self, api_key: Optional[str] = None, profile_path: str = 'config/yigit_profile.json',
+                 client=None, max_retries: int = 3):
+        """Initialize analyzer with Claude API
+
+        client: LLM client to use instead of the Claude API (see llm_client.py),
+        e.g. a FakeLLMClient for offline tests and benchmarks
+        max_retries: retries of a rate-limited (429) call before giving up
+        """
+        # Without an injected client, $LLM_CLIENT picks one (Claude API by default)
+        self.client = client or create_client(api_key)
+        self.api_key = getattr(self.client, 'api_key', None)
+        self.max_retries = max_retries
         
         # Load candidate profile
         with open(profile_path, 'r') as f:
@@ -44,6 +40,16 @@ class AIJobAnalyzer:
 
         print('✅ AI Analyzer initialized with Claude API access to profile data established.')
 
+    def _complete(self, prompt: str, max_tokens: int, temperature: Optional[float] = None) -> str:
+        """Call the LLM, backing off and retrying when rate limited"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.client.complete(prompt, max_tokens=max_tokens, temperature=temperature)
+            except RateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(e.retry_after if e.retry_after is not None else 2 ** attempt)
+
     def _calculate_user_experience(self):
         """Calculate total years of experience from profile"""
         total_years = 0
@@ -60,6 +66,17 @@ class AIJobAnalyzer:
                     pass
         return total_years
     
+    def qualification(self):
+        """pre_qualify_job's hard requirements as JobDatabase.qualification_filter
+        arguments, to rule jobs out in SQL from their stored requirements"""
+        user_degree = self.profile.get('education', [{}])[0].get('level', 'bachelors')
+        user_rank = DEGREE_HIERARCHY.get(user_degree)
+        return {
+            'excluded_degrees': [degree for degree, rank in DEGREE_HIERARCHY.items()
+                                 if user_rank is not None and rank > user_rank],
+            'max_experience_years': self._calculate_user_experience(),
+        }
+    
     def pre_qualify_job(self, job_data, enrichment_result):
         """Check if candidate meets hard requirements before analysis"""
         disqualifiers = []
@@ -70,10 +87,8 @@ class AIJobAnalyzer:
         if job_degree:
             user_degree = self.profile.get('education', [{}])[0].get('level', 'bachelors')
             
-            degree_hierarchy = {'bachelors': 1, 'masters': 2, 'phd': 3}
-            
-            if job_degree in degree_hierarchy and user_degree in degree_hierarchy:
-                if degree_hierarchy[job_degree] > degree_hierarchy[user_degree]:
+            if job_degree in DEGREE_HIERARCHY and user_degree in DEGREE_HIERARCHY:
+                if DEGREE_HIERARCHY[job_degree] > DEGREE_HIERARCHY[user_degree]:
                     disqualifiers.append(f"Requires {job_degree}, you have {user_degree}")
         
         # Check experience requirement
@@ -122,18 +137,11 @@ class AIJobAnalyzer:
         
         try:
             # Call Claude API
-            response = self.client.messages.create(
-                model='claude-3-5-sonnet-20241022',
-                max_tokens=2000,
-                temperature=0.3,  # Lower temperature for more consistent analysis
-                messages=[{
-                    'role': 'user',
-                    'content': prompt
-                }]
-            )
+            # Lower temperature for more consistent analysis
+            response_text = self._complete(prompt, max_tokens=2000, temperature=0.3)
             
             # Parse the response
-            analysis = self._parse_analysis_response(response.content[0].text)
+            analysis = self._parse_analysis_response(response_text)
             
             print(f'  ✓ Score: {analysis["score"]}/100')
             print(f'  ✓ Recommendation: {analysis["recommendation"][:60]}...')
@@ -146,6 +154,9 @@ class AIJobAnalyzer:
     
     def _create_analysis_prompt(self, job_data: Dict) -> str:
         """Create a detailed prompt for job analysis"""
+        # Membership first: on job rows without the field, .get() would load the legacy per-job column
+        company_info = job_data['company_info'] if 'company_info' in job_data else None
+        company = f'About the company:\n{company_info}\n' if company_info else ''
         
         return f"""You are an expert career advisor analyzing a job opportunity for Yigit Bezek.
 
@@ -153,7 +164,7 @@ class AIJobAnalyzer:
         Title: {job_data.get('title', 'N/A')}
         Company: {job_data.get('company', 'N/A')}
         Location: {job_data.get('location', 'N/A')}
-        Description:
+        {company}Description:
         {job_data.get('description', 'No description available')[:2000]}
 
         CANDIDATE PROFILE:
@@ -228,19 +239,11 @@ class AIJobAnalyzer:
             for job in context.get('top_matches', [])[:3]:
                 context_str += f"\n- {job['title']} at {job['company']} (Score: {job['ai_score']})"
             
-            response = self.client.messages.create(
-                model='claude-3-5-sonnet-20241022',
-                max_tokens=1000,
-                messages=[{
-                    'role': 'user',
-                    'content': f"""{context_str}
+            return self._complete(f"""{context_str}
                     
                     User question: {prompt}
                     
-                    Provide helpful, specific advice about their job search."""
-                }]
-            )
-            return response.content[0].text
+                    Provide helpful, specific advice about their job search.""", max_tokens=1000)
         except Exception as e:
             return f"I can help you with your job search. What would you like to know? (Error: {str(e)})"
         
@@ -298,8 +301,50 @@ class AIJobAnalyzer:
             'analyzed_at': datetime.now().isoformat()
         }
     
-    def generate_cover_letter(self, job_data: Dict, analysis: Optional[Dict] = None) -> str:
-        """Generate a personalized cover letter using Claude"""
+    def research_company(self, company: str, description: str = '') -> Optional[Dict]:
+        """Profile of an employer for analyses and application materials, or None if the call fails
+
+        Returns about, size, careers_url and visa_sponsor (True / False / None when unknown).
+        """
+        prompt = f"""Tell a job applicant about the employer {company}.
+
+JOB POSTING EXCERPT:
+{description[:1000]}
+
+FORMAT YOUR RESPONSE EXACTLY AS:
+ABOUT: [80-120 words: what the company does, its locations, its tech stack or engineering culture if known]
+SIZE: [number of employees, e.g. 50-200, or unknown]
+CAREERS: [URL of the careers page, or unknown]
+VISA_SPONSOR: [yes if it is an IND recognised sponsor for highly skilled migrants in the Netherlands, no, or unknown]
+
+Say unknown instead of guessing.
+"""
+        try:
+            return self._parse_company_research(self._complete(prompt, max_tokens=500, temperature=0.2))
+        except Exception as e:
+            print(f'  ❌ Error researching {company}: {e}')
+            return None
+
+    @staticmethod
+    def _parse_company_research(response_text: str) -> Dict:
+        """Parse a research_company response; free text without the fields becomes the about text"""
+        fields = dict(re.findall(r'^\s*(ABOUT|SIZE|CAREERS|VISA_SPONSOR):\s*(.*?)\s*$', response_text, re.MULTILINE))
+        known = {name: value for name, value in fields.items() if value and value.lower() not in ('unknown', 'n/a')}
+        about = re.search(r'ABOUT:\s*(.*?)(?=^\s*(?:SIZE|CAREERS|VISA_SPONSOR):|\Z)', response_text, re.DOTALL | re.MULTILINE)
+        sponsor = known.get('VISA_SPONSOR', '').lower()
+        return {
+            'about': about.group(1).strip() if about else response_text.strip(),
+            'size': known.get('SIZE'),
+            'careers_url': known.get('CAREERS') if known.get('CAREERS', '').startswith('http') else None,
+            'visa_sponsor': True if sponsor.startswith('yes') else False if sponsor.startswith('no') else None,
+        }
+
+    def generate_cover_letter(self, job_data: Dict, analysis: Optional[Dict] = None,
+                              company_info: Optional[str] = None) -> str:
+        """Generate a personalized cover letter using Claude
+
+        company_info: what is known about the employer (see company_research.company_context)
+        """
         
         print(f'\\n✍️  Generating cover letter for {job_data.get("company")}...')
         
@@ -307,20 +352,11 @@ class AIJobAnalyzer:
         if not analysis:
             analysis = self.analyze_job_fit(job_data)
         
-        prompt = self._create_cover_letter_prompt(job_data, analysis)
+        prompt = self._create_cover_letter_prompt(job_data, analysis, company_info)
         
         try:
-            response = self.client.messages.create(
-                model='claude-3-5-sonnet-20241022',
-                max_tokens=1500,
-                temperature=0.7,  # Higher temperature for more creative writing
-                messages=[{
-                    'role': 'user',
-                    'content': prompt
-                }]
-            )
-            
-            cover_letter = response.content[0].text.strip()
+            # Higher temperature for more creative writing
+            cover_letter = self._complete(prompt, max_tokens=1500, temperature=0.7).strip()
             print(f'  ✓ Generated {len(cover_letter)} character cover letter')
             return cover_letter
             
@@ -328,8 +364,9 @@ class AIJobAnalyzer:
             print(f'  ❌ Error generating cover letter: {e}')
             return self._get_fallback_cover_letter(job_data)
     
-    def _create_cover_letter_prompt(self, job_data: Dict, analysis: Dict) -> str:
+    def _create_cover_letter_prompt(self, job_data: Dict, analysis: Dict, company_info: Optional[str] = None) -> str:
         """Create prompt for cover letter generation"""
+        company = f'\nABOUT THE COMPANY:\n{company_info}\n' if company_info else ''
         
         return f"""Write a compelling cover letter for Yigit Bezek applying to:
 
@@ -337,8 +374,8 @@ JOB: {job_data.get('title')} at {job_data.get('company')}
 LOCATION: {job_data.get('location')}
 
 JOB DESCRIPTION:
-{job_data.get('description', '')[:2000]}
-
+{(job_data.get('description') or '')[:2000]}
+{company}
 CANDIDATE STRENGTHS (from analysis):
 {chr(10).join('- ' + s for s in analysis.get('strengths', []))}
 
@@ -404,10 +441,11 @@ if __name__ == '__main__':
     
     # Check for API key
     api_key = os.getenv('ANTHROPIC_API_KEY')
-    if not api_key:
+    if not api_key and os.getenv('LLM_CLIENT') != 'fake':
         print('❌ ANTHROPIC_API_KEY not set!')
         print('Set it with: export ANTHROPIC_API_KEY="your-key-here"')
         print('Get your key at: https://console.anthropic.com/')
+        print('Or run offline against the local stand-in: LLM_CLIENT=fake')
         exit(1)
     
     # Initialize analyzer
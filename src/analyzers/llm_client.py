@@ -0,0 +1,149 @@
+"""LLM clients for the analyzer
+AnthropicClient calls the Claude API; FakeLLMClient is a deterministic local
+stand-in with configurable latency and injected rate limiting, for tests and
+load benchmarks without an API key.
+
+A client is anything with complete(prompt, max_tokens, temperature) -> str
+that raises RateLimitError when the provider throttles it."""
+
+import hashlib
+import math
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+try:
+    import anthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+
+DEFAULT_MODEL = 'claude-3-5-sonnet-20241022'
+
+
+class RateLimitError(Exception):
+    """The provider answered 429; retry after `retry_after` seconds"""
+
+    def __init__(self, message='rate limited', retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AnthropicClient:
+    """Claude API client"""
+
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_MODEL):
+        if not ANTHROPIC_AVAILABLE:
+            raise ImportError('anthropic package not installed. Install with: pip install anthropic')
+
+        # Get API key from environment or parameter
+        self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
+        if not self.api_key:
+            raise ValueError(
+                'Anthropic API key required. Set ANTHROPIC_API_KEY environment variable or pass api_key parameter.\n'
+                'Get your key at: https://console.anthropic.com/'
+            )
+        self.model = model
+        self._client = anthropic.Anthropic(api_key=self.api_key)
+
+    def complete(self, prompt: str, max_tokens: int = 1000, temperature: Optional[float] = None) -> str:
+        kwargs = {'temperature': temperature} if temperature is not None else {}
+        try:
+            response = self._client.messages.create(
+                model=self.model,
+                max_tokens=max_tokens,
+                messages=[{'role': 'user', 'content': prompt}],
+                **kwargs
+            )
+        except anthropic.RateLimitError as e:
+            retry_after = e.response.headers.get('retry-after') if e.response is not None else None
+            raise RateLimitError(str(e), float(retry_after) if retry_after else None) from e
+        return response.content[0].text
+
+
+# --- latency distributions for FakeLLMClient (rng -> seconds) ---------------
+
+def constant(seconds: float) -> Callable[[random.Random], float]:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Callable[[random.Random], float]:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float = 0.5) -> Callable[[random.Random], float]:
+    """Long-tailed latency, like real API calls: median seconds, sigma of the log"""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+class FakeLLMClient:
+    """Deterministic local stand-in for the Claude API
+
+    Answers analysis prompts with a canned SCORE/STRENGTHS/CONCERNS/FIT/
+    RECOMMENDATION response whose score is derived from a hash of the prompt,
+    so the same job always gets the same score. Other prompts get a short
+    canned paragraph.
+
+    latency: distribution (rng -> seconds) slept per call, e.g. lognormal(0.8)
+    rate_limit_rate: fraction of calls that raise RateLimitError
+    retry_after: retry_after attached to injected rate limits
+    seed: seeds latency and 429 injection, for repeatable runs
+    """
+
+    def __init__(self, latency: Callable[[random.Random], float] = constant(0.0),
+                 rate_limit_rate: float = 0.0, retry_after: float = 0.0, seed: Optional[int] = 0):
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rate_limited = 0
+        self.busy_seconds = 0.0
+
+    def complete(self, prompt: str, max_tokens: int = 1000, temperature: Optional[float] = None) -> str:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency(self._rng))
+            throttled = self._rng.random() < self.rate_limit_rate
+            if throttled:
+                self.rate_limited += 1
+            self.busy_seconds += delay
+        time.sleep(delay)
+        if throttled:
+            raise RateLimitError('429 Too Many Requests (injected)', self.retry_after)
+        return self.respond(prompt)
+
+    @staticmethod
+    def respond(prompt: str) -> str:
+        digest = int(hashlib.sha1(prompt.encode('utf-8')).hexdigest(), 16)
+        if 'SCORE:' not in prompt:
+            return 'Thanks for your interest. This is a canned response from the local LLM stand-in.'
+        score = 40 + digest % 56
+        return (
+            f'SCORE: {score}\n'
+            'STRENGTHS:\n'
+            '- Python experience matches the core stack\n'
+            '- Machine learning projects are relevant to the role\n'
+            '- Based in the Netherlands\n'
+            'CONCERNS:\n'
+            '- Experience level may be below what is asked\n'
+            '- Visa sponsorship should be confirmed\n'
+            f'FIT: {"Strong" if score >= 80 else "Partial"} match for the role.\n'
+            f'RECOMMENDATION: {"Apply and lead with the thesis project." if score >= 70 else "Apply only if nothing better is open."}'
+        )
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'rate_limited': self.rate_limited, 'busy_seconds': self.busy_seconds}
+
+
+def create_client(api_key: Optional[str] = None):
+    """The client named by $LLM_CLIENT: 'anthropic' (default) or 'fake'"""
+    if os.getenv('LLM_CLIENT', 'anthropic').lower() == 'fake':
+        latency = float(os.getenv('FAKE_LLM_LATENCY', '0'))
+        return FakeLLMClient(latency=lognormal(latency) if latency > 0 else constant(0.0),
+                             rate_limit_rate=float(os.getenv('FAKE_LLM_429_RATE', '0')))
+    return AnthropicClient(api_key)
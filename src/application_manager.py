@@ -1,41 +1,134 @@
-# src/application_manager.py
+"""
+Application Manager
+Prepares applications for a selection of jobs as one batch:
+
+    company research   one LLM call per company missing from the research cache
+                       (see company_research.py), shared by its jobs
+    apply links        extracted from the job page for jobs that have none yet
+    cover letters      one LLM call per job, given its analysis and its company's research
+
+The calls run concurrently, so a batch takes about as long as its slowest job
+instead of the sum of all of them, and the results are written back in a
+single transaction.
+
+Usage:
+    manager = ApplicationManager(JobDatabase(), AIJobAnalyzer())
+    for application in manager.prepare_applications([12, 15, 31]):
+        print(application['company'], application['apply_url'])
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from company_research import CompanyResearch, company_context
+
+# Fields a batch reads per job
+PREPARE_FIELDS = (
+    'id', 'title', 'company', 'company_id', 'location', 'url', 'description', 'status', 'application_link',
+    'ai_score', 'ai_strengths', 'ai_concerns', 'ai_fit_assessment', 'ai_recommendation',
+)
+
+# Days after applying that a follow-up is due (JobTracker.get_jobs_needing_followup)
+FOLLOWUP_DAYS = 7
+
+
+def _extract_apply_link(url):
+    """Apply link of a LinkedIn posting, with a browser of its own per call"""
+    from scrapers.apply_link_extractor import ApplyLinkExtractor
+    return ApplyLinkExtractor().get_apply_link(url)
+
+
+def _apply_url(job, application_link):
+    """Where to apply: the external apply link, or the posting itself for Easy Apply and unknown links"""
+    return application_link if application_link and application_link.startswith('http') else job.url
+
+
+def _stored_analysis(job):
+    """The job's stored AI analysis in analyze_job_fit's shape, or None if it was never analyzed"""
+    if job.ai_score is None:
+        return None
+    return {
+        'score': job.ai_score,
+        'strengths': json.loads(job.ai_strengths or '[]'),
+        'concerns': json.loads(job.ai_concerns or '[]'),
+        'fit_assessment': job.ai_fit_assessment or '',
+        'recommendation': job.ai_recommendation or '',
+    }
+
+
 class ApplicationManager:
-    def __init__(self, db, analyzer):
+    def __init__(self, db, analyzer, link_extractor=_extract_apply_link, concurrency=8, link_concurrency=2,
+                 research=None):
+        """
+        link_extractor: function from a job URL to its apply link ('EASY_APPLY'
+        for LinkedIn Easy Apply), or None to skip link extraction
+        concurrency: LLM calls in flight at once
+        link_concurrency: apply link extractions at once (each runs a browser)
+        research: CompanyResearch cache (default: one over db using analyzer)
+        """
         self.db = db
         self.analyzer = analyzer
-    
+        self.link_extractor = link_extractor
+        self.concurrency = max(1, concurrency)
+        self.link_concurrency = max(1, link_concurrency)
+        self.research = research or CompanyResearch(db, analyzer, concurrency=self.concurrency)
+
+    def prepare_applications(self, job_ids):
+        """Research, apply links and cover letters for the given jobs, stored in one commit
+
+        Returns one dict per found job, in the order given: job_id, title,
+        company, company_info, cover_letter and apply_url.
+        """
+        by_id = {job.id: job for job in self.db.select_jobs(
+            PREPARE_FIELDS, where=f"id IN ({', '.join('?' * len(job_ids))})", params=list(job_ids)
+        )} if job_ids else {}
+        jobs = [by_id[job_id] for job_id in dict.fromkeys(job_ids) if job_id in by_id]
+        if not jobs:
+            return []
+
+        with ThreadPoolExecutor(max_workers=self.link_concurrency) as browsers:
+            links = {job.id: browsers.submit(self._apply_link, job.url) for job in jobs
+                     if self.link_extractor and not job.application_link and job.url}
+            # Meanwhile: research companies missing from the cache, then write every cover letter
+            companies = self.research.ensure(job.company_id for job in jobs)
+            context = {company_id: company_context(company) for company_id, company in companies.items()}
+            with ThreadPoolExecutor(max_workers=self.concurrency) as llm:
+                letters = {job.id: llm.submit(self._cover_letter, job, context.get(job.company_id)) for job in jobs}
+            applications = [{
+                'job_id': job.id,
+                'cover_letter': letters[job.id].result(),
+                'company_info': context.get(job.company_id),
+                'application_link': links[job.id].result() if job.id in links else None,
+            } for job in jobs]
+
+        self.db.save_applications(applications)
+        return [{
+            'job_id': job.id,
+            'title': job.title,
+            'company': job.company,
+            'company_info': application['company_info'],
+            'cover_letter': application['cover_letter'],
+            'apply_url': _apply_url(job, application['application_link'] or job.application_link),
+        } for job, application in zip(jobs, applications)]
+
     def prepare_application(self, job_id):
-        """Prepare full application materials"""
-        job = self.db.get_job(job_id)
-        
-        # Get company information
-        company_info = self.research_company(job['company'])
-        job['company_info'] = company_info
-        
-        # Generate cover letter with full context
-        cover_letter = self.analyzer.generate_cover_letter(
-            job_data=job,
-            company_research=company_info
-        )
-        
-        # Store in database
-        self.db.update_job(job_id, {
-            'cover_letter': cover_letter,
-            'status': 'ready_to_apply'
-        })
-        
-        return {
-            'job': job,
-            'cover_letter': cover_letter,
-            'apply_url': job['url']
-        }
-    
-    def track_application(self, job_id):
-        """Mark job as applied and start tracking"""
-        self.db.update_job(job_id, {
-            'status': 'applied',
-            'applied_at': datetime.now().isoformat()
-        })
-        
-        # Set reminder to follow up in 7 days
-        self.schedule_followup(job_id, days=7)
\ No newline at end of file
+        """Prepare a single job's application; None if the job does not exist"""
+        prepared = self.prepare_applications([job_id])
+        return prepared[0] if prepared else None
+
+    def _cover_letter(self, job, company_info):
+        return self.analyzer.generate_cover_letter(job.to_dict(), _stored_analysis(job), company_info)
+
+    def _apply_link(self, url):
+        try:
+            return self.link_extractor(url)
+        except Exception as e:
+            print(f'  ❌ Error extracting apply link from {url}: {e}')
+            return None
+
+    def track_application(self, job_ids):
+        """Mark jobs as applied; returns {job_id: date a follow-up is due}"""
+        self.db.mark_applied(job_ids)
+        followup = (datetime.now() + timedelta(days=FOLLOWUP_DAYS)).date().isoformat()
+        return {job_id: followup for job_id in job_ids}
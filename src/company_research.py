@@ -0,0 +1,107 @@
+"""
+Company Research
+What analyses and applications know about an employer, cached per company on
+the companies table: an about text, its size, careers page and whether it is a
+recognised visa sponsor. Many jobs share a handful of companies, so research
+costs one LLM call per company and RESEARCH_TTL, not one per job.
+
+    research = CompanyResearch(db, analyzer)
+    research.contexts(company_ids)       # cached entries as prompt text, no calls
+    research.ensure(company_ids)         # research missing and stale entries first
+    research.refresh(limit=50)           # bulk refresh of the stalest companies
+
+Usage:
+    python main.py companies --limit 50 --concurrency 8
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from database.enhanced_database import COMPANY_FIELDS
+
+# Age after which a company's research is redone
+RESEARCH_TTL = timedelta(days=30)
+
+Company = namedtuple('Company', COMPANY_FIELDS)
+
+
+def company_context(company):
+    """A company's research as the text block analysis and cover letter prompts include, or None"""
+    if company is None or not company.about:
+        return None
+    lines = [company.about]
+    if company.size:
+        lines.append(f'Size: {company.size} employees')
+    if company.visa_sponsor is not None:
+        lines.append(f"Recognised visa sponsor: {'yes' if company.visa_sponsor else 'no'}")
+    if company.careers_url:
+        lines.append(f'Careers page: {company.careers_url}')
+    return '\n'.join(lines)
+
+
+class CompanyResearch:
+    def __init__(self, db, analyzer=None, ttl=RESEARCH_TTL, concurrency=8):
+        """
+        analyzer: AIJobAnalyzer doing the research; only needed to refresh
+        concurrency: research calls in flight at once
+        """
+        self.db = db
+        self.analyzer = analyzer
+        self.ttl = ttl
+        self.concurrency = max(1, concurrency)
+
+    def _cutoff(self):
+        return (datetime.now() - self.ttl).isoformat()
+
+    def cached(self, company_ids):
+        """{company_id: Company} of the stored entries, fresh or stale, without research calls"""
+        company_ids = {company_id for company_id in company_ids if company_id is not None}
+        return {row[0]: Company(*row) for row in self.db.get_companies(company_ids)} if company_ids else {}
+
+    def contexts(self, company_ids):
+        """{company_id: prompt text} of the companies with stored research"""
+        found = {company_id: company_context(company) for company_id, company in self.cached(company_ids).items()}
+        return {company_id: context for company_id, context in found.items() if context}
+
+    def ensure(self, company_ids):
+        """Research the companies whose entry is missing or stale, then return all of them as cached"""
+        companies = self.cached(company_ids)
+        cutoff = self._cutoff()
+        stale = [company for company in companies.values()
+                 if company.researched_at is None or company.researched_at < cutoff]
+        if stale:
+            self._research(stale)
+            companies = self.cached(companies)
+        return companies
+
+    def refresh(self, company_ids=None, force=False, limit=None):
+        """Research stale companies concurrently and store them in one commit; returns how many were stored
+
+        company_ids: companies to consider (default: every company with jobs, most jobs first)
+        force: redo research that has not expired yet
+        """
+        cutoff = datetime.now().isoformat() if force else self._cutoff()
+        if company_ids is None:
+            company_ids = self.db.get_stale_companies(cutoff, limit)
+        companies = self.cached(company_ids)
+        stale = [companies[company_id] for company_id in dict.fromkeys(company_ids) if company_id in companies
+                 and (companies[company_id].researched_at is None or companies[company_id].researched_at < cutoff)]
+        return self._research(stale[:limit])
+
+    def _research(self, companies):
+        if not companies:
+            return 0
+        if self.analyzer is None:
+            raise ValueError('CompanyResearch needs an analyzer to research companies')
+        descriptions = self.db.get_company_descriptions(company.id for company in companies)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(
+                lambda company: self.analyzer.research_company(company.name, descriptions.get(company.id) or ''),
+                companies
+            ))
+        # Failed calls keep the previous entry, and are retried by the next refresh
+        research = [dict(result, company_id=company.id) for company, result in zip(companies, results) if result]
+        if research:
+            self.db.save_company_research(research)
+        return len(research)
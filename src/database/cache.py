@@ -0,0 +1,42 @@
+"""
+Read cache
+In-process cache of query results, invalidated whenever the database changes
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class ReadCache:
+    """LRU cache whose entries are valid only for the data version they were computed at"""
+
+    def __init__(self, version_fn, max_entries=256):
+        self.version_fn = version_fn
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, recomputing it if the database changed since"""
+        version = self.version_fn()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
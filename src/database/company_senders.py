@@ -0,0 +1,108 @@
+"""
+Company senders
+Lookup table from where employer mail comes from to the company sending it:
+
+    adyen.com    registered domain of a company apply link or recruiter address
+    ats:adyen    employer slug at an applicant tracking system, from ATS apply links
+
+Rows are added as apply links are stored, so matching an email to a company
+never scans jobs. Mail from an ATS or a job board carries no company in its
+domain; those domains are listed here so they are never recorded as one.
+"""
+
+import re
+from urllib.parse import urlsplit
+
+# Applicant tracking systems sending and hosting applications on behalf of employers
+ATS_DOMAINS = {
+    'greenhouse.io', 'greenhouse-mail.io', 'lever.co', 'myworkday.com', 'myworkdayjobs.com',
+    'workable.com', 'workablemail.com', 'smartrecruiters.com', 'recruitee.com', 'teamtailor.com',
+    'teamtailor-mail.com', 'ashbyhq.com', 'bamboohr.com', 'personio.de', 'jobvite.com', 'icims.com',
+    'successfactors.com', 'successfactors.eu', 'taleo.net', 'homerun.co',
+}
+# Domains whose mail or links never identify the employer
+RELAY_DOMAINS = ATS_DOMAINS | {
+    'linkedin.com', 'indeed.com', 'glassdoor.com', 'gmail.com', 'googlemail.com', 'outlook.com',
+    'hotmail.com', 'live.com', 'yahoo.com', 'icloud.com', 'proton.me', 'protonmail.com',
+}
+
+# Employer slug in ATS job links
+ATS_LINK_PATTERNS = [re.compile(pattern) for pattern in (
+    r'^(?:boards|job-boards)(?:\.eu)?\.greenhouse\.io/(?:embed/job_app\?for=)?([\w-]+)',
+    r'^jobs(?:\.eu)?\.lever\.co/([\w-]+)',
+    r'^([\w-]+)\.wd\d+\.myworkdayjobs\.com',
+    r'^apply\.workable\.com/([\w-]+)',
+    r'^(?:jobs|careers)\.smartrecruiters\.com/([\w-]+)',
+    r'^([\w-]+)\.recruitee\.com',
+    r'^([\w-]+)\.teamtailor\.com',
+    r'^jobs\.ashbyhq\.com/([\w-]+)',
+    r'^([\w-]+)\.bamboohr\.com',
+    r'^([\w-]+)\.jobs\.personio\.de',
+)]
+
+
+def registered_domain(host):
+    """Domain an organization registered: careers.adyen.com -> adyen.com, mail.bbc.co.uk -> bbc.co.uk"""
+    labels = host.lower().strip('.').split('.')
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in ('co', 'com', 'org', 'ac', 'gov'):
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def tenant_key(slug):
+    """Lookup key of an ATS employer slug"""
+    return 'ats:' + slug.lower().replace('-', '')
+
+
+def ats_tenant(url):
+    """Employer slug of an ATS job link, or None"""
+    parts = urlsplit(url if '//' in url else f'//{url}')
+    target = (parts.netloc.lower() + parts.path + (f'?{parts.query}' if parts.query else '')).removeprefix('www.')
+    for pattern in ATS_LINK_PATTERNS:
+        match = pattern.match(target)
+        if match:
+            return match.group(1).lower()
+    return None
+
+
+def sender_keys(application_link=None, recruiter_email=None):
+    """company_senders keys an apply link and recruiter address identify the employer by"""
+    keys = []
+    if recruiter_email and '@' in recruiter_email:
+        domain = registered_domain(recruiter_email.rpartition('@')[2])
+        if domain not in RELAY_DOMAINS:
+            keys.append(domain)
+    if application_link:
+        tenant = ats_tenant(application_link)
+        host = urlsplit(application_link).hostname
+        if tenant:
+            keys.append(tenant_key(tenant))
+        elif host and registered_domain(host) not in RELAY_DOMAINS:
+            keys.append(registered_domain(host))
+    return keys
+
+
+def remember(conn, job_id, application_link=None, recruiter_email=None):
+    """Record the sender keys of a job's links for its company (first company per key wins)"""
+    conn.executemany('''
+        INSERT OR IGNORE INTO company_senders (key, company_id)
+        SELECT ?, company_id FROM jobs WHERE id = ? AND company_id IS NOT NULL
+    ''', [(key, job_id) for key in sender_keys(application_link, recruiter_email)])
+
+
+def create_company_senders(conn):
+    """Migration: company_senders table, filled from stored apply links and recruiter addresses"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS company_senders (
+            key TEXT PRIMARY KEY,
+            company_id INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    rows = conn.execute('''
+        SELECT company_id, application_link, recruiter_email FROM jobs
+        WHERE company_id IS NOT NULL AND (application_link IS NOT NULL OR recruiter_email IS NOT NULL)
+        ORDER BY id
+    ''').fetchall()
+    conn.executemany('INSERT OR IGNORE INTO company_senders (key, company_id) VALUES (?, ?)', [
+        (key, company_id) for company_id, link, email in rows for key in sender_keys(link, email)
+    ])
@@ -9,6 +9,10 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import os
 
+from database.fts import search_ids
+from database.migrations import compute_job_hash, migrate
+from database.rows import JOB_LIST_FIELDS, fetch_rows, load_column
+
 class JobTracker:
     """Track jobs from scraping to offer/rejection"""
     
@@ -22,88 +26,8 @@ class JobTracker:
         self.create_tables()
     
     def create_tables(self):
-        """Create all necessary tables"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id TEXT UNIQUE,
-                title TEXT NOT NULL,
-                company TEXT NOT NULL,
-                location TEXT,
-                url TEXT UNIQUE NOT NULL,
-                description TEXT,
-                source TEXT DEFAULT 'linkedin',
-                scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                applied_date TIMESTAMP,
-                response_date TIMESTAMP,
-                interview_date TIMESTAMP,
-                offer_date TIMESTAMP,
-                rejection_date TIMESTAMP,
-                status TEXT DEFAULT 'scraped',
-                ai_score INTEGER,
-                ai_match_reasoning TEXT,
-                ai_strengths TEXT,
-                ai_concerns TEXT,
-                ai_recommendation TEXT,
-                cover_letter TEXT,
-                resume_version TEXT,
-                recruiter_name TEXT,
-                recruiter_email TEXT,
-                last_followup_date TIMESTAMP,
-                followup_count INTEGER DEFAULT 0,
-                notes TEXT,
-                salary_range TEXT,
-                remote_option TEXT,
-                visa_sponsorship BOOLEAN,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS application_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id INTEGER,
-                action TEXT NOT NULL,
-                details TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (job_id) REFERENCES jobs(id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS emails (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id INTEGER,
-                subject TEXT,
-                sender TEXT,
-                recipient TEXT,
-                body TEXT,
-                received_date TIMESTAMP,
-                email_type TEXT,
-                FOREIGN KEY (job_id) REFERENCES jobs(id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS interviews (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id INTEGER,
-                interview_type TEXT,
-                scheduled_date TIMESTAMP,
-                duration_minutes INTEGER,
-                interviewer_name TEXT,
-                interviewer_title TEXT,
-                location TEXT,
-                notes TEXT,
-                completed BOOLEAN DEFAULT 0,
-                FOREIGN KEY (job_id) REFERENCES jobs(id)
-            )
-        ''')
-        
-        self.conn.commit()
+        """Create or upgrade all tables to the current schema"""
+        migrate(self.conn)
         print('✅ Database tables created successfully!')
     
     def add_job(self, job_data: Dict) -> int:
@@ -113,8 +37,8 @@ class JobTracker:
         try:
             cursor.execute('''
                 INSERT INTO jobs (
-                    job_id, title, company, location, url, description, source, scraped_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    job_id, title, company, location, url, description, source, scraped_at, job_hash, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'new')
             ''', (
                 job_data.get('job_id'),
                 job_data.get('title'),
@@ -123,7 +47,8 @@ class JobTracker:
                 job_data.get('url'),
                 job_data.get('description', ''),
                 job_data.get('source', 'linkedin'),
-                job_data.get('scraped_at', datetime.now().isoformat())
+                job_data.get('scraped_at', datetime.now().isoformat()),
+                compute_job_hash(job_data.get('title'), job_data.get('company'), job_data.get('location'))
             ))
             
             job_id = cursor.lastrowid
@@ -185,42 +110,44 @@ class JobTracker:
     def get_jobs_by_status(self, status: str) -> List[Dict]:
         """Get all jobs with a specific status"""
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM jobs WHERE status = ? ORDER BY scraped_date DESC', (status,))
+        cursor.execute('SELECT * FROM jobs WHERE status = ? ORDER BY scraped_at DESC', (status,))
         return [dict(row) for row in cursor.fetchall()]
     
-    def get_recent_jobs(self, limit: int = 20) -> List[Dict]:
-        """Get most recently scraped jobs"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM jobs ORDER BY scraped_date DESC LIMIT ?', (limit,))
-        return [dict(row) for row in cursor.fetchall()]
+    def get_recent_jobs(self, limit: int = 20, fields=JOB_LIST_FIELDS) -> List:
+        """Get most recently scraped jobs (only the requested fields)"""
+        return fetch_rows(self.conn, fields, 'ORDER BY scraped_at DESC LIMIT ?', (limit,),
+                          loader=self._load_column)
     
-    def get_high_score_jobs(self, min_score: int = 70, limit: int = 20) -> List[Dict]:
-        """Get jobs with high AI match scores"""
-        cursor = self.conn.cursor()
-        cursor.execute('''SELECT * FROM jobs WHERE ai_score >= ? 
-                       ORDER BY ai_score DESC, scraped_date DESC LIMIT ?''',
-                      (min_score, limit))
-        return [dict(row) for row in cursor.fetchall()]
+    def get_high_score_jobs(self, min_score: int = 70, limit: int = 20, fields=JOB_LIST_FIELDS) -> List:
+        """Get jobs with high AI match scores (only the requested fields)"""
+        return fetch_rows(self.conn, fields,
+                          'WHERE ai_score >= ? ORDER BY ai_score DESC, scraped_at DESC LIMIT ?',
+                          (min_score, limit), loader=self._load_column)
+    
+    def _load_column(self, job_id: int, column: str):
+        return load_column(self.conn, job_id, column)
     
     def get_jobs_needing_followup(self, days_since_applied: int = 7) -> List[Dict]:
         """Get jobs that need follow-up"""
         cursor = self.conn.cursor()
         cursor.execute('''SELECT * FROM jobs WHERE status = 'applied' 
-                       AND applied_date IS NOT NULL
+                       AND applied_at IS NOT NULL
                        AND (last_followup_date IS NULL OR 
                             julianday('now') - julianday(last_followup_date) > ?)
-                       AND julianday('now') - julianday(applied_date) >= ?''',
+                       AND julianday('now') - julianday(applied_at) >= ?''',
                       (days_since_applied, days_since_applied))
         return [dict(row) for row in cursor.fetchall()]
     
-    def search_jobs(self, query: str) -> List[Dict]:
-        """Search jobs by title, company, or description"""
+    def search_jobs(self, query: str, limit: int = 50) -> List[Dict]:
+        """Search jobs by title, company, or description (BM25 ranked, prefix matching)"""
+        ids = search_ids(self.conn, query, limit)
+        if not ids:
+            return []
+        placeholders = ', '.join('?' * len(ids))
         cursor = self.conn.cursor()
-        search_pattern = f'%{query}%'
-        cursor.execute('''SELECT * FROM jobs WHERE title LIKE ? OR company LIKE ? 
-                       OR description LIKE ? ORDER BY scraped_date DESC''',
-                      (search_pattern, search_pattern, search_pattern))
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.execute(f'SELECT * FROM jobs WHERE id IN ({placeholders})', ids)
+        rows = {row['id']: dict(row) for row in cursor.fetchall()}
+        return [rows[job_id] for job_id in ids if job_id in rows]
     
     def get_statistics(self) -> Dict:
         """Get application statistics"""
@@ -354,8 +281,8 @@ if __name__ == '__main__':
                 ))
             else:
                 self.conn.execute("""
-                    INSERT INTO jobs (title, company, location, url, description, ai_score, scraped_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO jobs (title, company, location, url, description, ai_score, scraped_at, status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 'new')
                 """, (
                     job_data['title'],
                     job_data['company'],
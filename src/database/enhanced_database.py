@@ -1,128 +1,246 @@
 import sqlite3
 from datetime import datetime
 import json
+import re
 import threading
-import hashlib
+from pathlib import Path
 from urllib.parse import urlparse, parse_qs
 
+from database.cache import ReadCache
+from database.fts import search
+from database import company_senders, near_duplicates, normalization
+from database.migrations import REQUIREMENTS_PENDING, compute_description_hash, compute_job_hash, migrate
+from database.rows import (
+    JOB_ANALYSIS_FIELDS, JOB_CARD_FIELDS, JOB_LIST_FIELDS, fetch_rows, load_column
+)
+from database.task_queue import TaskQueue
+from database.writer import DatabaseWriter, WriteResult
+
+# Company research fields (see company_research.py)
+COMPANY_FIELDS = ('id', 'name', 'about', 'size', 'careers_url', 'visa_sponsor', 'researched_at')
+
+# Application progress; statuses set from employer email only ever move forward
+STATUS_PROGRESS = {'new': 0, 'applied': 1, 'interview_scheduled': 2, 'interviewed': 3, 'rejected': 4, 'offer': 5}
+# Jobs applied to, whatever the employer answered since
+APPLIED_STATUSES = tuple(status for status, step in STATUS_PROGRESS.items() if step >= STATUS_PROGRESS['applied'])
+_APPLIED = f"status IN ({', '.join(repr(status) for status in APPLIED_STATUSES)})"
+
+# Sort orders of get_jobs_page: (key expression, row field, key of a NULL field, descending)
+PAGE_ORDERS = {
+    'score': ('IFNULL(ai_score, -1)', 'ai_score', -1, True),
+    'date': ("IFNULL(scraped_at, '')", 'scraped_at', '', True),
+    'company': ("IFNULL(company, '')", 'company', '', False),
+}
+
 class JobDatabase:
-    _local = threading.local()
-    
     def __init__(self, db_path='data/jobs.db'):
         self.db_path = db_path
+        self._local = threading.local()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._version_conn = None
+        self._version_lock = threading.Lock()
+        self._tasks = None
+        self._normalizer = None
         self.create_tables()
+        self.read_cache = ReadCache(self.data_version)
+    
+    def _connect_read_only(self):
+        uri = Path(self.db_path).absolute().as_uri() + '?mode=ro'
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
     
     @property
     def conn(self):
+        """Per-thread read-only connection; all writes go through self.writer"""
         if not hasattr(self._local, 'conn'):
-            self._local.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._local.conn = self._connect_read_only()
             self._local.conn.row_factory = sqlite3.Row
         return self._local.conn
     
+    def data_version(self):
+        """Counter that changes whenever any connection or process commits to the database"""
+        with self._version_lock:
+            # A dedicated connection that never writes, so every commit counts as "another connection"
+            if self._version_conn is None:
+                self._version_conn = self._connect_read_only()
+            return self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    def cached(self, fn, *args, **kwargs):
+        """Call a read function through the cache, keyed by function and arguments"""
+        key = (fn.__module__, fn.__qualname__, args, tuple(sorted(kwargs.items())))
+        return self.read_cache.get_or_compute(key, lambda: fn(*args, **kwargs))
+    
+    @property
+    def writer(self):
+        """The single writer thread owning the only write connection"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = DatabaseWriter(self.db_path)
+            return self._writer
+    
+    @property
+    def normalizer(self):
+        """City and company alias matchers (see normalization.py)"""
+        with self._writer_lock:
+            if self._normalizer is None:
+                self._normalizer = normalization.Normalizer.load(self.conn)
+            return self._normalizer
+    
+    @property
+    def tasks(self):
+        """Durable queue of background work shared with `main.py worker` processes; writes go through writer"""
+        writer = self.writer
+        with self._writer_lock:
+            if self._tasks is None:
+                self._tasks = TaskQueue(self.db_path, writer=writer)
+            return self._tasks
+    
+    def close(self):
+        """Flush pending writes and close this thread's connection"""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            if self._tasks is not None:
+                self._tasks.close()
+                self._tasks = None
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+        if hasattr(self._local, 'conn'):
+            self._local.conn.close()
+            del self._local.conn
+    
     def create_tables(self):
+        """Create or upgrade all tables to the current schema"""
         conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                company TEXT NOT NULL,
-                location TEXT,
-                url TEXT UNIQUE,
-                description TEXT,
-                company_info TEXT,
-                scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                source TEXT,
-                ai_score INTEGER,
-                ai_strengths TEXT,
-                ai_concerns TEXT, 
-                ai_fit_assessment TEXT,
-                ai_recommendation TEXT,
-                analyzed_at TIMESTAMP,
-                status TEXT DEFAULT 'new',
-                applied_at TIMESTAMP,
-                application_method TEXT,
-                cover_letter TEXT,
-                response_received BOOLEAN DEFAULT 0,
-                response_date TIMESTAMP,
-                response_type TEXT,
-                interview_scheduled BOOLEAN DEFAULT 0,
-                interview_date TIMESTAMP,
-                interview_notes TEXT,
-                outcome TEXT,
-                outcome_date TIMESTAMP,
-                notes TEXT
-            )
-        ''')
-        
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS email_tracking (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id INTEGER,
-                email_subject TEXT,
-                email_from TEXT,
-                email_date TIMESTAMP,
-                email_type TEXT,
-                processed BOOLEAN DEFAULT 0,
-                FOREIGN KEY (job_id) REFERENCES jobs (id)
-            )
-        ''')
-        
-        conn.commit()
+        # WAL lets the read-only connections read while the writer commits
+        conn.execute('PRAGMA journal_mode = WAL')
+        migrate(conn)
         conn.close()
     
-    def add_job(self, job_data):
-        """Add or update job in database"""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO jobs 
-                (title, company, location, url, description, source, scraped_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_data['title'],
-                job_data['company'],
-                job_data.get('location', ''),
-                job_data['url'],
-                job_data.get('description', ''),
-                job_data.get('source', 'linkedin'),
-                datetime.now().isoformat()
-            ))
-            self.conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT id FROM jobs WHERE url = ?", (job_data['url'],))
-            row = cursor.fetchone()
-            return row[0] if row else None
+    def _write(self, sql, params=(), wait=True):
+        """Queue a statement on the writer; block for its result unless wait=False"""
+        future = self.writer.execute(sql, params)
+        return future.result() if wait else future
+    
     def job_exists(self, url):
         """Check if job already exists in database"""
         cursor = self.conn.execute("SELECT id FROM jobs WHERE url = ?", (url,))
         return cursor.fetchone() is not None
 
-    def get_jobs_needing_description(self, limit=10):
+    def select_jobs(self, fields, where='', params=(), order_by='', limit=None):
+        """Fetch only the named fields; unselected large text columns load lazily on access"""
+        sql_tail = ''
+        if where:
+            sql_tail += f' WHERE {where}'
+        if order_by:
+            sql_tail += f' ORDER BY {order_by}'
+        if limit is not None:
+            sql_tail += ' LIMIT ?'
+            params = tuple(params) + (limit,)
+        return fetch_rows(self.conn, fields, sql_tail, params, loader=self._load_column)
+
+    def _load_column(self, job_id, column):
+        return load_column(self.conn, job_id, column)
+
+    def get_jobs_needing_description(self, limit=10, fields=('id', 'title', 'company', 'url')):
         """Get jobs that need description enrichment"""
-        cursor = self.conn.execute('''
-            SELECT * FROM jobs 
-            WHERE (description IS NULL OR LENGTH(description) < 100)
-            LIMIT ?
-        ''', (limit,))
-        return [dict(row) for row in cursor.fetchall()]
+        return self.select_jobs(
+            fields,
+            where='description IS NULL OR LENGTH(description) < 100',
+            limit=limit
+        )
+
+    def search_jobs(self, query, limit=50):
+        """Full-text search returning ids, highlighted titles and snippets only"""
+        return search(self.conn, query, limit)
 
     def update_job_description(self, job_id, description):
-        """Update only the description for a job"""
-        self.conn.execute(
-            "UPDATE jobs SET description = ? WHERE id = ?",
-            (description, job_id)
-        )
-        self.conn.commit()
+        """Update only the description for a job, and re-cluster it with its near-duplicates"""
+        signature = near_duplicates.signature(description)
+
+        def update(conn):
+            conn.execute(
+                "UPDATE jobs SET description = ?, description_hash = ? WHERE id = ?",
+                (description, compute_description_hash(description), job_id)
+            )
+            near_duplicates.assign_cluster(conn, job_id, signature)
+
+        self.writer.transaction(update).result()
     
     def update_apply_link(self, job_id, apply_link):
-        """Update job with direct apply link"""
-        self.conn.execute(
-            "UPDATE jobs SET application_link = ? WHERE id = ?",
-            (apply_link, job_id)
-        )
-        self.conn.commit()
+        """Update job with direct apply link, and learn the company's sender domain or ATS tenant from it"""
+        def update(conn):
+            conn.execute("UPDATE jobs SET application_link = ? WHERE id = ?", (apply_link, job_id))
+            company_senders.remember(conn, job_id, application_link=apply_link)
+
+        self.writer.transaction(update).result()
+    
+    def update_cover_letter(self, job_id, cover_letter):
+        """Store a generated cover letter"""
+        self._write("UPDATE jobs SET cover_letter = ? WHERE id = ?", (cover_letter, job_id))
+    
+    def save_applications(self, applications):
+        """Store prepared applications in one commit
+
+        applications are dicts with job_id, cover_letter and application_link
+        (None keeps the stored value). Jobs still 'new' move to
+        'ready_to_apply'; apply links teach company_senders like update_apply_link.
+        """
+        now = datetime.now().isoformat()
+
+        def save(conn):
+            conn.executemany('''
+                UPDATE jobs SET
+                    cover_letter = COALESCE(?, cover_letter),
+                    application_link = COALESCE(?, application_link),
+                    status = CASE WHEN status = 'new' THEN 'ready_to_apply' ELSE status END,
+                    updated_at = ?
+                WHERE id = ?
+            ''', [
+                (application['cover_letter'], application['application_link'], now, application['job_id'])
+                for application in applications
+            ])
+            for application in applications:
+                if application['application_link']:
+                    company_senders.remember(conn, application['job_id'],
+                                             application_link=application['application_link'])
+
+        self.writer.transaction(save).result()
+    
+    def update_status(self, job_id, status):
+        """Set job status; moving to 'applied' also stamps applied_at"""
+        if status == 'applied':
+            self.mark_applied([job_id])
+        else:
+            self._write("UPDATE jobs SET status = ? WHERE id = ?", (status, job_id))
+    
+    def mark_applied(self, job_ids):
+        """Mark one or more jobs as applied in a single commit"""
+        now = datetime.now().isoformat()
+        return self.writer.executemany(
+            "UPDATE jobs SET status = 'applied', applied_at = ? WHERE id = ?",
+            [(now, job_id) for job_id in job_ids]
+        ).result()
+    
+    def update_response_type(self, job_id, response_type):
+        """Record the employer response for an application"""
+        self._write("UPDATE jobs SET response_type = ? WHERE id = ?", (response_type, job_id))
+    
+    def update_notes(self, job_id, notes):
+        """Replace the free-form notes of a job"""
+        self._write("UPDATE jobs SET notes = ? WHERE id = ?", (notes, job_id))
+    
+    def clear_jobs(self):
+        """Delete every job"""
+        def clear(conn):
+            conn.execute("DELETE FROM job_signature_bands")
+            conn.execute("DELETE FROM job_signatures")
+            conn.execute("DELETE FROM jobs")
+
+        self.writer.transaction(clear).result()
     
     def get_statistics(self):
         """Get comprehensive database statistics"""
@@ -144,7 +262,8 @@ class JobDatabase:
             "SELECT COUNT(*) FROM jobs WHERE ai_score IS NOT NULL"
         ).fetchone()[0]
         stats['need_analysis'] = self.conn.execute(
-            "SELECT COUNT(*) FROM jobs WHERE ai_score IS NULL AND LENGTH(COALESCE(description, '')) > 100"
+            "SELECT COUNT(*) FROM jobs WHERE ai_score IS NULL AND LENGTH(COALESCE(description, '')) > 100 "
+            "AND status IS NOT 'skipped'"
         ).fetchone()[0]
         
         # Jobs by status
@@ -165,34 +284,43 @@ class JobDatabase:
         
         return stats
 
+    def get_analytics(self):
+        """Aggregates for the analytics dashboard"""
+        row = self.conn.execute(f'''
+            SELECT AVG(ai_score),
+                   SUM(ai_score >= 80),
+                   SUM({_APPLIED}),
+                   SUM({_APPLIED} AND response_type IS NOT NULL),
+                   SUM(response_type = 'Interview')
+            FROM jobs
+        ''').fetchone()
+        applied = row[2] or 0
+        return {
+            'avg_score': row[0],
+            'high_matches': row[1] or 0,
+            'response_rate': (row[3] or 0) * 100.0 / applied if applied else 0,
+            'interviews': row[4] or 0,
+            'scores': [r[0] for r in self.conn.execute('SELECT ai_score FROM jobs WHERE ai_score IS NOT NULL')],
+        }
+
     def mark_job_enriched(self, job_id):
         """Mark a job as enriched with timestamp"""
-        self.conn.execute(
+        self._write(
             "UPDATE jobs SET enriched_at = ? WHERE id = ?",
             (datetime.now().isoformat(), job_id)
         )
-        self.conn.commit()
 
     def mark_job_analyzed(self, job_id):
         """Mark a job as analyzed with timestamp"""
-        self.conn.execute(
+        self._write(
             "UPDATE jobs SET analyzed_at = ? WHERE id = ?",
             (datetime.now().isoformat(), job_id)
         )
-        self.conn.commit()
         
-    def update_analysis(self, job_id, analysis):
-        """Update job with AI analysis"""
-        self.conn.execute('''
-            UPDATE jobs SET
-                ai_score = ?,
-                ai_strengths = ?,
-                ai_concerns = ?,
-                ai_fit_assessment = ?,
-                ai_recommendation = ?,
-                analyzed_at = ?
-            WHERE id = ?
-        ''', (
+    def update_analysis(self, job_id, analysis, wait=True):
+        """Update job with AI analysis and share it with the job's near-duplicates;
+        wait=False returns a Future instead of blocking"""
+        params = (
             analysis.get('score', 0),
             json.dumps(analysis.get('strengths', [])),
             json.dumps(analysis.get('concerns', [])),
@@ -200,8 +328,25 @@ class JobDatabase:
             analysis.get('recommendation', ''),
             datetime.now().isoformat(),
             job_id
-        ))
-        self.conn.commit()
+        )
+
+        def update(conn):
+            cursor = conn.execute('''
+                UPDATE jobs SET
+                    ai_score = ?,
+                    ai_strengths = ?,
+                    ai_concerns = ?,
+                    ai_fit_assessment = ?,
+                    ai_recommendation = ?,
+                    analyzed_at = ?,
+                    analyzed_from = NULL
+                WHERE id = ?
+            ''', params)
+            near_duplicates.share_analysis(conn, job_id)
+            return WriteResult(cursor.lastrowid, cursor.rowcount)
+
+        future = self.writer.transaction(update)
+        return future.result() if wait else future
     
     def clean_url(self, url):
         """Remove tracking parameters from URL"""
@@ -215,30 +360,30 @@ class JobDatabase:
 
     def generate_job_hash(self, job_data):
         """Generate unique hash for job based on key fields"""
-        # Normalize data
-        title = job_data.get('title', '').lower().strip()
-        company = job_data.get('company', '').lower().strip()
-        location = job_data.get('location', '').lower().strip()
-        
-        # Create hash from normalized fields
-        hash_string = f"{title}|{company}|{location}"
-        return hashlib.md5(hash_string.encode()).hexdigest()
+        return compute_job_hash(job_data.get('title'), job_data.get('company'), job_data.get('location'))
 
     def job_exists_advanced(self, job_data):
         """Check if job exists using multiple strategies"""
-        
-        # Strategy 1: Clean URL check
+        return self._job_exists(self.conn, job_data)
+
+    def _job_exists(self, conn, job_data):
+        # Strategy 1: Same job id - the cleaned URL, or the id as a whole path segment of an older uncleaned URL
         clean_job_url = self.clean_url(job_data.get('url', ''))
-        cursor = self.conn.execute(
-            "SELECT id FROM jobs WHERE url LIKE ?", 
-            (f"%{clean_job_url.split('/')[-1]}%",)
-        )
-        if cursor.fetchone():
-            return True
+        job_id = clean_job_url.rstrip('/').split('/')[-1]
+        if job_id:
+            cursor = conn.execute("SELECT id FROM jobs WHERE url = ?", (clean_job_url,))
+            if cursor.fetchone():
+                return True
+            # A LIKE scan of the url index narrows to URLs containing the id; the regex then
+            # requires it as a whole path segment, so ".../1" is no duplicate of ".../10"
+            segment = re.compile(rf"/{re.escape(job_id)}(?:[/?#]|$)")
+            cursor = conn.execute("SELECT url FROM jobs WHERE url LIKE ?", (f"%{job_id}%",))
+            if any(segment.search(url) for url, in cursor):
+                return True
         
         # Strategy 2: Hash check
         job_hash = self.generate_job_hash(job_data)
-        cursor = self.conn.execute(
+        cursor = conn.execute(
             "SELECT id FROM jobs WHERE job_hash = ?", 
             (job_hash,)
         )
@@ -246,7 +391,7 @@ class JobDatabase:
             return True
         
         # Strategy 3: Exact match on title+company
-        cursor = self.conn.execute(
+        cursor = conn.execute(
             "SELECT id FROM jobs WHERE LOWER(title) = LOWER(?) AND LOWER(company) = LOWER(?)",
             (job_data['title'], job_data['company'])
         )
@@ -254,7 +399,7 @@ class JobDatabase:
             return True
         
         # Strategy 4: Similar job posted recently (within 24 hours)
-        cursor = self.conn.execute("""
+        cursor = conn.execute("""
             SELECT id FROM jobs 
             WHERE LOWER(title) = LOWER(?) 
             AND LOWER(company) = LOWER(?)
@@ -267,49 +412,385 @@ class JobDatabase:
 
     def add_job(self, job_data):
         """Add job with deduplication"""
-        # Check if exists first
-        if self.job_exists_advanced(job_data):
-            return None  # Skip duplicate
-        
         # Clean URL before storing
         job_data['url'] = self.clean_url(job_data['url'])
         job_data['job_hash'] = self.generate_job_hash(job_data)
+        signature = near_duplicates.signature(job_data.get('description'))
+        city_id = self.normalizer.city_id(job_data.get('location'))
+        
+        def insert(conn):
+            # Check and insert on the writer connection so concurrent adds can't race
+            if self._job_exists(conn, job_data):
+                return None  # Skip duplicate
+            try:
+                # status is explicit: a migrated legacy table still defaults it to 'scraped'
+                cursor = conn.execute('''
+                    INSERT INTO jobs 
+                    (job_id, title, company, location, url, description, description_hash, source, scraped_at, job_hash,
+                     city_id, company_id, status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new')
+                ''', (
+                    job_data.get('job_id'),
+                    job_data['title'],
+                    job_data['company'],
+                    job_data.get('location', ''),
+                    job_data['url'],
+                    job_data.get('description', ''),
+                    compute_description_hash(job_data.get('description')),
+                    job_data.get('source', 'linkedin'),
+                    datetime.now().isoformat(),
+                    job_data['job_hash'],
+                    city_id,
+                    normalization.company_id(conn, job_data['company'])
+                ))
+                if signature is not None:
+                    near_duplicates.assign_cluster(conn, cursor.lastrowid, signature)
+                return cursor.lastrowid
+            except sqlite3.IntegrityError:
+                return None
         
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO jobs 
-                (title, company, location, url, description, source, scraped_at, job_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_data['title'],
-                job_data['company'],
-                job_data.get('location', ''),
-                job_data['url'],
-                job_data.get('description', ''),
-                job_data.get('source', 'linkedin'),
-                datetime.now().isoformat(),
-                job_data['job_hash']
-            ))
-            self.conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
+        return self.writer.transaction(insert).result()
+
+    def get_watermark(self, query, location):
+        """Newest posting seen by previous incremental scrapes of a search, or None"""
+        row = self.conn.execute(
+            'SELECT newest_posting_id, newest_posted_at, last_run_at FROM scrape_watermarks WHERE query = ? AND location = ?',
+            (query, location)
+        ).fetchone()
+        return dict(row) if row else None
+    
+    def save_watermark(self, query, location, watermark):
+        """Record the newest posting seen by an incremental scrape"""
+        self._write('''
+            INSERT OR REPLACE INTO scrape_watermarks (query, location, newest_posting_id, newest_posted_at, last_run_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (query, location, watermark['newest_posting_id'], watermark['newest_posted_at'], watermark['last_run_at']))
+    
+    def get_mail_watermark(self, source):
+        """(validity, position) a mailbox was last read up to, or None"""
+        row = self.conn.execute('SELECT validity, position FROM mail_watermarks WHERE source = ?', (source,)).fetchone()
+        return tuple(row) if row else None
+    
+    def add_email_tracking(self, emails, source=None, watermark=None):
+        """Store tracked emails and advance the mailbox watermark in one commit
+
+        emails are dicts with job_id, subject, sender, date, email_type,
+        message_id, response_type and status (None for emails that are not an
+        employer response). Messages already stored are skipped by Message-ID;
+        responses update their job unless it already has a later one, and move
+        its status forward in STATUS_PROGRESS order, logged to
+        application_history. Returns the number of new emails.
+        """
+        now = datetime.now().isoformat()
+
+        def store(conn):
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT OR IGNORE INTO email_tracking
+                    (job_id, email_subject, email_from, email_date, email_type, message_id, source)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (message['job_id'], message['subject'], message['sender'], message['date'],
+                 message['email_type'], message['message_id'], source)
+                for message in emails
+            ])
+            added = conn.total_changes - before
+            conn.executemany('''
+                UPDATE jobs SET response_received = 1, response_type = ?, response_date = ?
+                WHERE id = ? AND (response_date IS NULL OR response_date <= ?)
+            ''', [
+                (message['response_type'], message['date'] or now, message['job_id'], message['date'] or now)
+                for message in emails if message['job_id'] is not None and message['response_type']
+            ])
+            self._advance_statuses(conn, emails, now)
+            if source is not None and watermark is not None:
+                conn.execute('''
+                    INSERT OR REPLACE INTO mail_watermarks (source, validity, position, updated_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (source, watermark[0], watermark[1], now))
+            return added
+
+        return self.writer.transaction(store).result()
+    
+    @staticmethod
+    def _advance_statuses(conn, emails, now):
+        """Status transitions of tracked emails, in email date order, as JobTracker.update_status logs them"""
+        changes = sorted((message['date'] or now, message['job_id'], message['status'], message['subject'])
+                         for message in emails if message['job_id'] is not None and message.get('status'))
+        if not changes:
+            return
+        job_ids = sorted({job_id for _, job_id, _, _ in changes})
+        current = dict(conn.execute(
+            f"SELECT id, status FROM jobs WHERE id IN ({','.join('?' * len(job_ids))})", job_ids
+        ).fetchall())
+        updates, history = [], []
+        for date, job_id, status, subject in changes:
+            old_status = current.get(job_id, status)
+            if STATUS_PROGRESS.get(status, 0) <= STATUS_PROGRESS.get(old_status, 0):
+                continue
+            current[job_id] = status
+            # A reply to an application implies it was sent, at the latest when the reply came
+            updates.append((status, now, date, job_id))
+            history.append((job_id, f'status_change_{status}', f'Status changed: {old_status} → {status} | Email: {subject}'))
+        conn.executemany(
+            'UPDATE jobs SET status = ?, updated_at = ?, applied_at = COALESCE(applied_at, ?) WHERE id = ?', updates
+        )
+        conn.executemany('INSERT INTO application_history (job_id, action, details) VALUES (?, ?, ?)', history)
+    
+    def get_jobs_needing_requirements(self, after_id=0, limit=500):
+        """Keyset batch of (id, description, description_hash) rows whose stored
+        requirements are missing or older than their description"""
+        return self.conn.execute(
+            f'SELECT id, description, description_hash FROM jobs WHERE {REQUIREMENTS_PENDING} AND id > ? '
+            'ORDER BY id LIMIT ?',
+            (after_id, limit)
+        ).fetchall()
+
+    def count_jobs_needing_requirements(self):
+        """Number of jobs get_jobs_needing_requirements would return in total"""
+        return self.conn.execute(f'SELECT COUNT(*) FROM jobs WHERE {REQUIREMENTS_PENDING}').fetchone()[0]
+
+    def save_requirements(self, results, wait=True):
+        """Store extracted requirements for (job_id, read_hash, description_hash, requirements) tuples
+
+        read_hash is the description_hash the description was read with; rows
+        whose description changed since then are skipped and stay pending.
+        """
+        now = datetime.now().isoformat()
+        future = self.writer.executemany('''
+            UPDATE jobs SET
+                description_hash = ?,
+                requirements_hash = ?,
+                language = ?,
+                degree_requirement = ?,
+                experience_years = ?,
+                quality_score = ?,
+                requirements_found = ?,
+                requirement_flags = ?,
+                requirements_extracted_at = ?
+            WHERE id = ? AND description_hash IS ?
+        ''', [
+            (description_hash, description_hash, requirements['language'], requirements['degree_requirement'],
+             requirements['experience_years'], requirements['quality_score'], requirements['requirements_found'],
+             json.dumps(requirements['flags']), now, job_id, read_hash)
+            for job_id, read_hash, description_hash, requirements in results
+        ])
+        return future.result() if wait else future
+
+    @staticmethod
+    def qualification_filter(excluded_degrees=(), max_experience_years=None):
+        """SQL condition and params keeping jobs whose stored requirements a candidate meets
+
+        Jobs without extracted requirements pass, as they do in pre_qualify_job.
+        """
+        conditions, params = [], []
+        if excluded_degrees:
+            placeholders = ', '.join('?' * len(excluded_degrees))
+            conditions.append(f'(degree_requirement IS NULL OR degree_requirement NOT IN ({placeholders}))')
+            params.extend(excluded_degrees)
+        if max_experience_years is not None:
+            conditions.append('(experience_years IS NULL OR experience_years <= ?)')
+            params.append(max_experience_years)
+        return ' AND '.join(conditions), tuple(params)
+
+    def skip_unqualified(self, excluded_degrees=(), max_experience_years=None):
+        """Mark new, unscored jobs whose stored requirements rule the candidate out as skipped
+
+        Arguments as qualification_filter. The change is logged to
+        application_history; returns how many jobs were skipped.
+        """
+        condition, params = self.qualification_filter(excluded_degrees, max_experience_years)
+        if not condition:
+            return 0
+        now = datetime.now().isoformat()
+        where = f"status = 'new' AND ai_score IS NULL AND NOT ({condition})"
+
+        def skip(conn):
+            conn.execute(f'''
+                INSERT INTO application_history (job_id, action, details)
+                SELECT id, 'status_change_skipped', 'Status changed: new → skipped | Requirements not met'
+                FROM jobs WHERE {where}
+            ''', params)
+            return conn.execute(f"UPDATE jobs SET status = 'skipped', updated_at = ? WHERE {where}",
+                                (now,) + params).rowcount
+
+        return self.writer.transaction(skip).result()
+
+    def get_jobs_for_analysis(self, fields=JOB_ANALYSIS_FIELDS, qualification=None):
+        """Get jobs that need analysis
+
+        qualification: qualification_filter() keyword arguments (see
+        AIJobAnalyzer.qualification); jobs it rules out are skipped
+        """
+        where = f'ai_score IS NULL AND description IS NOT NULL AND LENGTH(description) > 100 AND {near_duplicates.CLUSTER_REPRESENTATIVE}'
+        params = ()
+        if qualification:
+            condition, params = self.qualification_filter(**qualification)
+            if condition:
+                where += f' AND {condition}'
+        return self.select_jobs(fields, where=where, params=params)
+    
+    def get_cluster_analysis(self, job_id):
+        """Analysis already made for this job or one of its near-duplicates, or None"""
+        row = self.conn.execute('''
+            SELECT ai_score, ai_strengths, ai_concerns, ai_fit_assessment, ai_recommendation, id FROM jobs
+            WHERE cluster_id = (SELECT cluster_id FROM jobs WHERE id = ?) AND ai_score IS NOT NULL
+            ORDER BY id = ? DESC, id LIMIT 1
+        ''', (job_id, job_id)).fetchone()
+        if row is None:
             return None
-    def get_jobs_for_analysis(self):
-        """Get jobs that need analysis"""
-        cursor = self.conn.execute('''
-            SELECT * FROM jobs 
-            WHERE ai_score IS NULL 
-            AND description IS NOT NULL 
-            AND LENGTH(description) > 100
-        ''')
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def get_jobs_by_score(self, min_score=70):
+        return {
+            'score': row['ai_score'],
+            'strengths': json.loads(row['ai_strengths'] or '[]'),
+            'concerns': json.loads(row['ai_concerns'] or '[]'),
+            'fit_assessment': row['ai_fit_assessment'] or '',
+            'recommendation': row['ai_recommendation'] or '',
+            'reused_from': row['id'],
+        }
+    
+    def get_jobs_by_score(self, min_score=70, fields=JOB_CARD_FIELDS):
         """Get analyzed jobs sorted by score"""
-        cursor = self.conn.execute('''
-            SELECT * FROM jobs 
-            WHERE ai_score >= ? 
-            ORDER BY ai_score DESC
-        ''', (min_score,))
-        return [dict(row) for row in cursor.fetchall()]
\ No newline at end of file
+        return self.select_jobs(fields, where='ai_score >= ?', params=(min_score,), order_by='ai_score DESC')
+    
+    def get_jobs_page(self, after=None, limit=25, min_score=None, fields=JOB_LIST_FIELDS, statuses=None,
+                      order='score'):
+        """Keyset page in one of PAGE_ORDERS, ties broken by id; returns (rows, next_cursor)
+
+        Pass the returned cursor back as `after` to get the following page.
+        Unscored jobs sort last by score and undated ones last by date.
+        statuses: only jobs with one of these statuses. next_cursor is None on
+        the last page.
+        """
+        key, field, if_null, descending = PAGE_ORDERS[order]
+        fields = tuple(fields)
+        for required in ('id', field):
+            if required not in fields:
+                fields += (required,)
+        
+        conditions, params = [], []
+        if min_score is not None:
+            conditions.append('IFNULL(ai_score, -1) >= ?')
+            params.append(min_score)
+        if statuses:
+            conditions.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if after is not None:
+            # The plain bound lets SQLite seek the index instead of scanning past earlier pages
+            bound, beyond = ('<=', '<') if descending else ('>=', '>')
+            conditions.append(f'{key} {bound} ? AND ({key}, id) {beyond} (?, ?)')
+            params.extend([after[0], after[0], after[1]])
+        
+        direction = 'DESC' if descending else 'ASC'
+        rows = self.select_jobs(
+            fields,
+            where=' AND '.join(conditions),
+            params=params,
+            order_by=f'{key} {direction}, id {direction}',
+            limit=limit + 1
+        )
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        value = last.get(field)
+        return rows, (value if value is not None else if_null, last.id)
+    
+    def get_city_job_counts(self):
+        """Every known city with its coordinates, job count, average score (None when
+        unscored) and high-match count, read from the trigger-maintained city_stats"""
+        return self.conn.execute('''
+            SELECT c.id, c.name, c.latitude, c.longitude,
+                   IFNULL(s.job_count, 0) AS count,
+                   CAST(s.score_sum AS REAL) / NULLIF(s.scored_count, 0) AS avg_score,
+                   IFNULL(s.high_match_count, 0) AS high_matches
+            FROM cities c LEFT JOIN city_stats s ON s.city_id = c.id
+            ORDER BY c.id
+        ''').fetchall()
+    
+    def city_stats_version(self):
+        """Counter bumped by every change to city_stats; a cache key for rendered maps"""
+        return self.conn.execute('SELECT version FROM city_stats_version').fetchone()[0]
+    
+    def find_company_id(self, name):
+        """Id of a known company by any spelling of its name, or None"""
+        row = self.conn.execute(
+            'SELECT company_id FROM company_aliases WHERE alias = ?', (normalization.normalize_company(name),)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def find_companies_in(self, text):
+        """Ids of known companies mentioned in free text (email subjects, bodies, sender names)"""
+        return self.normalizer.company_ids(self.conn, text)
+    
+    def find_job_by_company(self, company, fields=('id', 'title', 'company', 'status', 'applied_at')):
+        """Most recent job at a company, matched by normalized name; None when there is none"""
+        company_id = self.find_company_id(company)
+        if company_id is None:
+            return None
+        rows = self.select_jobs(fields, where='company_id = ?', params=(company_id,), order_by='id DESC', limit=1)
+        return rows[0] if rows else None
+    
+    def get_companies(self, company_ids, fields=COMPANY_FIELDS):
+        """Rows of the given companies with their cached research, in no particular order"""
+        rows = []
+        company_ids = list(company_ids)
+        for start in range(0, len(company_ids), 500):
+            chunk = company_ids[start:start + 500]
+            rows += self.conn.execute(
+                f"SELECT {', '.join(fields)} FROM companies WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            ).fetchall()
+        return rows
+    
+    def get_stale_companies(self, researched_before, limit=None):
+        """Ids of companies with jobs whose research is missing or older than researched_before, most jobs first"""
+        return [row[0] for row in self.conn.execute('''
+            SELECT companies.id FROM companies JOIN jobs ON jobs.company_id = companies.id
+            WHERE companies.researched_at IS NULL OR companies.researched_at < ?
+            GROUP BY companies.id ORDER BY COUNT(*) DESC, companies.id LIMIT ?
+        ''', (researched_before, -1 if limit is None else limit))]
+    
+    def get_company_descriptions(self, company_ids):
+        """{company_id: description} of each company's newest job with a description"""
+        company_ids = list(company_ids)
+        found = {}
+        for start in range(0, len(company_ids), 500):
+            chunk = company_ids[start:start + 500]
+            # Bare column with MAX(): the description of the newest job
+            found.update((company_id, description) for company_id, description, _ in self.conn.execute(f'''
+                SELECT company_id, description, MAX(id) FROM jobs
+                WHERE company_id IN ({', '.join('?' * len(chunk))}) AND description IS NOT NULL
+                GROUP BY company_id
+            ''', chunk))
+        return found
+    
+    def save_company_research(self, research):
+        """Store research dicts (company_id, about, size, careers_url, visa_sponsor) in one commit"""
+        now = datetime.now().isoformat()
+        return self.writer.executemany('''
+            UPDATE companies SET about = ?, size = ?, careers_url = ?, visa_sponsor = ?, researched_at = ?
+            WHERE id = ?
+        ''', [
+            (entry['about'], entry['size'], entry['careers_url'], entry['visa_sponsor'], now, entry['company_id'])
+            for entry in research
+        ]).result()
+    
+    def get_reply_candidates(self, company_ids, fields=('id', 'company_id', 'title', 'status'), newest=5):
+        """Jobs an employer reply may concern: every job of the companies past status 'new',
+        plus each company's newest `newest` unapplied postings (index seeks on company_id, status)"""
+        rows = []
+        company_ids = list(company_ids)
+        for start in range(0, len(company_ids), 100):
+            chunk = company_ids[start:start + 100]
+            newest_per_company = ' '.join(
+                "UNION ALL SELECT id FROM (SELECT id FROM jobs WHERE company_id = ? AND status = 'new' "
+                "ORDER BY id DESC LIMIT ?)" for _ in chunk
+            )
+            where = (f"id IN (SELECT id FROM jobs WHERE company_id IN ({', '.join('?' * len(chunk))}) "
+                     f"AND status <> 'new' {newest_per_company})")
+            params = chunk + [value for company_id in chunk for value in (company_id, newest)]
+            rows += self.select_jobs(fields, where=where, params=params)
+        return rows
+    
+    def get_applied_jobs(self, fields=('id', 'title', 'company', 'applied_at', 'response_type')):
+        """Get applied jobs, including those the employer has since answered, most recent first"""
+        return self.select_jobs(fields, where=_APPLIED, order_by='applied_at DESC')
@@ -0,0 +1,117 @@
+"""
+Full-text search over jobs
+FTS5 index on title, company and description, kept in sync with `jobs` by triggers
+"""
+
+import html
+import re
+from typing import Dict, List
+
+# Control characters used as highlight markers so snippets can be HTML-escaped safely
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+# bm25 column weights: title, company, description
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+_TOKEN_RE = re.compile(r'"([^"]+)"|(\w+)', re.UNICODE)
+
+
+def ensure_fts(conn):
+    """Create the jobs_fts index and its sync triggers (idempotent)"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+    ).fetchone()
+
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, company, description,
+            content='jobs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts(rowid, title, company, description)
+            VALUES (new.id, new.title, new.company, new.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+            VALUES ('delete', old.id, old.title, old.company, old.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, company, description ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+            VALUES ('delete', old.id, old.title, old.company, old.description);
+            INSERT INTO jobs_fts(rowid, title, company, description)
+            VALUES (new.id, new.title, new.company, new.description);
+        END
+    ''')
+
+    if not exists:
+        # Index rows that were stored before the FTS table existed
+        conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+
+def build_match_query(query: str, prefix: bool = True) -> str:
+    """Turn free text into a safe FTS5 MATCH expression
+
+    Bare words are ANDed together and, with prefix=True, matched as prefixes.
+    Double-quoted text is kept as an exact phrase.
+    """
+    terms = []
+    for phrase, word in _TOKEN_RE.findall(query or ''):
+        if phrase:
+            words = re.findall(r'\w+', phrase, re.UNICODE)
+            if words:
+                terms.append('"' + ' '.join(words) + '"')
+        elif word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return ' '.join(terms)
+
+
+def search(conn, query: str, limit: int = 50, prefix: bool = True) -> List[Dict]:
+    """Ranked search returning ids, highlighted titles and description snippets"""
+    match = build_match_query(query, prefix)
+    if not match:
+        return []
+
+    cursor = conn.execute(f'''
+        SELECT rowid AS id,
+               bm25(jobs_fts, {", ".join(str(w) for w in BM25_WEIGHTS)}) AS rank,
+               highlight(jobs_fts, 0, ?, ?) AS title,
+               highlight(jobs_fts, 1, ?, ?) AS company,
+               snippet(jobs_fts, 2, ?, ?, '…', 16) AS snippet
+        FROM jobs_fts
+        WHERE jobs_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    ''', (MARK_START, MARK_END, MARK_START, MARK_END, MARK_START, MARK_END, match, limit))
+    return [
+        {'id': row[0], 'rank': row[1], 'title': row[2], 'company': row[3], 'snippet': row[4]}
+        for row in cursor.fetchall()
+    ]
+
+
+def search_ids(conn, query: str, limit: int = 50, prefix: bool = True) -> List[int]:
+    """Ranked search returning only matching job ids"""
+    match = build_match_query(query, prefix)
+    if not match:
+        return []
+    cursor = conn.execute(f'''
+        SELECT rowid FROM jobs_fts
+        WHERE jobs_fts MATCH ?
+        ORDER BY bm25(jobs_fts, {", ".join(str(w) for w in BM25_WEIGHTS)})
+        LIMIT ?
+    ''', (match, limit))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def to_html(fragment: str) -> str:
+    """Escape a highlighted fragment and turn markers into <mark> tags"""
+    escaped = html.escape(fragment or '')
+    return escaped.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
@@ -0,0 +1,388 @@
+"""
+Schema Migrations
+Versioned, idempotent migrations that converge every jobs.db on one schema.
+
+The applied version is stored in PRAGMA user_version. Each migration is safe to
+re-run, so databases created by the old JobTracker or JobDatabase schemas are
+upgraded in place by adding whatever columns, tables and indexes they lack.
+
+Usage:
+    python src/database/migrations.py [data/jobs.db]
+"""
+
+import hashlib
+import sqlite3
+import sys
+from pathlib import Path
+
+# Allow running as a script: make src/ importable ahead of this directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.company_senders import create_company_senders
+from database.fts import ensure_fts
+from database.normalization import create_city_stats, create_normalization_tables
+from database.run_ledger import create_ledger_tables
+from database.task_queue import create_task_tables
+
+# Canonical jobs columns, in order. Definitions must be valid for ALTER TABLE ADD COLUMN
+# (no UNIQUE / NOT NULL without default / non-constant defaults) except where only
+# used by the initial CREATE TABLE.
+JOBS_COLUMNS = [
+    ('job_id', 'TEXT'),
+    ('title', "TEXT NOT NULL DEFAULT ''"),
+    ('company', "TEXT NOT NULL DEFAULT ''"),
+    ('location', 'TEXT'),
+    ('url', 'TEXT'),
+    ('job_hash', 'TEXT'),
+    ('description', 'TEXT'),
+    ('company_info', 'TEXT'),
+    ('source', "TEXT DEFAULT 'linkedin'"),
+    ('scraped_at', 'TIMESTAMP'),
+    ('enriched_at', 'TIMESTAMP'),
+    ('ai_score', 'INTEGER'),
+    ('ai_match_reasoning', 'TEXT'),
+    ('ai_strengths', 'TEXT'),
+    ('ai_concerns', 'TEXT'),
+    ('ai_fit_assessment', 'TEXT'),
+    ('ai_recommendation', 'TEXT'),
+    ('analyzed_at', 'TIMESTAMP'),
+    ('status', "TEXT DEFAULT 'new'"),
+    ('applied_at', 'TIMESTAMP'),
+    ('application_method', 'TEXT'),
+    ('application_link', 'TEXT'),
+    ('cover_letter', 'TEXT'),
+    ('resume_version', 'TEXT'),
+    ('response_received', 'BOOLEAN DEFAULT 0'),
+    ('response_date', 'TIMESTAMP'),
+    ('response_type', 'TEXT'),
+    ('interview_scheduled', 'BOOLEAN DEFAULT 0'),
+    ('interview_date', 'TIMESTAMP'),
+    ('interview_notes', 'TEXT'),
+    ('offer_date', 'TIMESTAMP'),
+    ('rejection_date', 'TIMESTAMP'),
+    ('outcome', 'TEXT'),
+    ('outcome_date', 'TIMESTAMP'),
+    ('recruiter_name', 'TEXT'),
+    ('recruiter_email', 'TEXT'),
+    ('last_followup_date', 'TIMESTAMP'),
+    ('followup_count', 'INTEGER DEFAULT 0'),
+    ('notes', 'TEXT'),
+    ('salary_range', 'TEXT'),
+    ('remote_option', 'TEXT'),
+    ('visa_sponsorship', 'BOOLEAN'),
+    ('created_at', 'TIMESTAMP'),
+    ('updated_at', 'TIMESTAMP'),
+]
+
+# Requirements read from the description by scrapers/requirement_extractor.py.
+# requirements_hash is the description_hash they were extracted from; a row needs
+# (re-)extraction whenever the two differ.
+REQUIREMENT_COLUMNS = [
+    ('description_hash', 'TEXT'),
+    ('requirements_hash', 'TEXT'),
+    ('language', 'TEXT'),
+    ('degree_requirement', 'TEXT'),
+    ('experience_years', 'INTEGER'),
+    ('quality_score', 'INTEGER'),
+    ('requirements_found', 'BOOLEAN'),
+    ('requirement_flags', 'TEXT'),
+    ('requirements_extracted_at', 'TIMESTAMP'),
+]
+
+# Rows whose stored requirements are missing or stale; shared by the partial
+# index and the query so SQLite can use the index
+REQUIREMENTS_PENDING = "description <> '' AND (description_hash IS NULL OR requirements_hash IS NOT description_hash)"
+
+
+def compute_job_hash(title, company, location):
+    """Dedup hash over normalized title, company and location"""
+    hash_string = f"{(title or '').lower().strip()}|{(company or '').lower().strip()}|{(location or '').lower().strip()}"
+    return hashlib.md5(hash_string.encode()).hexdigest()
+
+
+def compute_description_hash(description):
+    """Content hash of a description, None when there is none"""
+    if not description:
+        return None
+    return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+
+def table_columns(conn, table):
+    """Return the set of column names of a table"""
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()}
+
+
+def add_missing_columns(conn, table, columns):
+    """ALTER TABLE ADD COLUMN for every column the table lacks"""
+    existing = table_columns(conn, table)
+    for name, definition in columns:
+        if name not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+
+def _create_base_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT,
+            title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            location TEXT,
+            url TEXT UNIQUE,
+            job_hash TEXT,
+            description TEXT,
+            company_info TEXT,
+            source TEXT DEFAULT 'linkedin',
+            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS application_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            action TEXT NOT NULL,
+            details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (job_id) REFERENCES jobs(id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS emails (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            subject TEXT,
+            sender TEXT,
+            recipient TEXT,
+            body TEXT,
+            received_date TIMESTAMP,
+            email_type TEXT,
+            FOREIGN KEY (job_id) REFERENCES jobs(id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS interviews (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            interview_type TEXT,
+            scheduled_date TIMESTAMP,
+            duration_minutes INTEGER,
+            interviewer_name TEXT,
+            interviewer_title TEXT,
+            location TEXT,
+            notes TEXT,
+            completed BOOLEAN DEFAULT 0,
+            FOREIGN KEY (job_id) REFERENCES jobs(id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS email_tracking (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            email_subject TEXT,
+            email_from TEXT,
+            email_date TIMESTAMP,
+            email_type TEXT,
+            processed BOOLEAN DEFAULT 0,
+            FOREIGN KEY (job_id) REFERENCES jobs (id)
+        )
+    ''')
+
+
+def _add_jobs_columns(conn):
+    add_missing_columns(conn, 'jobs', JOBS_COLUMNS)
+
+
+def _migrate_legacy_data(conn):
+    """One-shot copy of legacy JobTracker columns into the canonical ones"""
+    columns = table_columns(conn, 'jobs')
+    if 'scraped_date' in columns:
+        conn.execute('UPDATE jobs SET scraped_at = scraped_date WHERE scraped_at IS NULL')
+    if 'applied_date' in columns:
+        conn.execute('UPDATE jobs SET applied_at = applied_date WHERE applied_at IS NULL')
+    conn.execute("UPDATE jobs SET status = 'new' WHERE status = 'scraped' OR status IS NULL")
+    conn.execute('UPDATE jobs SET created_at = scraped_at WHERE created_at IS NULL')
+
+    conn.create_function('compute_job_hash', 3, compute_job_hash, deterministic=True)
+    conn.execute('''
+        UPDATE jobs SET job_hash = compute_job_hash(title, company, location)
+        WHERE job_hash IS NULL
+    ''')
+
+
+def _create_indexes(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_job_hash ON jobs(job_hash)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_job_id ON jobs(job_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_ai_score ON jobs(ai_score)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_scraped_at ON jobs(scraped_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_title_company ON jobs(LOWER(title), LOWER(company))')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_history_job ON application_history(job_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_email_tracking_job ON email_tracking(job_id)')
+
+
+def _create_keyset_index(conn):
+    # Sort key for keyset pagination: unscored jobs sort last
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_score_key ON jobs(IFNULL(ai_score, -1), id)')
+
+
+def _create_scrape_watermarks(conn):
+    # Newest posting seen per search, for incremental scraping
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS scrape_watermarks (
+            query TEXT NOT NULL,
+            location TEXT NOT NULL,
+            newest_posting_id INTEGER,
+            newest_posted_at TEXT,
+            last_run_at TIMESTAMP,
+            PRIMARY KEY (query, location)
+        )
+    ''')
+
+
+def _add_requirement_columns(conn):
+    add_missing_columns(conn, 'jobs', REQUIREMENT_COLUMNS)
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_jobs_requirements_pending ON jobs(id) WHERE {REQUIREMENTS_PENDING}')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_degree_requirement ON jobs(degree_requirement)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_experience_years ON jobs(experience_years)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_language ON jobs(language)')
+    # Writers that change a description without its hash (raw SQL, the legacy
+    # tracker) clear the hash, which marks the row for re-extraction
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_description_hash_reset AFTER UPDATE OF description ON jobs
+        WHEN new.description IS NOT old.description AND new.description_hash IS old.description_hash
+             AND new.description_hash IS NOT NULL
+        BEGIN
+            UPDATE jobs SET description_hash = NULL WHERE id = new.id;
+        END
+    ''')
+
+
+def _create_near_duplicate_tables(conn):
+    # MinHash signatures and LSH band buckets of descriptions; see near_duplicates.py
+    add_missing_columns(conn, 'jobs', [('cluster_id', 'INTEGER'), ('analyzed_from', 'INTEGER')])
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_cluster ON jobs(cluster_id)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_signatures (
+            job_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_signature_bands (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            job_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, job_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_signature_bands_job ON job_signature_bands(job_id)')
+
+
+def _normalize_cities_and_companies(conn):
+    add_missing_columns(conn, 'jobs', [('city_id', 'INTEGER'), ('company_id', 'INTEGER')])
+    create_normalization_tables(conn)
+
+
+def _create_email_ingest(conn):
+    # Message-ID makes re-reading a message a no-op; legacy rows keep NULL
+    add_missing_columns(conn, 'email_tracking', [('message_id', 'TEXT'), ('source', 'TEXT')])
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_email_tracking_message ON email_tracking(message_id)')
+    # High-water mark per mailbox, for incremental ingestion (see utils/mailbox_sources.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS mail_watermarks (
+            source TEXT PRIMARY KEY,
+            validity TEXT,
+            position INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        )
+    ''')
+
+
+def _create_email_matching(conn):
+    create_company_senders(conn)
+    # Reply candidates per company by application status (see get_reply_candidates)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_company_status ON jobs(company_id, status)')
+
+
+def _add_company_research(conn):
+    # Research cached per company (see company_research.py), stale after its TTL
+    add_missing_columns(conn, 'companies', [
+        ('about', 'TEXT'), ('size', 'TEXT'), ('careers_url', 'TEXT'),
+        ('visa_sponsor', 'BOOLEAN'), ('researched_at', 'TIMESTAMP'),
+    ])
+    # Research stored per job so far becomes its company's entry
+    conn.execute('''
+        UPDATE companies SET (about, researched_at) = (
+            SELECT company_info, COALESCE(updated_at, scraped_at) FROM jobs
+            WHERE company_id = companies.id AND company_info IS NOT NULL
+            ORDER BY id DESC LIMIT 1
+        )
+        WHERE about IS NULL AND id IN (SELECT company_id FROM jobs WHERE company_info IS NOT NULL)
+    ''')
+
+
+# Ordered list; the position (1-based) is the schema version it produces.
+# Append only - never reorder or edit a released migration.
+MIGRATIONS = [
+    _create_base_tables,
+    _add_jobs_columns,
+    _migrate_legacy_data,
+    _create_indexes,
+    ensure_fts,
+    _create_keyset_index,
+    create_task_tables,
+    create_ledger_tables,
+    _create_scrape_watermarks,
+    _add_requirement_columns,
+    _create_near_duplicate_tables,
+    _normalize_cities_and_companies,
+    create_city_stats,
+    _create_email_ingest,
+    _create_email_matching,
+    _add_company_research,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_version(conn):
+    """Current schema version of a database"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, target=SCHEMA_VERSION):
+    """Apply all pending migrations up to target; returns the resulting version"""
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        for version, migration in enumerate(MIGRATIONS[:target], 1):
+            if get_version(conn) >= version:
+                continue
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Another process may have migrated while we waited for the lock
+                if get_version(conn) < version:
+                    migration(conn)
+                    conn.execute(f'PRAGMA user_version = {version}')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+    finally:
+        conn.isolation_level = isolation_level
+    return get_version(conn)
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'data/jobs.db'
+    conn = sqlite3.connect(db_path)
+    before = get_version(conn)
+    after = migrate(conn)
+    conn.close()
+    print(f'✅ {db_path}: schema version {before} → {after}')
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate clusters
+Every stored description is MinHash-signed (utils/minhash.py) and indexed by
+its LSH band buckets. A job whose signature matches an earlier job's joins
+that job's cluster (jobs.cluster_id is the id of the cluster's first job), and
+analyses are shared across a cluster: the same role reposted by a recruiter or
+posted in several cities is analyzed once. jobs.analyzed_from records the job
+a copied analysis came from.
+
+Descriptions stored before clustering existed are indexed by:
+    python src/database/near_duplicates.py [data/jobs.db]
+"""
+
+import sys
+from pathlib import Path
+
+# Allow running as a script: make src/ importable ahead of this directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.minhash import MinHasher, from_blob, similarity, to_blob
+
+# Estimated shingle overlap at which two descriptions count as the same posting
+THRESHOLD = 0.8
+
+HASHER = MinHasher()
+
+ANALYSIS_COLUMNS = 'ai_score, ai_strengths, ai_concerns, ai_fit_assessment, ai_recommendation, analyzed_at'
+
+# Only the first unanalyzed job of a cluster needs analysis; the rest get a copy
+CLUSTER_REPRESENTATIVE = '''(cluster_id IS NULL OR id = (
+    SELECT MIN(other.id) FROM jobs other WHERE other.cluster_id = jobs.cluster_id AND other.ai_score IS NULL
+))'''
+
+
+def signature(description):
+    """MinHash signature of a description, None when it has no words"""
+    return HASHER.signature(description)
+
+
+def assign_cluster(conn, job_id, sig):
+    """Index a job's signature and put it in the cluster of its nearest earlier match
+
+    Runs on the writer connection, inside the description write. A job joining
+    an analyzed cluster gets its analysis. Returns the cluster id (None when the
+    description has no words).
+    """
+    conn.execute('DELETE FROM job_signature_bands WHERE job_id = ?', (job_id,))
+    if sig is None:
+        conn.execute('DELETE FROM job_signatures WHERE job_id = ?', (job_id,))
+        conn.execute('UPDATE jobs SET cluster_id = NULL WHERE id = ?', (job_id,))
+        return None
+
+    keys = list(enumerate(HASHER.band_keys(sig)))
+    candidates = conn.execute(f'''
+        SELECT DISTINCT s.job_id, s.signature, j.cluster_id
+        FROM job_signature_bands b
+        JOIN (VALUES {', '.join(['(?, ?)'] * len(keys))}) AS k ON b.band = k.column1 AND b.bucket = k.column2
+        JOIN job_signatures s ON s.job_id = b.job_id
+        JOIN jobs j ON j.id = b.job_id
+        WHERE b.job_id != ?
+    ''', [value for key in keys for value in key] + [job_id]).fetchall()
+    clusters = [
+        cluster_id if cluster_id is not None else other_id
+        for other_id, blob, cluster_id in candidates
+        if similarity(sig, from_blob(blob)) >= THRESHOLD
+    ]
+    cluster_id = min(clusters + [job_id])
+
+    conn.execute('INSERT OR REPLACE INTO job_signatures (job_id, signature) VALUES (?, ?)', (job_id, to_blob(sig)))
+    conn.executemany(
+        'INSERT OR IGNORE INTO job_signature_bands (band, bucket, job_id) VALUES (?, ?, ?)',
+        [(band, bucket, job_id) for band, bucket in keys]
+    )
+    conn.execute('UPDATE jobs SET cluster_id = ? WHERE id = ?', (cluster_id, job_id))
+    if cluster_id != job_id:
+        copy_cluster_analysis(conn, job_id)
+    return cluster_id
+
+
+def copy_cluster_analysis(conn, job_id):
+    """Give an unanalyzed job the analysis of its cluster's first analyzed job"""
+    source = f'''
+        SELECT {ANALYSIS_COLUMNS}, IFNULL(src.analyzed_from, src.id) FROM jobs src
+        WHERE src.cluster_id = jobs.cluster_id AND src.ai_score IS NOT NULL AND src.id != jobs.id
+        ORDER BY src.id LIMIT 1
+    '''
+    return conn.execute(f'''
+        UPDATE jobs SET ({ANALYSIS_COLUMNS}, analyzed_from) = ({source})
+        WHERE id = ? AND ai_score IS NULL AND cluster_id IS NOT NULL AND EXISTS ({source})
+    ''', (job_id,)).rowcount
+
+
+def share_analysis(conn, job_id):
+    """Copy a job's fresh analysis to the unanalyzed jobs of its cluster; returns how many"""
+    return conn.execute(f'''
+        UPDATE jobs SET ({ANALYSIS_COLUMNS}, analyzed_from) = (
+            SELECT {ANALYSIS_COLUMNS}, id FROM jobs WHERE id = ?
+        )
+        WHERE cluster_id = (SELECT cluster_id FROM jobs WHERE id = ?) AND ai_score IS NULL AND id != ?
+    ''', (job_id, job_id, job_id)).rowcount
+
+
+def backfill(db, batch_size=500):
+    """Cluster stored descriptions that have no signature yet; returns how many were indexed"""
+    indexed, after_id = 0, 0
+    while True:
+        rows = db.conn.execute('''
+            SELECT id, description FROM jobs
+            WHERE id > ? AND description <> '' AND id NOT IN (SELECT job_id FROM job_signatures)
+            ORDER BY id LIMIT ?
+        ''', (after_id, batch_size)).fetchall()
+        if not rows:
+            return indexed
+        signed = [(job_id, signature(description)) for job_id, description in rows]
+
+        def index(conn):
+            for job_id, sig in signed:
+                assign_cluster(conn, job_id, sig)
+
+        db.writer.transaction(index).result()
+        indexed += len(rows)
+        after_id = rows[-1][0]
+
+
+if __name__ == '__main__':
+    from database.enhanced_database import JobDatabase
+
+    db = JobDatabase(sys.argv[1] if len(sys.argv) > 1 else 'data/jobs.db')
+    try:
+        count = backfill(db)
+        clusters = db.conn.execute(
+            'SELECT COUNT(DISTINCT cluster_id), COUNT(*) FROM jobs WHERE cluster_id IS NOT NULL AND cluster_id != id'
+        ).fetchone()
+    finally:
+        db.close()
+    print(f'✅ Indexed {count} descriptions; {clusters[1]} jobs are near-duplicates in {clusters[0]} clusters')
@@ -0,0 +1,252 @@
+"""
+Company and location normalization
+Canonical cities and companies with their aliases, so jobs carry indexed
+city_id / company_id columns (set at ingest) and aggregations group by id
+instead of re-scanning free-text locations on every render.
+
+Cities are seeded below with the coordinates the map needs. Companies are
+created on first sight under a normalized key ("Adyen N.V." and "adyen" are
+one company); extra aliases can be added to company_aliases. Free text is
+matched against all aliases at once with an Aho-Corasick automaton.
+"""
+
+import re
+import threading
+
+from utils.aho_corasick import AhoCorasick
+
+# name, region, latitude, longitude, aliases (besides the lowercased name)
+CITIES = [
+    ('Amsterdam', 'North Holland', 52.3676, 4.9041, ['amsterdam area', 'amsterdam-zuidoost']),
+    ('Rotterdam', 'South Holland', 51.9244, 4.4777, []),
+    ('The Hague', 'South Holland', 52.0705, 4.3007, ['den haag', "'s-gravenhage", 's-gravenhage']),
+    ('Utrecht', 'Utrecht', 52.0907, 5.1214, []),
+    ('Eindhoven', 'North Brabant', 51.4416, 5.4697, []),
+    ('Groningen', 'Groningen', 53.2194, 6.5665, []),
+    ('Tilburg', 'North Brabant', 51.5555, 5.0913, []),
+    ('Almere', 'Flevoland', 52.3508, 5.2647, []),
+    ('Breda', 'North Brabant', 51.5719, 4.7683, []),
+    ('Nijmegen', 'Gelderland', 51.8426, 5.8545, []),
+    ('Enschede', 'Overijssel', 52.2215, 6.8937, []),
+    ('Hengelo', 'Overijssel', 52.2659, 6.7931, []),
+    ('Oldenzaal', 'Overijssel', 52.3136, 6.9295, []),
+    ('Rijswijk', 'South Holland', 52.0365, 4.3251, []),
+    ('Delft', 'South Holland', 52.0116, 4.3571, []),
+    ('Leiden', 'South Holland', 52.1601, 4.4970, []),
+    ('Haarlem', 'North Holland', 52.3874, 4.6462, []),
+    ('Amersfoort', 'Utrecht', 52.1561, 5.3878, []),
+    ('Arnhem', 'Gelderland', 51.9851, 5.8987, []),
+    ('Zwolle', 'Overijssel', 52.5168, 6.0830, []),
+    ('Maastricht', 'Limburg', 50.8514, 5.6910, []),
+    ("'s-Hertogenbosch", 'North Brabant', 51.6978, 5.3037, ['den bosch', 's-hertogenbosch']),
+    # Province-level postings ("Overijssel, Netherlands") that name no city
+    ('Overijssel', 'Overijssel', 52.4387, 6.5019, []),
+]
+
+# Trailing words that don't tell companies apart: legal forms and country suffixes
+_COMPANY_SUFFIX = re.compile(
+    r'(\s+(b\s?v|n\s?v|inc|ltd|llc|gmbh|plc|group|holding|holdings|nederland|netherlands|the netherlands))+$'
+)
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def normalize_company(name):
+    """Lookup key of a company name: lowercase words without legal-form suffixes"""
+    key = _NON_WORD.sub(' ', (name or '').lower()).strip()
+    stripped = _COMPANY_SUFFIX.sub('', key)
+    return stripped or key
+
+
+def create_normalization_tables(conn):
+    """Migration: cities, companies and their aliases; fills jobs.city_id / company_id"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cities (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            region TEXT,
+            latitude REAL,
+            longitude REAL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS city_aliases (
+            alias TEXT PRIMARY KEY,
+            city_id INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS companies (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS company_aliases (
+            alias TEXT PRIMARY KEY,
+            company_id INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    # Covers the per-city count / average score aggregate
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_city ON jobs(city_id, ai_score)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company_id)')
+
+    for name, region, latitude, longitude, aliases in CITIES:
+        conn.execute(
+            'INSERT OR IGNORE INTO cities (name, region, latitude, longitude) VALUES (?, ?, ?, ?)',
+            (name, region, latitude, longitude)
+        )
+        city_id = conn.execute('SELECT id FROM cities WHERE name = ?', (name,)).fetchone()[0]
+        conn.executemany(
+            'INSERT OR IGNORE INTO city_aliases (alias, city_id) VALUES (?, ?)',
+            [(alias, city_id) for alias in [name.lower()] + aliases]
+        )
+    backfill(conn)
+
+
+HIGH_MATCH_SCORE = 80
+
+# Per-city deltas of one job row (alias `row` is new or old), for the city_stats triggers
+_CITY_DELTA = """
+    INSERT INTO city_stats (city_id, job_count, scored_count, score_sum, high_match_count)
+    VALUES (row.city_id, {sign}1, {sign}(row.ai_score IS NOT NULL), {sign}IFNULL(row.ai_score, 0),
+            {sign}IFNULL(row.ai_score >= {high}, 0))
+    ON CONFLICT (city_id) DO UPDATE SET
+        job_count = job_count + excluded.job_count,
+        scored_count = scored_count + excluded.scored_count,
+        score_sum = score_sum + excluded.score_sum,
+        high_match_count = high_match_count + excluded.high_match_count;
+"""
+_BUMP_VERSION = 'UPDATE city_stats_version SET version = version + 1;'
+
+
+def create_city_stats(conn):
+    """Migration: per-city job aggregate kept current by triggers
+
+    city_stats holds each city's job count, scored-job count, score sum and
+    high-match count; city_stats_version counts changes to it, so rendered maps
+    can be cached until the numbers they show change.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS city_stats (
+            city_id INTEGER PRIMARY KEY,
+            job_count INTEGER NOT NULL DEFAULT 0,
+            scored_count INTEGER NOT NULL DEFAULT 0,
+            score_sum INTEGER NOT NULL DEFAULT 0,
+            high_match_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('CREATE TABLE IF NOT EXISTS city_stats_version (version INTEGER NOT NULL)')
+    if conn.execute('SELECT COUNT(*) FROM city_stats_version').fetchone()[0] == 0:
+        conn.execute('INSERT INTO city_stats_version (version) VALUES (0)')
+
+    add = _CITY_DELTA.format(sign='', high=HIGH_MATCH_SCORE)
+    remove = _CITY_DELTA.format(sign='-', high=HIGH_MATCH_SCORE)
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS city_stats_ai AFTER INSERT ON jobs WHEN new.city_id IS NOT NULL BEGIN
+            {add.replace('row.', 'new.')}
+            {_BUMP_VERSION}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS city_stats_ad AFTER DELETE ON jobs WHEN old.city_id IS NOT NULL BEGIN
+            {remove.replace('row.', 'old.')}
+            {_BUMP_VERSION}
+        END
+    ''')
+    # Two triggers for an update: the old values leave their city, the new ones join theirs
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS city_stats_au_old AFTER UPDATE OF city_id, ai_score ON jobs
+        WHEN old.city_id IS NOT NULL AND (old.city_id IS NOT new.city_id OR old.ai_score IS NOT new.ai_score) BEGIN
+            {remove.replace('row.', 'old.')}
+            {_BUMP_VERSION}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS city_stats_au_new AFTER UPDATE OF city_id, ai_score ON jobs
+        WHEN new.city_id IS NOT NULL AND (old.city_id IS NOT new.city_id OR old.ai_score IS NOT new.ai_score) BEGIN
+            {add.replace('row.', 'new.')}
+            {_BUMP_VERSION}
+        END
+    ''')
+
+    conn.execute('DELETE FROM city_stats')
+    conn.execute(f'''
+        INSERT INTO city_stats (city_id, job_count, scored_count, score_sum, high_match_count)
+        SELECT city_id, COUNT(*), COUNT(ai_score), IFNULL(SUM(ai_score), 0), IFNULL(SUM(ai_score >= {HIGH_MATCH_SCORE}), 0)
+        FROM jobs WHERE city_id IS NOT NULL GROUP BY city_id
+    ''')
+    conn.execute(_BUMP_VERSION)
+
+
+def company_id(conn, name):
+    """Id of the company a name refers to, created on first sight; None for a blank name"""
+    key = normalize_company(name)
+    if not key:
+        return None
+    row = conn.execute('SELECT company_id FROM company_aliases WHERE alias = ?', (key,)).fetchone()
+    if row:
+        return row[0]
+    new_id = conn.execute('INSERT INTO companies (name) VALUES (?)', (name.strip(),)).lastrowid
+    conn.execute('INSERT INTO company_aliases (alias, company_id) VALUES (?, ?)', (key, new_id))
+    return new_id
+
+
+def backfill(conn):
+    """Set city_id / company_id on jobs that lack them, one mapping per distinct value"""
+    matcher = Normalizer.load(conn)
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS _location_cities (location TEXT PRIMARY KEY, city_id INTEGER)')
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS _company_ids (company TEXT PRIMARY KEY, company_id INTEGER)')
+    locations = [row[0] for row in conn.execute('SELECT DISTINCT location FROM jobs WHERE city_id IS NULL AND location IS NOT NULL')]
+    conn.executemany('INSERT OR REPLACE INTO _location_cities VALUES (?, ?)',
+                     [(location, matcher.city_id(location)) for location in locations])
+    companies = [row[0] for row in conn.execute('SELECT DISTINCT company FROM jobs WHERE company_id IS NULL')]
+    conn.executemany('INSERT OR REPLACE INTO _company_ids VALUES (?, ?)',
+                     [(company, company_id(conn, company)) for company in companies])
+    conn.execute('''
+        UPDATE jobs SET city_id = m.city_id FROM _location_cities m
+        WHERE jobs.city_id IS NULL AND m.location = jobs.location AND m.city_id IS NOT NULL
+    ''')
+    conn.execute('''
+        UPDATE jobs SET company_id = m.company_id FROM _company_ids m
+        WHERE jobs.company_id IS NULL AND m.company = jobs.company AND m.company_id IS NOT NULL
+    ''')
+    conn.execute('DROP TABLE _location_cities')
+    conn.execute('DROP TABLE _company_ids')
+
+
+class Normalizer:
+    """Alias automata for cities and companies, loaded from the database
+
+    The city automaton is fixed once loaded; the company automaton is rebuilt
+    when company_aliases has grown since (new companies arrive with every
+    scrape). Safe to share between threads.
+    """
+
+    def __init__(self, city_aliases, company_aliases=()):
+        self._cities = AhoCorasick(city_aliases)
+        self._companies = AhoCorasick(company_aliases)
+        self._company_count = len(self._companies)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, conn):
+        return cls(conn.execute('SELECT alias, city_id FROM city_aliases').fetchall(),
+                   conn.execute('SELECT alias, company_id FROM company_aliases').fetchall())
+
+    def city_id(self, location):
+        """City named first in a location string ("Delft, South Holland, Netherlands"), or None"""
+        return self._cities.first_word((location or '').lower())
+
+    def company_ids(self, conn, text):
+        """Ids of every company whose name or alias appears in a text, in order of first mention"""
+        with self._lock:
+            count = conn.execute('SELECT COUNT(*) FROM company_aliases').fetchone()[0]
+            if count != self._company_count:
+                self._companies = AhoCorasick(conn.execute('SELECT alias, company_id FROM company_aliases').fetchall())
+                self._company_count = count
+            companies = self._companies
+        found = []
+        for _, _, found_id in companies.find_words(normalize_company(text)):
+            if found_id not in found:
+                found.append(found_id)
+        return found
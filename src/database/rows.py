@@ -0,0 +1,114 @@
+"""
+Column-projected job rows
+Callers name the fields they need; large text columns not selected are loaded lazily on access
+"""
+
+from database.migrations import JOBS_COLUMNS, REQUIREMENT_COLUMNS
+
+# Multi-KB text columns worth skipping unless a caller actually reads them
+LAZY_COLUMNS = frozenset({'description', 'cover_letter', 'company_info', 'ai_match_reasoning'})
+
+# Columns added by later migrations included
+JOB_COLUMN_NAMES = frozenset(
+    ['id', 'cluster_id', 'analyzed_from', 'city_id', 'company_id']
+    + [name for name, _ in JOBS_COLUMNS + REQUIREMENT_COLUMNS]
+)
+
+# Common projections
+JOB_CARD_FIELDS = (
+    'id', 'title', 'company', 'location', 'url', 'status', 'ai_score',
+    'ai_strengths', 'ai_concerns', 'ai_fit_assessment', 'ai_recommendation', 'application_link', 'company_id',
+)
+JOB_LIST_FIELDS = ('id', 'title', 'company', 'location', 'url', 'ai_score', 'status', 'scraped_at')
+JOB_ANALYSIS_FIELDS = ('id', 'title', 'company', 'location', 'url', 'description')
+
+
+class JobRow:
+    """Slotted, read-only row supporting attribute, mapping and .get() access"""
+
+    __slots__ = ('_loader', '_loaded')
+    _fields = ()
+
+    def __init__(self, values, loader=None):
+        for name, value in zip(self._fields, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_loader', loader)
+        object.__setattr__(self, '_loaded', None)
+
+    def __getattr__(self, name):
+        # Only reached for fields that were not selected
+        if name in LAZY_COLUMNS and self._loader is not None and 'id' in self._fields:
+            if self._loaded is None:
+                object.__setattr__(self, '_loaded', {})
+            if name not in self._loaded:
+                self._loaded[name] = self._loader(self.id, name)
+            return self._loaded[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('JobRow is read-only')
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __reduce__(self):
+        return (_rebuild_row, (self._fields, tuple(getattr(self, name) for name in self._fields)))
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'JobRow({values})'
+
+    def get(self, key, default=None):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            return default
+
+    def keys(self):
+        return self._fields
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self._fields}
+
+
+_row_classes = {}
+
+
+def row_class(fields):
+    """Return the (cached) JobRow subclass whose slots are exactly these fields"""
+    fields = tuple(fields)
+    cls = _row_classes.get(fields)
+    if cls is None:
+        unknown = set(fields) - JOB_COLUMN_NAMES
+        if unknown:
+            raise ValueError(f'Unknown job columns: {", ".join(sorted(unknown))}')
+        cls = type('JobRow', (JobRow,), {'__slots__': fields, '_fields': fields})
+        _row_classes[fields] = cls
+    return cls
+
+
+def _rebuild_row(fields, values):
+    return row_class(fields)(values)
+
+
+def fetch_rows(conn, fields, sql_tail='', params=(), loader=None):
+    """SELECT only `fields` FROM jobs, appending sql_tail (WHERE/ORDER/LIMIT)"""
+    cls = row_class(fields)
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(f'SELECT {", ".join(cls._fields)} FROM jobs {sql_tail}', params)
+    return [cls(values, loader) for values in cursor.fetchall()]
+
+
+def load_column(conn, job_id, column):
+    """Fetch a single lazily-loaded column for one job"""
+    if column not in LAZY_COLUMNS:
+        raise ValueError(f'{column} is not a lazily loaded column')
+    row = conn.execute(f'SELECT {column} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    return row[0] if row else None
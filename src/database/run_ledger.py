@@ -0,0 +1,170 @@
+"""
+Pipeline run ledger
+Records every run and the last stage each of its items reached, so an interrupted
+run can be resumed without redoing finished work.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+
+def create_ledger_tables(conn):
+    """Migration: pipeline_runs and pipeline_items tables"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT,
+            status TEXT NOT NULL DEFAULT 'running',
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pipeline_items (
+            run_id INTEGER NOT NULL,
+            item_key TEXT NOT NULL,
+            job_id INTEGER,
+            stage TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'ok',
+            data TEXT,
+            error TEXT,
+            updated_at TIMESTAMP,
+            PRIMARY KEY (run_id, item_key),
+            FOREIGN KEY (run_id) REFERENCES pipeline_runs(id)
+        )
+    ''')
+
+
+class RunLedger:
+    """Checkpoints pipeline runs item by item; every record is committed immediately
+
+    writer: the DatabaseWriter of a JobDatabase on the same file, which then
+    applies every write. Without one, writes go through the ledger's own
+    connection, waiting out other writers' locks.
+    """
+
+    def __init__(self, db_path, writer=None):
+        self.db_path = db_path
+        self.writer = writer
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA busy_timeout = 10000')
+        # Idempotent; lets file-based tools checkpoint into a database JobDatabase never opened
+        self._transaction(create_ledger_tables)
+
+    def close(self):
+        self.conn.close()
+
+    def _execute(self, sql, params=()):
+        """Run a read; returns its rows"""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _transaction(self, fn):
+        """Apply fn(conn) atomically, on the writer when there is one"""
+        if self.writer is not None:
+            return self.writer.transaction(fn).result()
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(self.conn)
+                self.conn.execute('COMMIT')
+                return result
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
+    def start(self, kind, params=None):
+        """Open a new run; returns its id"""
+        now = datetime.now().isoformat()
+        return self._transaction(lambda conn: conn.execute(
+            'INSERT INTO pipeline_runs (kind, params, started_at, updated_at) VALUES (?, ?, ?, ?)',
+            (kind, json.dumps(params or {}), now, now)
+        ).lastrowid)
+
+    def get_run(self, run_id):
+        """Run row with params decoded, or None"""
+        rows = self._execute('SELECT * FROM pipeline_runs WHERE id = ?', (run_id,))
+        if not rows:
+            return None
+        run = dict(rows[0])
+        run['params'] = json.loads(run['params'] or '{}')
+        return run
+
+    def resume(self, run_id, kind):
+        """Reopen a run of the given kind - failed, interrupted or completed_with_errors; returns its params"""
+        run = self.get_run(run_id)
+        if run is None:
+            raise ValueError(f'No pipeline run {run_id}')
+        if run['kind'] != kind:
+            raise ValueError(f'Run {run_id} is a {run["kind"]} run, not {kind}')
+        now = datetime.now().isoformat()
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE pipeline_runs SET status = 'running', updated_at = ?, finished_at = NULL WHERE id = ?",
+            (now, run_id)
+        ))
+        return run['params']
+
+    def finish(self, run_id, status='completed'):
+        """Close a run as completed, completed_with_errors (some items failed) or failed"""
+        now = datetime.now().isoformat()
+        self._transaction(lambda conn: conn.execute(
+            'UPDATE pipeline_runs SET status = ?, updated_at = ?, finished_at = ? WHERE id = ?',
+            (status, now, now, run_id)
+        ))
+
+    def record(self, run_id, item_key, stage, job_id=None, data=None, status='ok', error=None):
+        """Checkpoint that an item reached (or failed at) a stage"""
+        now = datetime.now().isoformat()
+
+        def checkpoint(conn):
+            conn.execute('''
+                INSERT INTO pipeline_items (run_id, item_key, job_id, stage, status, data, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run_id, item_key) DO UPDATE SET
+                    job_id = COALESCE(excluded.job_id, job_id),
+                    stage = excluded.stage,
+                    status = excluded.status,
+                    data = COALESCE(excluded.data, data),
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+            ''', (run_id, item_key, job_id, stage, status,
+                  json.dumps(data) if data is not None else None, error, now))
+            conn.execute('UPDATE pipeline_runs SET updated_at = ? WHERE id = ?', (now, run_id))
+
+        self._transaction(checkpoint)
+
+    def items(self, run_id, stage=None, status=None):
+        """Items of a run, optionally only those at a stage and/or with a status"""
+        sql = 'SELECT * FROM pipeline_items WHERE run_id = ?'
+        params = [run_id]
+        if stage is not None:
+            sql += ' AND stage = ?'
+            params.append(stage)
+        if status is not None:
+            sql += ' AND status = ?'
+            params.append(status)
+        rows = self._execute(sql + ' ORDER BY rowid', params)
+        items = []
+        for row in rows:
+            item = dict(row)
+            item['data'] = json.loads(item['data']) if item['data'] else None
+            items.append(item)
+        return items
+
+    def progress(self, run_id):
+        """Item counts by (stage, status)"""
+        rows = self._execute('''
+            SELECT stage, status, COUNT(*) FROM pipeline_items WHERE run_id = ? GROUP BY stage, status
+        ''', (run_id,))
+        return {(row[0], row[1]): row[2] for row in rows}
+
+    def runs(self, limit=20):
+        """Most recent runs, newest first"""
+        rows = self._execute('SELECT * FROM pipeline_runs ORDER BY id DESC LIMIT ?', (limit,))
+        return [dict(row) for row in rows]
@@ -0,0 +1,264 @@
+"""
+Durable task queue
+SQLite-backed queue of enrich/analyze/apply_link/cover_letter work with leases,
+heartbeats, retries and priorities, shared by any number of worker processes
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+TASK_TYPES = ('enrich', 'analyze', 'apply_link', 'cover_letter')
+
+
+def create_task_tables(conn):
+    """Migration: tasks and workers tables"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_type TEXT NOT NULL,
+            job_id INTEGER,
+            payload TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            priority INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            available_at REAL NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            heartbeat_at REAL,
+            last_error TEXT,
+            result TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP,
+            FOREIGN KEY (job_id) REFERENCES jobs(id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks(status, priority DESC, available_at, id)')
+    # Active tasks are unique per (type, job) so re-enqueueing is a no-op
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_active ON tasks(task_type, job_id)
+        WHERE status IN ('queued', 'running')
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS workers (
+            worker_id TEXT PRIMARY KEY,
+            task_types TEXT,
+            pid INTEGER,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            heartbeat_at REAL
+        )
+    ''')
+
+
+class TaskQueue:
+    """Enqueue, claim and settle tasks; safe across threads and processes
+
+    writer: the DatabaseWriter of a JobDatabase on the same file, which then
+    applies every write (JobDatabase.tasks passes its own). Without one, writes
+    go through this queue's connection, waiting out other writers' locks.
+    """
+
+    def __init__(self, db_path, lease_seconds=300, retry_backoff=30, writer=None):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self.writer = writer
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA busy_timeout = 10000')
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self, fn):
+        if self.writer is not None:
+            return self.writer.transaction(fn).result()
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(self.conn)
+                self.conn.execute('COMMIT')
+                return result
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
+    # --- producers -------------------------------------------------------
+
+    def enqueue(self, task_type, job_id=None, payload=None, priority=0, max_attempts=3):
+        """Add a task; returns its id, or None if the same task is already active"""
+        ids = self.enqueue_many(task_type, [job_id], payload, priority, max_attempts)
+        return ids[0] if ids else None
+
+    def enqueue_many(self, task_type, job_ids, payload=None, priority=0, max_attempts=3):
+        """Add one task per job id in a single transaction; returns ids of newly queued tasks"""
+        if task_type not in TASK_TYPES:
+            raise ValueError(f'Unknown task type: {task_type}')
+        payload_json = json.dumps(payload) if payload is not None else None
+
+        def insert(conn):
+            ids = []
+            for job_id in job_ids:
+                cursor = conn.execute('''
+                    INSERT OR IGNORE INTO tasks (task_type, job_id, payload, priority, max_attempts, available_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (task_type, job_id, payload_json, priority, max_attempts, time.time()))
+                if cursor.rowcount:
+                    ids.append(cursor.lastrowid)
+            return ids
+
+        return self._transaction(insert)
+
+    def cancel(self, task_type=None):
+        """Cancel queued (not yet running) tasks; returns how many"""
+        sql = "UPDATE tasks SET status = 'cancelled', finished_at = ? WHERE status = 'queued'"
+        params = [datetime.now().isoformat()]
+        if task_type:
+            sql += ' AND task_type = ?'
+            params.append(task_type)
+        return self._transaction(lambda conn: conn.execute(sql, params).rowcount)
+
+    # --- consumers -------------------------------------------------------
+
+    def claim(self, worker_id, task_types=None):
+        """Lease the highest-priority runnable task, or return None"""
+        task_types = tuple(task_types or TASK_TYPES)
+        placeholders = ', '.join('?' * len(task_types))
+
+        def take(conn):
+            now = time.time()
+            # Requeue (or give up on) tasks whose worker stopped heartbeating
+            conn.execute('''
+                UPDATE tasks SET
+                    status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                    finished_at = CASE WHEN attempts >= max_attempts THEN ? END,
+                    lease_owner = NULL,
+                    last_error = 'lease expired'
+                WHERE status = 'running' AND lease_expires_at < ?
+            ''', (datetime.now().isoformat(), now))
+            row = conn.execute(f'''
+                SELECT id FROM tasks
+                WHERE status = 'queued' AND available_at <= ? AND task_type IN ({placeholders})
+                ORDER BY priority DESC, id
+                LIMIT 1
+            ''', (now,) + task_types).fetchone()
+            if row is None:
+                return None
+            conn.execute('''
+                UPDATE tasks SET status = 'running', lease_owner = ?, lease_expires_at = ?,
+                    heartbeat_at = ?, attempts = attempts + 1
+                WHERE id = ?
+            ''', (worker_id, now + self.lease_seconds, now, row['id']))
+            return self._task(conn.execute('SELECT * FROM tasks WHERE id = ?', (row['id'],)).fetchone())
+
+        return self._transaction(take)
+
+    def heartbeat(self, task_id, worker_id):
+        """Extend a lease; returns False if the worker no longer owns the task"""
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute('''
+            UPDATE tasks SET heartbeat_at = ?, lease_expires_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+        ''', (now, now + self.lease_seconds, task_id, worker_id)).rowcount == 1)
+
+    def complete(self, task_id, worker_id, result=None):
+        """Mark a leased task done"""
+        return self._transaction(lambda conn: conn.execute('''
+            UPDATE tasks SET status = 'done', result = ?, lease_owner = NULL, finished_at = ?
+            WHERE id = ? AND lease_owner = ?
+        ''', (json.dumps(result), datetime.now().isoformat(), task_id, worker_id)).rowcount == 1)
+
+    def fail(self, task_id, worker_id, error):
+        """Record a failure; retried with exponential backoff until max_attempts"""
+        def settle(conn):
+            row = conn.execute(
+                'SELECT attempts, max_attempts FROM tasks WHERE id = ? AND lease_owner = ?',
+                (task_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            if row['attempts'] >= row['max_attempts']:
+                conn.execute('''
+                    UPDATE tasks SET status = 'failed', last_error = ?, lease_owner = NULL, finished_at = ?
+                    WHERE id = ?
+                ''', (str(error), datetime.now().isoformat(), task_id))
+            else:
+                delay = self.retry_backoff * 2 ** (row['attempts'] - 1)
+                conn.execute('''
+                    UPDATE tasks SET status = 'queued', last_error = ?, lease_owner = NULL, available_at = ?
+                    WHERE id = ?
+                ''', (str(error), time.time() + delay, task_id))
+            return True
+
+        return self._transaction(settle)
+
+    # --- workers ---------------------------------------------------------
+
+    def register_worker(self, worker_id, task_types):
+        self._transaction(lambda conn: conn.execute('''
+            INSERT OR REPLACE INTO workers (worker_id, task_types, pid, heartbeat_at) VALUES (?, ?, ?, ?)
+        ''', (worker_id, ','.join(task_types), os.getpid(), time.time())))
+
+    def worker_heartbeat(self, worker_id):
+        self._transaction(lambda conn: conn.execute(
+            'UPDATE workers SET heartbeat_at = ? WHERE worker_id = ?', (time.time(), worker_id)
+        ))
+
+    def unregister_worker(self, worker_id):
+        self._transaction(lambda conn: conn.execute('DELETE FROM workers WHERE worker_id = ?', (worker_id,)))
+
+    def live_workers(self, task_type=None, max_age=60):
+        """Workers that heartbeated within max_age seconds, optionally serving task_type"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT * FROM workers WHERE heartbeat_at >= ?', (time.time() - max_age,)
+            ).fetchall()
+        workers = [dict(row) for row in rows]
+        if task_type:
+            workers = [w for w in workers if task_type in (w['task_types'] or '').split(',')]
+        return workers
+
+    # --- observers -------------------------------------------------------
+
+    def stats(self, task_type=None, since_id=0):
+        """Task counts by status, optionally for one type and tasks with id >= since_id"""
+        sql = 'SELECT status, COUNT(*) FROM tasks WHERE id >= ?'
+        params = [since_id]
+        if task_type:
+            sql += ' AND task_type = ?'
+            params.append(task_type)
+        with self._lock:
+            rows = self.conn.execute(sql + ' GROUP BY status', params).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def first_active_id(self, task_type):
+        """Lowest id among queued or running tasks of a type, or None"""
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT MIN(id) FROM tasks WHERE task_type = ? AND status IN ('queued', 'running')
+            ''', (task_type,)).fetchone()
+        return row[0]
+
+    def recent_errors(self, limit=10):
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT id, task_type, job_id, last_error FROM tasks
+                WHERE last_error IS NOT NULL ORDER BY id DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _task(row):
+        task = dict(row)
+        task['payload'] = json.loads(task['payload']) if task['payload'] else {}
+        return task
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
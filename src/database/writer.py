@@ -0,0 +1,211 @@
+"""
+Single-writer database queue
+One thread owns the only write connection and group-commits queued commands
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+WriteResult = namedtuple('WriteResult', ['lastrowid', 'rowcount'])
+
+_STOP = object()
+
+
+class WriteCommand:
+    """A unit of work run on the writer connection inside its own savepoint"""
+
+    def apply(self, conn):
+        raise NotImplementedError
+
+
+class Execute(WriteCommand):
+    """Single statement; resolves to a WriteResult"""
+
+    def __init__(self, sql, params=()):
+        self.sql = sql
+        self.params = params
+
+    def apply(self, conn):
+        cursor = conn.execute(self.sql, self.params)
+        return WriteResult(cursor.lastrowid, cursor.rowcount)
+
+
+class ExecuteMany(WriteCommand):
+    """Statement run for every parameter tuple; resolves to the total rowcount"""
+
+    def __init__(self, sql, seq_of_params):
+        self.sql = sql
+        self.seq_of_params = list(seq_of_params)
+
+    def apply(self, conn):
+        return conn.executemany(self.sql, self.seq_of_params).rowcount
+
+
+class Transaction(WriteCommand):
+    """Arbitrary function of the connection, applied atomically; resolves to its return value"""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def apply(self, conn):
+        return self.fn(conn)
+
+
+class _Barrier(WriteCommand):
+    def apply(self, conn):
+        return None
+
+
+class DatabaseWriter:
+    """Owns the write connection; commits whatever has queued up, up to M ops, in one transaction
+
+    A command arriving while a commit is in progress waits for it and goes in
+    the next batch, so concurrent writers share commits while a lone write is
+    committed immediately. batch_ms optionally waits that long for more
+    commands before committing. If the writer thread dies, every pending
+    command fails with its error, and so does everything submitted afterwards.
+
+    JobDatabase, its TaskQueue and the RunLedger of a streaming run all write
+    through it. The one exception is a standalone TaskQueue or RunLedger (one
+    given no writer, as file-based tools use), which writes on its own
+    connection with a busy timeout.
+    """
+
+    def __init__(self, db_path, batch_ms=0, batch_size=200):
+        self.db_path = db_path
+        self.batch_ms = batch_ms
+        self.batch_size = batch_size
+        self.commits = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._error = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, command):
+        """Queue a WriteCommand; returns a Future resolved after its batch commits"""
+        if self._closed:
+            raise RuntimeError('DatabaseWriter is closed')
+        future = Future()
+        with self._lock:
+            if self._error is not None:
+                future.set_exception(self._error)
+            else:
+                self._queue.put((command, future))
+        return future
+
+    def execute(self, sql, params=()):
+        return self.submit(Execute(sql, params))
+
+    def executemany(self, sql, seq_of_params):
+        return self.submit(ExecuteMany(sql, seq_of_params))
+
+    def transaction(self, fn):
+        return self.submit(Transaction(fn))
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is committed"""
+        self.submit(_Barrier()).result(timeout)
+
+    def close(self):
+        """Commit pending work and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA busy_timeout = 5000')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _next_batch(self):
+        """Block for one command, then take what else is queued; (batch, stopping)"""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.batch_ms / 1000
+        while len(batch) < self.batch_size:
+            try:
+                timeout = deadline - time.monotonic()
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        conn = None
+        batch = []
+        try:
+            conn = self._connect()
+            stopping = False
+            while not stopping:
+                batch, stopping = self._next_batch()
+                if batch:
+                    self._commit_batch(conn, batch)
+        except BaseException as e:
+            self._fail(e, batch)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _fail(self, error, batch):
+        """Fail the unresolved commands of the batch in progress, everything queued and all later submissions"""
+        with self._lock:
+            self._error = error
+        pending = list(batch)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _commit_batch(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+        except sqlite3.Error as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for command, future in batch:
+            conn.execute('SAVEPOINT write_command')
+            try:
+                outcomes.append((future, command.apply(conn), None))
+                conn.execute('RELEASE write_command')
+            except Exception as e:
+                conn.execute('ROLLBACK TO write_command')
+                conn.execute('RELEASE write_command')
+                outcomes.append((future, None, e))
+
+        try:
+            conn.execute('COMMIT')
+            self.commits += 1
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            outcomes = [(future, None, error or e) for future, _, error in outcomes]
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
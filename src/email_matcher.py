@@ -0,0 +1,153 @@
+"""
+Email Matcher
+Classifies employer emails (see analyzers/email_classifier.py) and matches them
+to jobs through lookup tables, instead of a company query per email:
+
+    sender domain  -> company   company_senders (apply links, recruiter addresses)
+    ATS tenant     -> company   company_senders, for Greenhouse / Lever / Workday / ... senders
+    company alias  -> company   one Aho-Corasick pass over sender name, subject and body
+    company        -> jobs      one query per batch, candidates ranked by evidence,
+                                status and recency
+
+Mail relayed by an applicant tracking system or job board carries no company in
+its domain, so it is attributed through the tenant it names or the company it
+mentions.
+"""
+
+from collections import defaultdict
+from email.utils import parseaddr
+
+from analyzers.email_classifier import default_classifier
+from database.company_senders import ATS_DOMAINS, RELAY_DOMAINS, registered_domain, tenant_key
+from database.normalization import normalize_company
+from utils.aho_corasick import AhoCorasick
+
+# Sender local parts and subdomains that never name an employer
+GENERIC_MAILBOX_WORDS = {
+    'no-reply', 'noreply', 'donotreply', 'do-not-reply', 'notifications', 'notification', 'mailer',
+    'jobs', 'job', 'careers', 'career', 'talent', 'recruiting', 'recruitment', 'hire', 'hiring', 'hr',
+    'mail', 'email', 'messages', 'info', 'support', 'app', 'www', 'us', 'eu', 'apply',
+}
+
+# Trailing tokens of normalized company names that are really top-level domains ("booking com")
+_TLD_TOKENS = {'com', 'nl', 'io', 'net', 'org', 'eu', 'co', 'app', 'ai', 'de', 'uk', 'tech'}
+
+# Evidence that an email concerns a company, strongest first
+DOMAIN, TENANT, SENDER_NAME, SUBJECT, BODY = 4, 3, 2, 2, 1
+
+# Application progress: replies most likely concern jobs further along
+STATUS_RANK = {'offer': 3, 'interview_scheduled': 3, 'interviewed': 3, 'applied': 2, 'rejected': 1}
+
+# Fields of candidate jobs
+MATCH_FIELDS = ('id', 'company_id', 'title', 'status', 'applied_at', 'created_at', 'scraped_at')
+
+
+def _compact(alias):
+    """Company alias as it appears in a domain label or slug: "booking com" -> "booking" """
+    tokens = alias.split()
+    while len(tokens) > 1 and tokens[-1] in _TLD_TOKENS:
+        tokens.pop()
+    return ''.join(tokens)
+
+
+class EmailMatcher:
+    """Lookup tables over the companies known when it was built
+
+    company_aliases: (alias, company_id) pairs from company_aliases
+    senders: (key, company_id) pairs from company_senders
+    candidates: function from a list of company ids to the jobs replies may concern (MATCH_FIELDS rows)
+    classifier: EmailClassifier for the email types (default: the built-in model)
+    """
+
+    def __init__(self, company_aliases, senders, candidates, classifier=None):
+        company_aliases = list(company_aliases)
+        self._companies = AhoCorasick(company_aliases)
+        self._senders = dict(senders)
+        # Company names as they appear in domains and ATS slugs
+        for alias, company_id in company_aliases:
+            self._senders.setdefault(tenant_key(_compact(alias)), company_id)
+            self._senders.setdefault('label:' + _compact(alias), company_id)
+        self._candidates = candidates
+        self._classifier = classifier or default_classifier()
+
+    @classmethod
+    def load(cls, db):
+        """Build from the database: two reads of small tables, then one jobs query per batch"""
+        return cls(db.conn.execute('SELECT alias, company_id FROM company_aliases').fetchall(),
+                   db.conn.execute('SELECT key, company_id FROM company_senders').fetchall(),
+                   lambda company_ids: db.get_reply_candidates(company_ids, MATCH_FIELDS))
+
+    def sender_company(self, address):
+        """(company_id, evidence) named by a sender address, or (None, 0)"""
+        local, _, host = address.lower().rpartition('@')
+        if not host:
+            return None, 0
+        domain = registered_domain(host)
+        if domain not in RELAY_DOMAINS:
+            company_id = self._senders.get(domain) or self._senders.get('label:' + domain.split('.')[0])
+            return (company_id, DOMAIN) if company_id else (None, 0)
+        if domain in ATS_DOMAINS:
+            # Workday and others send as <tenant>@ or from <tenant>.<ats domain>
+            subdomains = host[:-len(domain)].strip('.').split('.') if host != domain else []
+            for word in [local, *subdomains]:
+                if word and word not in GENERIC_MAILBOX_WORDS:
+                    company_id = self._senders.get(tenant_key(word))
+                    if company_id:
+                        return company_id, TENANT
+        return None, 0
+
+    def _mentioned(self, text):
+        found = []
+        for _, _, company_id in self._companies.find_words(normalize_company(text)):
+            if company_id not in found:
+                found.append(company_id)
+        return found
+
+    def companies(self, message):
+        """{company_id: evidence} for the companies an email concerns"""
+        evidence = {}
+        name, address = parseaddr(message.sender)
+        company_id, weight = self.sender_company(address)
+        if company_id:
+            evidence[company_id] = weight
+        for text, weight in ((name, SENDER_NAME), (message.subject, SUBJECT), (message.body, BODY)):
+            for company_id in self._mentioned(text) if text else ():
+                evidence[company_id] = max(evidence.get(company_id, 0), weight)
+        return evidence
+
+    @staticmethod
+    def _best(message, evidence, jobs):
+        """Job an email most likely concerns among the jobs of the companies it names
+
+        Ranked by evidence for the company, then application status, then
+        whether the application predates the email and the job title appears
+        in the subject, then recency.
+        """
+        subject = message.subject.lower()
+        best_key, best_id = None, None
+        for company_id, weight in evidence.items():
+            for job in jobs.get(company_id, ()):
+                title = (job.title or '').lower()
+                applied_before = bool(job.applied_at) and (not message.date or job.applied_at[:19] <= message.date[:19])
+                key = (weight, STATUS_RANK.get(job.status, 0), applied_before, bool(title) and title in subject,
+                       job.applied_at or job.created_at or job.scraped_at or '', job.id)
+                if best_key is None or key > best_key:
+                    best_key, best_id = key, job.id
+        return best_id
+
+    def match_batch(self, messages):
+        """(job_id, email_type) for each message, in order, with one candidate lookup and one
+        classifier pass for the batch"""
+        evidence = [self.companies(message) for message in messages]
+        jobs = defaultdict(list)
+        company_ids = sorted({company_id for found in evidence for company_id in found})
+        for job in self._candidates(company_ids) if company_ids else ():
+            jobs[job.company_id].append(job)
+        email_types = self._classifier.classify([message.subject for message in messages],
+                                                [message.body for message in messages])
+        return [(self._best(message, found, jobs), email_type)
+                for message, found, email_type in zip(messages, evidence, email_types)]
+
+    def match(self, message):
+        """Job an email most likely concerns, or None"""
+        return self.match_batch([message])[0][0]
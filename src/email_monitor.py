@@ -1,51 +1,75 @@
-# src/email_monitor.py
-import json
-from datetime import datetime, timedelta
+"""
+Email Monitor
+Tracks employer responses to applications from a mailbox: an mbox file, a
+Maildir, or an IMAP folder (see utils/mailbox_sources.py).
+
+Each run reads only mail that arrived since the previous one, resuming from the
+mailbox's watermark in mail_watermarks. Messages are classified and matched to
+jobs a batch at a time (see email_matcher.py); each batch is written to
+email_tracking in one commit together with the watermark it reaches. Responses
+move their job forward (applied -> interview_scheduled -> rejected / offer),
+logged in application_history like JobTracker.update_status.
+
+Usage:
+    python main.py emails --mailbox ~/Mail/jobs.mbox
+    python main.py emails --mailbox imaps://imap.gmail.com/INBOX --imap-user me@gmail.com
+"""
+
+import logging
+
+from email_matcher import EmailMatcher
+
+logger = logging.getLogger(__name__)
+
+# Employer responses recorded on the job, in the values the tracker UI uses
+RESPONSE_TYPES = {
+    'interview_invite': 'Interview',
+    'offer': 'Offer',
+    'rejection': 'Rejected',
+}
+
+# Job status each email type moves an application to
+EMAIL_STATUS = {
+    'application_confirmed': 'applied',
+    'interview_invite': 'interview_scheduled',
+    'offer': 'offer',
+    'rejection': 'rejected',
+}
+
 
 class EmailMonitor:
-    def __init__(self, db):
+    def __init__(self, db, batch_size=200):
         self.db = db
-    
-    def check_application_responses(self):
-        """Monitor Gmail for job responses using MCP"""
-        # Search for job-related emails from last 7 days
-        since_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-        
-        # Use conversation_search to find job-related emails
-        search_query = "application confirmation interview offer rejection"
-        
-        # This would use the actual Gmail MCP tool
-        # For now, showing the structure
-        results = self.search_recent_emails(search_query, since_date)
-        
-        for email in results:
-            self.process_job_email(email)
-    
-    def process_job_email(self, email):
-        """Process and categorize job email"""
-        subject = email.get('subject', '').lower()
-        from_email = email.get('from', '')
-        
-        # Determine email type
-        if 'confirmation' in subject or 'received' in subject:
-            email_type = 'application_confirmed'
-        elif 'interview' in subject:
-            email_type = 'interview_invite'
-        elif 'offer' in subject:
-            email_type = 'offer'
-        elif 'reject' in subject or 'unfortunately' in subject:
-            email_type = 'rejection'
-        else:
-            email_type = 'other'
-        
-        # Try to match to a job
-        company = self.extract_company_from_email(from_email)
-        job = self.db.find_job_by_company(company)
-        
-        if job:
-            # Update job status
-            self.db.add_email_tracking(job['id'], email)
-            
-            if email_type == 'interview_invite':
-                # Parse interview details and add to calendar
-                self.schedule_interview(job, email)
\ No newline at end of file
+        self.batch_size = batch_size
+
+    def check_application_responses(self, source):
+        """Ingest new mail from a mailbox source; returns the number of emails tracked"""
+        matcher = EmailMatcher.load(self.db)
+        start = watermark = self.db.get_mail_watermark(source.name)
+        batch, tracked = [], 0
+        for message, watermark in source.read(watermark):
+            batch.append(message)
+            if len(batch) >= self.batch_size:
+                tracked += self.db.add_email_tracking(self.process_emails(batch, matcher), source.name, watermark)
+                batch = []
+        if batch or watermark != start:
+            tracked += self.db.add_email_tracking(self.process_emails(batch, matcher), source.name, watermark)
+        logger.info('Tracked %d new emails from %s', tracked, source.name)
+        return tracked
+
+    def process_emails(self, messages, matcher=None):
+        """Classify MailMessages and match them to jobs; returns email_tracking records"""
+        matcher = matcher or EmailMatcher.load(self.db)
+        return [
+            {
+                'job_id': job_id,
+                'subject': message.subject,
+                'sender': message.sender,
+                'date': message.date,
+                'email_type': email_type,
+                'message_id': message.message_id,
+                'response_type': RESPONSE_TYPES.get(email_type),
+                'status': EMAIL_STATUS.get(email_type),
+            }
+            for message, (job_id, email_type) in zip(messages, matcher.match_batch(messages))
+        ]
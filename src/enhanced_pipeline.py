@@ -86,7 +86,9 @@ class JobSearchPlatform:
     
     def analyze_new_jobs(self):
         """Analyze all unanalyzed jobs"""
-        jobs = self.db.get_jobs_for_analysis()
+        qualification = self.analyzer.qualification()
+        self.db.skip_unqualified(**qualification)
+        jobs = self.db.get_jobs_for_analysis(qualification=qualification)
         
         for job in jobs:
             print(f"Analyzing {job['title']} at {job['company']}...")
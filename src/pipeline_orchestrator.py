@@ -12,14 +12,25 @@ sys.path.insert(0, str(Path(__file__).parent))
 from scrapers.linkedin_scraper import LinkedInScraper
 from scrapers.smart_description_enricher import SmartDescriptionEnricher
 from analyzers.analyzer_ai import AIJobAnalyzer
+from company_research import CompanyResearch
 from database.database import JobTracker
+from database.enhanced_database import JobDatabase
+from database.run_ledger import RunLedger
+from streaming_pipeline import Stage, StreamingPipeline
 
 class JobSearchPipeline:
-    def __init__(self):
-        self.scraper = LinkedInScraper()
-        self.enricher = SmartDescriptionEnricher()
-        self.analyzer = AIJobAnalyzer()
-        self.database = JobTracker()
+    def __init__(self, scraper=None, enricher=None, analyzer=None, database=None):
+        """database: JobTracker for run_full_pipeline (default: data/jobs.db, opened on first use)"""
+        self.scraper = scraper or LinkedInScraper()
+        self.enricher = enricher or SmartDescriptionEnricher()
+        self.analyzer = analyzer or AIJobAnalyzer()
+        self._database = database
+    
+    @property
+    def database(self):
+        if self._database is None:
+            self._database = JobTracker()
+        return self._database
         
     def run_full_pipeline(self, query="Python Developer", location="Netherlands"):
         """Complete end-to-end pipeline"""
@@ -98,12 +109,156 @@ class JobSearchPipeline:
                 print("   📝 Decent match - Consider applying")
         
         # Step 5: Save report
-        self.generate_report(analyzed_jobs)
+        self.generate_report(analyzed_jobs, Path(self.database.db_path).parent)
+        
+        return analyzed_jobs
+    
+    def run_streaming(self, queries=("Python Developer",), location="Netherlands",
+                      enrich_concurrency=2, analyze_concurrency=4, min_score=80, db=None,
+                      run_id=None, skip_enrich=False, time_filter=None, max_jobs_per_query=None,
+                      analyze_rate_limiter=None):
+        """Scrape, enrich and analyze concurrently; matches print as soon as they are scored
+
+        Every query and job is checkpointed in the run ledger. Pass run_id to resume
+        an interrupted run: finished queries are not re-scraped and jobs continue
+        from the last stage they completed.
+        """
+        # JobDatabase reads per-thread and funnels writes through one writer, so stages can share it
+        db = db or JobDatabase()
+        ledger = RunLedger(db.db_path, writer=db.writer)
+        research = CompanyResearch(db)
+        
+        if run_id is None:
+            run_id = ledger.start('streaming', {
+                'queries': list(queries), 'location': location,
+                'time_filter': time_filter, 'max_jobs_per_query': max_jobs_per_query,
+            })
+            source = list(queries)
+        else:
+            params = ledger.resume(run_id, 'streaming')
+            location = params['location']
+            time_filter = params.get('time_filter')
+            max_jobs_per_query = params.get('max_jobs_per_query')
+            items = ledger.items(run_id)
+            scraped = {item['item_key'] for item in items if item['item_key'].startswith('query:')}
+            # Jobs that were scraped but never finished analysis (failures stay failed)
+            unfinished = [
+                dict(item['data'], id=item['job_id']) if item['job_id'] else item['data']
+                for item in items
+                if item['item_key'].startswith('job:') and item['stage'] != 'analyzed' and item['status'] == 'ok'
+            ]
+            source = [q for q in params['queries'] if f'query:{q}' not in scraped] + unfinished
+            print(f"↩️  Resuming run {run_id}: {len(source) - len(unfinished)} queries, {len(unfinished)} jobs left")
+        
+        def scrape(item):
+            if isinstance(item, dict):
+                return [item]  # Resumed job, already scraped
+            jobs = self.scraper.scrape_jobs(item, location, time_filter=time_filter)[:max_jobs_per_query]
+            for job in jobs:
+                # Ledger keys use the cleaned URL that add_job stores
+                job['url'] = db.clean_url(job['url'])
+                ledger.record(run_id, f"job:{job['url']}", 'scraped', data=job)
+            ledger.record(run_id, f'query:{item}', 'scraped', data={'jobs': len(jobs)})
+            print(f"📡 {len(jobs)} jobs for '{item}'")
+            return jobs
+        
+        def store(job):
+            key = f"job:{job['url']}"
+            if 'id' in job:
+                existing = db.select_jobs(('id', 'description', 'ai_score'), where='id = ?', params=(job['id'],))
+            else:
+                job_id = db.add_job(job)
+                if job_id is not None:
+                    job['id'] = job_id
+                    ledger.record(run_id, key, 'stored', job_id=job_id)
+                    return job
+                # Known job: reuse whatever earlier runs stored
+                existing = db.select_jobs(('id', 'description', 'ai_score'), where='url = ?', params=(job['url'],))
+            if not existing:
+                ledger.record(run_id, key, 'stored', status='skipped')
+                return None
+            job['id'] = existing[0].id
+            job['description'] = existing[0].description
+            if existing[0].ai_score is not None:
+                job['ai_analysis'] = {'score': existing[0].ai_score, 'cached': True}
+            ledger.record(run_id, key, 'stored', job_id=job['id'])
+            return job
+        
+        def enrich(job):
+            if skip_enrich or (job.get('description') and len(job['description']) > 100):
+                return job
+            desc = self.enricher.fetch_with_retry(job['url'])
+            if not desc:
+                ledger.record(run_id, f"job:{job['url']}", 'enriched', status='failed', error='no description')
+                return None
+            job['description'] = desc
+            db.update_job_description(job['id'], desc)
+            db.mark_job_enriched(job['id'])
+            ledger.record(run_id, f"job:{job['url']}", 'enriched')
+            return job
         
+        def analyze(job):
+            if 'ai_analysis' not in job:
+                if not job.get('description'):
+                    return None
+                # Reposts of an analyzed job already carry its analysis
+                job['ai_analysis'] = db.get_cluster_analysis(job['id'])
+                if job['ai_analysis'] is None:
+                    # Cached company research only; refreshing it is the companies command's job
+                    company_id = db.select_jobs(('company_id',), where='id = ?', params=(job['id'],))[0].company_id
+                    company_info = research.contexts([company_id]).get(company_id)
+                    if analyze_rate_limiter:
+                        analyze_rate_limiter.acquire()
+                    job['ai_analysis'] = self.analyzer.analyze_job_fit(
+                        dict(job, company_info=company_info) if company_info else job
+                    )
+                    # Block so the checkpoint never gets ahead of the stored analysis
+                    db.update_analysis(job['id'], job['ai_analysis'])
+            ledger.record(run_id, f"job:{job['url']}", 'analyzed')
+            return job
+        
+        pipeline = StreamingPipeline([
+            Stage('scrape', scrape, flat=True),
+            Stage('store', store),
+            Stage('enrich', enrich, concurrency=enrich_concurrency),
+            Stage('analyze', analyze, concurrency=analyze_concurrency),
+        ])
+        
+        print("="*60)
+        print(f"STREAMING JOB SEARCH PIPELINE (run {run_id})")
+        print("="*60)
+        
+        analyzed_jobs = []
+        try:
+            try:
+                for job in pipeline.run(source):
+                    analyzed_jobs.append(job)
+                    score = job['ai_analysis'].get('score', 0)
+                    if score >= min_score:
+                        print(f"  ⚡ [{score}/100] {job['title']} at {job['company']}")
+            except BaseException:
+                ledger.finish(run_id, 'failed')
+                print(f"\n✗ Interrupted - resume with: python main.py full --resume {run_id}")
+                raise
+            # Items a stage failed on stay at their last checkpoint; resuming retries them
+            errors = sum(stats['errors'] for stats in pipeline.stats().values())
+            ledger.finish(run_id, 'completed_with_errors' if errors else 'completed')
+        finally:
+            ledger.close()
+        
+        if pipeline.first_result_seconds is not None:
+            print(f"\n⏱️  First result after {pipeline.first_result_seconds:.1f}s")
+        for name, stats in pipeline.stats().items():
+            print(f"  {name}: {stats['processed']} in, {stats['emitted']} out, {stats['errors']} errors")
+        if errors:
+            print(f"  ⚠️  {errors} items failed - retry them with: python main.py full --resume {run_id}")
+        
+        analyzed_jobs.sort(key=lambda x: x.get('ai_analysis', {}).get('score', 0), reverse=True)
+        self.generate_report(analyzed_jobs, Path(db.db_path).parent)
         return analyzed_jobs
     
-    def generate_report(self, jobs):
-        """Generate actionable report"""
+    def generate_report(self, jobs, report_dir='data'):
+        """Generate actionable report in report_dir, next to the database the jobs came from"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         report = {
@@ -114,7 +269,9 @@ class JobSearchPipeline:
             'all_jobs': jobs
         }
         
-        with open(f'data/pipeline_report_{timestamp}.json', 'w') as f:
+        path = Path(report_dir) / f'pipeline_report_{timestamp}.json'
+        with open(path, 'w') as f:
             json.dump(report, f, indent=2)
         
-        print(f"\n📊 Report saved: data/pipeline_report_{timestamp}.json")
\ No newline at end of file
+        print(f"\n📊 Report saved: {path}")
+        return path
\ No newline at end of file
@@ -1,121 +1,324 @@
 #!/usr/bin/env python3
 """
 LinkedIn Job Pipeline Runner
-Orchestrates the scraping and analysis process
+Database-backed scrape / enrich / analyze stages, each runnable on its own.
+
+Every stage reads its input from and writes its output to data/jobs.db, so stages
+can run from separate cron entries, and each takes a concurrency, a request rate
+limit, a batch limit and a "since" window.
 """
 
 import os
+import re
 import sys
-import time
-import json
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from company_research import CompanyResearch
+from database.enhanced_database import JobDatabase
+from database.migrations import compute_description_hash
+from database.near_duplicates import CLUSTER_REPRESENTATIVE
+from database.rows import JOB_ANALYSIS_FIELDS
+from scrapers.linkedin_scraper import TIME_FILTERS, LinkedInScraper
+from scrapers.requirement_extractor import extract_requirements
+from utils.rate_limiter import RateLimiter
+
+DEFAULT_QUERIES = [
+    "python developer",
+    "software engineer graduate",
+    "backend developer junior",
+    "full stack developer entry level",
+]
+
+_SINCE_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
 
-# Add subdirectories to path
-sys.path.append('scrapers')
-sys.path.append('analyzers')
+def parse_since(value):
+    """Parse a --since window: '12h', '3d', '2w', or 'day' / 'week' / 'month'"""
+    if value is None or isinstance(value, timedelta):
+        return value
+    if value in TIME_FILTERS:
+        return timedelta(seconds=TIME_FILTERS[value])
+    match = re.fullmatch(r'(\d+)\s*([mhdw])', value.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid --since value: {value!r} (use e.g. 12h, 3d, 2w, week)")
+    return timedelta(**{_SINCE_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def _extract_batch(rows):
+    """Process-pool task: (job_id, read_hash, description_hash, requirements) per (id, description, hash) row"""
+    return [(job_id, read_hash, compute_description_hash(description), extract_requirements(description))
+            for job_id, description, read_hash in rows]
 
-from scrapers.linkedin_scraper import LinkedInScraper
-from analyzers.analyzer_ai import AIJobAnalyzer
 
 class JobPipeline:
-    def __init__(self):
-        self.scraper = LinkedInScraper()
-        self.analyzer = None
-        
+    def __init__(self, db_path='data/jobs.db', headless=True, concurrency=1, rate=None, browser=True):
+        """
+        concurrency: worker threads per stage
+        rate: max outbound requests per second per stage (None = unlimited)
+        browser: enrich with Selenium; False reads public job pages over HTTP
+        """
         # Ensure data and logs directories exist
-        os.makedirs('data', exist_ok=True)
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
         os.makedirs('logs', exist_ok=True)
-        
-    def run_full_pipeline(self, query=None, location=None, time_filter=None):
-        """Run the complete job search and analysis pipeline"""
+
+        self.db = JobDatabase(db_path)
+        self.headless = headless
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.browser = browser
+        self.scraper = LinkedInScraper(rate_limiter=self._rate_limiter())
+        self._enricher = None
+        self._analyzer = None
+
+    def _rate_limiter(self):
+        return RateLimiter(self.rate) if self.rate else None
+
+    @property
+    def enricher(self):
+        if self._enricher is None and not self.browser:
+            from scrapers.guest_description_fetcher import GuestDescriptionFetcher
+            self._enricher = GuestDescriptionFetcher(rate_limiter=self._rate_limiter())
+        elif self._enricher is None:
+            from scrapers.smart_description_enricher import SmartDescriptionEnricher
+            self._enricher = SmartDescriptionEnricher(headless=self.headless, rate_limiter=self._rate_limiter())
+        return self._enricher
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            from analyzers.analyzer_ai import AIJobAnalyzer
+            self._analyzer = AIJobAnalyzer()
+        return self._analyzer
+
+    def _default_queries(self):
+        return list(DEFAULT_QUERIES)
+
+    def _map(self, fn, items):
+        """Run fn over items on the stage's thread pool, preserving order"""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(fn, items))
+
+    def _since_filter(self, since):
+        since = parse_since(since)
+        if since is None:
+            return '', ()
+        return ' AND scraped_at >= ?', ((datetime.now() - since).isoformat(),)
+
+    def close(self):
+        self.db.close()
+
+    # --- stages ----------------------------------------------------------
+
+    def scrape(self, queries=None, location='Netherlands', since=None, limit=None, incremental=False):
+        """Scrape every query and store new jobs; returns the new job ids
+
+        since: only postings from this window (LinkedIn's date-posted filter)
+        limit: max jobs kept per query
+        incremental: fetch only postings newer than this query's watermark
+        """
+        queries = queries or self._default_queries()
+        since = parse_since(since)
+        time_filter = int(since.total_seconds()) if since else None
+
+        def scrape_one(query):
+            if incremental:
+                watermark = self.db.get_watermark(query, location)
+                jobs, watermark = self.scraper.scrape_incremental(
+                    query, location, watermark, time_filter=time_filter, limit=limit
+                )
+            else:
+                jobs = self.scraper.scrape_jobs(query, location, time_filter=time_filter)[:limit]
+            new_ids = [job_id for job_id in map(self.db.add_job, jobs) if job_id is not None]
+            # Advance the watermark only once its jobs are stored
+            if incremental:
+                self.db.save_watermark(query, location, watermark)
+                print(f"📥 '{query}': {len(jobs)} found in {watermark['pages']} pages, {len(new_ids)} new")
+            else:
+                print(f"📥 '{query}': {len(jobs)} found, {len(new_ids)} new")
+            return new_ids
+
+        new_ids = [job_id for ids in self._map(scrape_one, queries) for job_id in ids]
+        print(f"✅ Scraped {len(new_ids)} new jobs")
+        return new_ids
+
+    def enrich(self, limit=20, since=None):
+        """Fetch descriptions for jobs that lack one; returns how many were enriched"""
+        since_sql, params = self._since_filter(since)
+        jobs = self.db.select_jobs(
+            ('id', 'title', 'url'),
+            where=f'(description IS NULL OR LENGTH(description) < 100){since_sql}',
+            params=params,
+            order_by='id DESC',
+            limit=limit
+        )
+        print(f"🔄 Enriching {len(jobs)} jobs...")
+        if not jobs:
+            return 0
+
+        def enrich_one(job):
+            desc = self.enricher.fetch_with_retry(job.url)
+            if not desc:
+                print(f"  ✗ {job.title[:50]}")
+                return False
+            self.db.update_job_description(job.id, desc)
+            self.db.mark_job_enriched(job.id)
+            print(f"  ✓ {job.title[:50]} ({len(desc)} chars)")
+            return True
+
+        enriched = sum(self._map(enrich_one, jobs))
+        print(f"✅ Enriched {enriched}/{len(jobs)} jobs")
+        return enriched
+
+    def analyze(self, limit=20, since=None):
+        """Score enriched jobs that have not been analyzed; returns how many were analyzed
+
+        Jobs whose stored requirements (see extract) rule the candidate out are
+        marked skipped, and only one job per near-duplicate cluster is sent to the
+        analyzer; the others get a copy of its analysis. Prompts include the
+        company research already cached (see company_research.py).
+        """
+        since_sql, params = self._since_filter(since)
+        qualification = self.analyzer.qualification()
+        skipped = self.db.skip_unqualified(**qualification)
+        if skipped:
+            print(f"⏭️  Skipped {skipped} jobs whose requirements rule you out")
+        qualified_sql, qualified_params = self.db.qualification_filter(**qualification)
+        if qualified_sql:
+            since_sql += f' AND {qualified_sql}'
+            params += qualified_params
+        jobs = self.db.select_jobs(
+            JOB_ANALYSIS_FIELDS + ('company_id',),
+            where=f'ai_score IS NULL AND description IS NOT NULL AND LENGTH(description) > 100 '
+                  f'AND {CLUSTER_REPRESENTATIVE}{since_sql}',
+            params=params,
+            order_by='id DESC',
+            limit=limit
+        )
+        print(f"🔍 Analyzing {len(jobs)} jobs...")
+        if not jobs:
+            return 0
+        limiter = self._rate_limiter()
+        analyze_fit = limiter.wrap(self.analyzer.analyze_job_fit) if limiter else self.analyzer.analyze_job_fit
+        companies = CompanyResearch(self.db).contexts(job.company_id for job in jobs)
+
+        def analyze_one(job):
+            company_info = companies.get(job.company_id)
+            analysis = analyze_fit(dict(job.to_dict(), company_info=company_info) if company_info else job)
+            self.db.update_analysis(job.id, analysis)
+            return analysis
+
+        analyses = self._map(analyze_one, jobs)
+        print(f"✅ Analyzed {len(analyses)} jobs")
+        return len(analyses)
+
+    def extract(self, limit=None, batch_size=500):
+        """Extract requirements from stored descriptions into indexed columns; returns how many were stored
+
+        Only jobs whose description changed since their last extraction are
+        read. Batches run on a process pool (concurrency processes, or one per
+        CPU at the default concurrency of 1), and analyze then skips jobs whose
+        stored requirements disqualify the candidate without opening a page.
+        limit: max jobs per run (None = every pending job)
+        """
+        pending = self.db.count_jobs_needing_requirements()
+        if limit is not None:
+            pending = min(pending, limit)
+        print(f"🧩 Extracting requirements from {pending} descriptions...")
+        if not pending:
+            return 0
+
+        workers = self.concurrency if self.concurrency > 1 else os.cpu_count() or 1
+        stored, after_id, remaining = 0, 0, pending
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep a couple of batches per process queued; never the whole table in memory
+            max_in_flight = 2 * workers
+            in_flight = set()
+            while True:
+                while remaining and len(in_flight) < max_in_flight:
+                    rows = self.db.get_jobs_needing_requirements(after_id, min(batch_size, remaining))
+                    if not rows:
+                        remaining = 0
+                        break
+                    after_id = rows[-1][0]
+                    remaining -= len(rows)
+                    in_flight.add(pool.submit(_extract_batch, [tuple(row) for row in rows]))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stored += self.db.save_requirements(future.result())
+
+        print(f"✅ Stored requirements for {stored}/{pending} jobs")
+        return stored
+
+    def run_full_pipeline(self, queries=None, location='Netherlands', skip_enrich=False,
+                          since=None, limit=None, resume=None):
+        """Scrape, enrich and analyze as overlapping, checkpointed stages
+
+        resume: id of an interrupted run to continue from its ledger
+        """
+        from pipeline_orchestrator import JobSearchPipeline
+
         print("="*60)
         print(f"🚀 LinkedIn Job Pipeline - {datetime.now().strftime('%Y-%m-%d %H:%M')}")
         print("="*60)
-        
-        # Step 1: Scrape jobs
-        print("\n📥 Step 1: Scraping LinkedIn jobs...")
-        jobs = self.scraper.scrape_jobs(query, location, time_filter)
-        
-        if not jobs:
-            print("❌ No jobs found. Exiting.")
-            return
-        
-        # Get the latest jobs file
-        import glob
-        files = glob.glob('data/linkedin_jobs_*.json')
-        if not files:
-            print("❌ No jobs file created. Exiting.")
-            return
-        
-        latest_file = max(files, key=os.path.getctime)
-        
-        # Step 2: Analyze jobs
-        print("\n🔍 Step 2: Analyzing job descriptions...")
-        self.analyzer = AIJobAnalyzer()
-        analyzed_jobs = self.analyzer.analyze_jobs_file(latest_file)
-        
-        # Step 3: Summary
-        self.print_summary(analyzed_jobs)
-        
+
+        since = parse_since(since)
+        limiter = self._rate_limiter()
+        orchestrator = JobSearchPipeline(
+            scraper=self.scraper,
+            enricher=self.enricher,
+            analyzer=self.analyzer,
+        )
+        analyzed_jobs = orchestrator.run_streaming(
+            queries=queries or self._default_queries(),
+            location=location,
+            enrich_concurrency=self.concurrency,
+            analyze_concurrency=self.concurrency,
+            db=self.db,
+            run_id=resume,
+            skip_enrich=skip_enrich,
+            time_filter=int(since.total_seconds()) if since else None,
+            max_jobs_per_query=limit,
+            analyze_rate_limiter=limiter,
+        )
+        self.print_summary()
         print("\n✅ Pipeline completed successfully!")
-        print("\n📋 Check the ACTION_PLAN in the data/ directory for prioritized jobs.")
-        
         return analyzed_jobs
-    
-    def print_summary(self, analyzed_jobs):
+
+    def print_summary(self):
         """Print a summary of the analysis"""
-        if not analyzed_jobs:
+        jobs = self.db.get_jobs_by_score(60, fields=('title', 'company', 'ai_score'))
+        if not jobs:
             return
-        
+
         print("\n" + "="*60)
         print("📊 ANALYSIS SUMMARY")
         print("="*60)
-        
-        high_score = [j for j in analyzed_jobs if j.get('score', 0) >= 75]
-        medium_score = [j for j in analyzed_jobs if 60 <= j.get('score', 0) < 75]
-        
+
+        high_score = [j for j in jobs if j.ai_score >= 75]
+        medium_score = [j for j in jobs if j.ai_score < 75]
+
         print(f"\n🎯 High Priority Jobs (Score >= 75): {len(high_score)}")
         for job in high_score[:5]:
-            print(f"  • {job['title'][:40]:40} | {job['company'][:20]:20} | Score: {job['score']}")
-        
+            print(f"  • {job.title[:40]:40} | {job.company[:20]:20} | Score: {job.ai_score}")
+
         print(f"\n📋 Medium Priority Jobs (Score 60-74): {len(medium_score)}")
         for job in medium_score[:3]:
-            print(f"  • {job['title'][:40]:40} | {job['company'][:20]:20} | Score: {job['score']}")
-        
-    def search_multiple_queries(self, queries):
-        """Run pipeline for multiple search queries"""
-        all_jobs = []
-        
-        for query in queries:
-            print(f"\n🔍 Searching for: {query}")
-            jobs = self.run_full_pipeline(query=query)
-            if jobs:
-                all_jobs.extend(jobs)
-            time.sleep(5)  # Wait between queries
-        
-        # Remove duplicates based on job URL
-        unique_jobs = {job['url']: job for job in all_jobs}.values()
-        
-        print(f"\n📊 Total unique jobs found: {len(unique_jobs)}")
-        return list(unique_jobs)
+            print(f"  • {job.title[:40]:40} | {job.company[:20]:20} | Score: {job.ai_score}")
+
 
 def main():
     """Main entry point"""
     pipeline = JobPipeline()
-    
-    # You can customize these searches
-    queries = [
-        "python developer",
-        "software engineer graduate",
-        "backend developer junior",
-        "full stack developer entry level"
-    ]
-    
-    # Run for a single query
-    # pipeline.run_full_pipeline(query="python developer", location="Netherlands", time_filter="week")
-    
-    # Or run for multiple queries
-    pipeline.search_multiple_queries(queries)
+    try:
+        pipeline.run_full_pipeline()
+    finally:
+        pipeline.close()
 
 if __name__ == '__main__':
     main()
@@ -11,9 +11,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+from database.run_ledger import RunLedger
+from scrapers.linkedin_urls import rebase_url, resolve_base_url
+
 class DescriptionEnricher:
-    def __init__(self, cookies_path='config/linkedin_cookies.pkl'):
+    def __init__(self, cookies_path='config/linkedin_cookies.pkl', base_url=None):
         self.cookies_path = cookies_path
+        self.base_url = resolve_base_url(base_url)
         self.driver = None
         
     def setup_driver(self):
@@ -27,7 +31,7 @@ class DescriptionEnricher:
         self.wait = WebDriverWait(self.driver, 10)
         
         # Load LinkedIn and add cookies
-        self.driver.get("https://www.linkedin.com")
+        self.driver.get(self.base_url)
         
         # Load cookies if they exist
         if Path(self.cookies_path).exists():
@@ -44,7 +48,7 @@ class DescriptionEnricher:
     def fetch_description(self, job_url):
         """Fetch full description for a single job"""
         try:
-            self.driver.get(job_url)
+            self.driver.get(rebase_url(job_url, self.base_url))
             time.sleep(2)
             
             # Try to click "See more" button
@@ -83,47 +87,75 @@ class DescriptionEnricher:
             print(f"Error fetching {job_url}: {e}")
             return None
     
-    def enrich_jobs(self, jobs_file):
-        """Add descriptions to all jobs in a file"""
+    def enrich_jobs(self, jobs_file, run_id=None, ledger_db='data/jobs.db'):
+        """Add descriptions to all jobs in a file
+
+        Every fetched description is checkpointed in the run ledger; pass the
+        printed run_id back in to resume a run that was interrupted.
+        """
         # Load jobs
         with open(jobs_file, 'r') as f:
             jobs = json.load(f)
         
-        print(f"Enriching {len(jobs)} jobs with descriptions...")
+        ledger = RunLedger(ledger_db)
+        if run_id is None:
+            run_id = ledger.start('enrich_file', {'jobs_file': jobs_file})
+            done = {}
+        else:
+            ledger.resume(run_id, 'enrich_file')
+            done = {item['item_key']: item['data'] for item in ledger.items(run_id, stage='enriched')}
         
-        # Setup driver
-        self.setup_driver()
+        print(f"Enriching {len(jobs)} jobs with descriptions (run {run_id}, {len(done)} already done)...")
         
         enriched = []
-        for i, job in enumerate(jobs, 1):
-            print(f"[{i}/{len(jobs)}] {job['title'][:50]}...")
-            
-            if job.get('description'):
-                print("  Already has description, skipping")
+        try:
+            for i, job in enumerate(jobs, 1):
+                print(f"[{i}/{len(jobs)}] {job['title'][:50]}...")
+                
+                if job['url'] in done:
+                    job['description'] = done[job['url']]['description']
+                    enriched.append(job)
+                    continue
+                
+                if job.get('description'):
+                    print("  Already has description, skipping")
+                    enriched.append(job)
+                    continue
+                
+                # Setup driver only once there is something to fetch
+                if self.driver is None:
+                    self.setup_driver()
+                
+                desc = self.fetch_description(job['url'])
+                if desc:
+                    job['description'] = desc
+                    print(f"  ✓ Got {len(desc)} chars")
+                else:
+                    job['description'] = ""
+                    print("  ✗ No description found")
+                
+                ledger.record(run_id, job['url'], 'enriched', data={'description': job['description']})
                 enriched.append(job)
-                continue
-            
-            desc = self.fetch_description(job['url'])
-            if desc:
-                job['description'] = desc
-                print(f"  ✓ Got {len(desc)} chars")
-            else:
-                job['description'] = ""
-                print("  ✗ No description found")
-            
-            enriched.append(job)
-            time.sleep(2)  # Rate limit
+                time.sleep(2)  # Rate limit
+        except BaseException:
+            ledger.finish(run_id, 'failed')
+            ledger.close()
+            print(f"\n✗ Interrupted - resume with enrich_jobs({jobs_file!r}, run_id={run_id})")
+            raise
+        finally:
+            if self.driver:
+                self.driver.quit()
+                self.driver = None
         
         # Save enriched data
         output_file = jobs_file.replace('.json', '_enriched.json')
         with open(output_file, 'w') as f:
             json.dump(enriched, f, indent=2)
         
+        ledger.finish(run_id)
+        ledger.close()
         print(f"\n✓ Saved enriched jobs to {output_file}")
         
-        if self.driver:
-            self.driver.quit()
-        
         return enriched
 
 if __name__ == '__main__':
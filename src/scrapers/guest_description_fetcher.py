@@ -0,0 +1,59 @@
+"""
+Guest description fetcher
+Browserless enricher: reads the description from the public (logged-out) job
+page over plain HTTP. Same fetch_with_retry interface as SmartDescriptionEnricher,
+so it can stand in for it wherever no browser is available, e.g. against the
+replay server.
+"""
+
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+from scrapers.linkedin_urls import rebase_url, resolve_base_url
+
+DESCRIPTION_SELECTORS = [
+    'div.show-more-less-html__markup',
+    'div.description__text',
+    'section.show-more-less-html',
+]
+
+
+class GuestDescriptionFetcher:
+    def __init__(self, rate_limiter=None, base_url=None, max_retries=2, timeout=15):
+        self.base_url = resolve_base_url(base_url)
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+    def fetch_with_retry(self, job_url):
+        """Return the job description text, or "" when none could be read"""
+        for attempt in range(1, self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.get(rebase_url(job_url, self.base_url), timeout=self.timeout)
+                if response.ok:
+                    description = self.parse_description(response.content)
+                    if description:
+                        return description
+            except requests.RequestException as e:
+                print(f"  Fetch error ({attempt}/{self.max_retries}): {e}")
+            if attempt < self.max_retries:
+                time.sleep(attempt)
+        return ""
+
+    @staticmethod
+    def parse_description(html):
+        """Description text of a job page, or None"""
+        soup = BeautifulSoup(html, 'html.parser')
+        for selector in DESCRIPTION_SELECTORS:
+            elem = soup.select_one(selector)
+            if elem:
+                text = elem.get_text('\n', strip=True)
+                if text:
+                    return text
+        return None
@@ -1,17 +1,36 @@
+import re
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 
+from scrapers.linkedin_urls import SEARCH_PATH, SEE_MORE_PATH, resolve_base_url
+
+PAGE_SIZE = 25
+
+# LinkedIn's "date posted" filter (f_TPR) takes a window in seconds
+TIME_FILTERS = {
+    'day': 24 * 3600,
+    'week': 7 * 24 * 3600,
+    'month': 30 * 24 * 3600,
+}
+
 class LinkedInScraper:
-    def __init__(self):
+    def __init__(self, rate_limiter=None, base_url=None):
+        """base_url: LinkedIn host to query, e.g. a local replay server"""
+        self.base_url = resolve_base_url(base_url)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         }
+        self.rate_limiter = rate_limiter
     
-    def scrape_jobs(self, search_term, location="Netherlands"):
-        """Scrape with deduplication"""
+    def scrape_jobs(self, search_term, location="Netherlands", time_filter=None):
+        """Scrape with deduplication
+
+        time_filter limits results to recent postings: 'day', 'week', 'month'
+        or a window in seconds.
+        """
         # First, get the raw jobs from LinkedIn
-        raw_jobs = self.get_linkedin_public(search_term, location)
+        raw_jobs = self.get_linkedin_public(search_term, location, time_filter)
         
         # Then apply deduplication
         jobs = []
@@ -29,38 +48,142 @@ class LinkedInScraper:
         
         return jobs
     
-    def get_linkedin_public(self, query, location):
-        jobs = []
-        url = f'https://www.linkedin.com/jobs/search?keywords={query}&location={location}'
+    def search_params(self, query, location, time_filter=None):
+        """Query-string parameters for a public job search"""
+        params = {'keywords': query, 'location': location}
+        if time_filter:
+            seconds = TIME_FILTERS.get(time_filter, time_filter)
+            if not isinstance(seconds, int):
+                raise ValueError(f"Unknown time filter: {time_filter}")
+            params['f_TPR'] = f'r{seconds}'
+        return params
+    
+    def get_linkedin_public(self, query, location, time_filter=None):
+        params = self.search_params(query, location, time_filter)
+        return self._fetch_jobs(self.base_url + SEARCH_PATH, params, location)[:20]
+    
+    def scrape_incremental(self, search_term, location="Netherlands", watermark=None, max_pages=10,
+                           time_filter=None, limit=None):
+        """Fetch only postings newer than the watermark of a previous run
+
+        Results are requested newest first and limited (f_TPR) to the time since
+        the last run; pagination stops at the first page reaching a posting id
+        already seen. time_filter only applies to the first run of a query.
+        limit keeps the oldest new postings, so the rest are picked up next run.
+        Returns (new_jobs, updated_watermark).
+
+        The watermark only covers the postings returned: a failed page fetch,
+        or max_pages running out before a known posting or the last page, keeps
+        the previous watermark, and a limit that drops postings advances the
+        posting id but not last_run_at.
+        """
+        now = datetime.now()
+        known_id = watermark.get('newest_posting_id') if watermark else None
+        if watermark and watermark.get('last_run_at'):
+            elapsed = now - datetime.fromisoformat(watermark['last_run_at'])
+            # An hour of slack so postings indexed late are not missed
+            window = int(elapsed.total_seconds()) + 3600
+            if window < TIME_FILTERS['month']:
+                time_filter = window
         
-        try:
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_cards = soup.find_all('div', {'class': 'base-card'})[:20]
+        jobs = []
+        seen_jobs = set()
+        pages = 0
+        complete = False
+        for page in range(max_pages):
+            params = self.search_params(search_term, location, time_filter)
+            params.update({'sortBy': 'DD', 'start': page * PAGE_SIZE})
+            try:
+                cards = self._fetch_page(self.base_url + SEE_MORE_PATH, params, location)
+            except Exception as e:
+                print(f'Scraping error: {e}')
+                break
+            pages += 1
             
-            for card in job_cards:
-                try:
-                    title_elem = card.find('h3', {'class': 'base-search-card__title'})
-                    company_elem = card.find('h4', {'class': 'base-search-card__subtitle'})
-                    location_elem = card.find('span', {'class': 'job-search-card__location'})
-                    link_elem = card.find('a', {'class': 'base-card__full-link'})
-                    
-                    if title_elem and company_elem and link_elem:
-                        job = {
-                            'title': title_elem.text.strip(),
-                            'company': company_elem.text.strip(),
-                            'location': location_elem.text.strip() if location_elem else location,
-                            'url': link_elem.get('href', ''),
-                            'description': '',
-                            'source': 'linkedin',
-                            'scraped_at': datetime.now().isoformat()
-                        }
-                        jobs.append(job)
-                except:
+            reached_known = False
+            for job in cards:
+                posting_id = job.get('job_id')
+                if known_id is not None and posting_id is not None and int(posting_id) <= known_id:
+                    reached_known = True
                     continue
-                    
+                job_key = f"{job['title']}|{job['company']}".lower()
+                if job_key not in seen_jobs:
+                    seen_jobs.add(job_key)
+                    jobs.append(job)
+            
+            if reached_known or len(cards) < PAGE_SIZE:
+                complete = True
+                break
+        
+        previous = watermark or {}
+        if not complete:
+            return jobs[-limit:] if limit else jobs, {
+                'newest_posting_id': known_id,
+                'newest_posted_at': previous.get('newest_posted_at'),
+                'last_run_at': previous.get('last_run_at'),
+                'pages': pages,
+            }
+        truncated = limit is not None and len(jobs) > limit
+        # Newest first: keeping the tail keeps the oldest, below every posting left for the next run
+        kept = jobs[-limit:] if truncated else jobs
+        posting_ids = [int(job['job_id']) for job in kept if job.get('job_id')]
+        posted = [job['posted_at'] for job in kept if job.get('posted_at')]
+        new_watermark = {
+            'newest_posting_id': max(posting_ids + ([known_id] if known_id is not None else []), default=None),
+            'newest_posted_at': max(posted + ([previous['newest_posted_at']] if previous.get('newest_posted_at') else []), default=None),
+            'last_run_at': previous.get('last_run_at') if truncated else now.isoformat(),
+            'pages': pages,
+        }
+        return kept, new_watermark
+    
+    def _fetch_page(self, url, params, location):
+        """GET a search results page and parse its job cards; raises on request and HTTP errors"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        response = requests.get(url, params=params, headers=self.headers)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, 'html.parser')
+        
+        jobs = []
+        for card in soup.find_all('div', {'class': 'base-card'}):
+            try:
+                job = self._parse_card(card, location)
+                if job:
+                    jobs.append(job)
+            except:
+                continue
+        return jobs
+    
+    def _fetch_jobs(self, url, params, location):
+        """GET a search results page and parse its job cards; [] on errors"""
+        try:
+            return self._fetch_page(url, params, location)
         except Exception as e:
             print(f'Scraping error: {e}')
-            
-        return jobs
\ No newline at end of file
+            return []
+    
+    def _parse_card(self, card, location):
+        title_elem = card.find('h3', {'class': 'base-search-card__title'})
+        company_elem = card.find('h4', {'class': 'base-search-card__subtitle'})
+        location_elem = card.find('span', {'class': 'job-search-card__location'})
+        link_elem = card.find('a', {'class': 'base-card__full-link'})
+        time_elem = card.find('time')
+        
+        if not (title_elem and company_elem and link_elem):
+            return None
+        
+        url = link_elem.get('href', '')
+        # Posting id: from the card's entity URN, else the trailing number of the URL path
+        match = re.search(r'jobPosting:(\d+)', card.get('data-entity-urn', '')) \
+            or re.search(r'(\d+)/?(?:\?|$)', url)
+        return {
+            'title': title_elem.text.strip(),
+            'company': company_elem.text.strip(),
+            'location': location_elem.text.strip() if location_elem else location,
+            'url': url,
+            'job_id': match.group(1) if match else None,
+            'posted_at': time_elem.get('datetime') if time_elem else None,
+            'description': '',
+            'source': 'linkedin',
+            'scraped_at': datetime.now().isoformat()
+        }
@@ -0,0 +1,39 @@
+"""
+LinkedIn URLs
+Every LinkedIn request is built against a base URL that defaults to
+https://www.linkedin.com and can be pointed at a local replay server
+(utils/replay_server.py) with LINKEDIN_BASE_URL or a base_url argument.
+"""
+
+import os
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_BASE_URL = 'https://www.linkedin.com'
+
+SEARCH_PATH = '/jobs/search'
+# Paginated guest endpoint behind the public search page's infinite scroll
+SEE_MORE_PATH = '/jobs-guest/jobs/api/seeMoreJobPostings/search'
+
+
+def resolve_base_url(override=None):
+    """The LinkedIn base URL: override, else $LINKEDIN_BASE_URL, else the live site"""
+    return (override or os.environ.get('LINKEDIN_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+
+
+def linkedin_url(path, base=None):
+    """Absolute URL for a LinkedIn path"""
+    return resolve_base_url(base) + path
+
+
+def rebase_url(url, base=None):
+    """Point a stored LinkedIn URL (any *.linkedin.com host) at the base URL
+
+    URLs on other hosts, and every URL when the base is the live site, are
+    returned unchanged.
+    """
+    base = resolve_base_url(base)
+    parts = urlsplit(url)
+    if base == DEFAULT_BASE_URL or not parts.netloc.endswith('linkedin.com'):
+        return url
+    target = urlsplit(base)
+    return urlunsplit((target.scheme, target.netloc, target.path + parts.path, parts.query, parts.fragment))
@@ -12,10 +12,16 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from scrapers.linkedin_urls import rebase_url, resolve_base_url
+
 class SmartDescriptionEnricher:
-    def __init__(self, cookies_path='config/linkedin_cookies.pkl'):
+    def __init__(self, cookies_path='config/linkedin_cookies.pkl', headless=False, rate_limiter=None,
+                 base_url=None):
         self.cookies_path = cookies_path
+        self.base_url = resolve_base_url(base_url)
         self.max_retries = 2
+        self.headless = headless
+        self.rate_limiter = rate_limiter
         
     def setup_driver(self, headless=False):
         """Setup with better options"""
@@ -44,7 +50,7 @@ class SmartDescriptionEnricher:
         })
         
         # Load LinkedIn and add cookies if they exist
-        driver.get("https://www.linkedin.com")
+        driver.get(self.base_url)
         
         if Path(self.cookies_path).exists():
             with open(self.cookies_path, 'rb') as f:
@@ -61,13 +67,15 @@ class SmartDescriptionEnricher:
     
     def fetch_with_retry(self, job_url, attempt=1):
         """Fetch with retry logic"""
-        driver = self.setup_driver(headless=(attempt > 1))
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        driver = self.setup_driver(headless=self.headless or attempt > 1)
         
         try:
             # Bring window to front
             driver.switch_to.window(driver.current_window_handle)
             
-            driver.get(job_url)
+            driver.get(rebase_url(job_url, self.base_url))
             time.sleep(random.uniform(2, 4))
             
             # Multiple strategies to get description
@@ -149,7 +157,7 @@ class SmartDescriptionEnricher:
             if not self.driver:
                 self.setup_driver()
             
-            self.driver.get(job_url)
+            self.driver.get(rebase_url(job_url, self.base_url))
             time.sleep(3)
             
             # Try to find the actual apply button and get its link
@@ -203,7 +211,7 @@ class SmartDescriptionEnricher:
         """Extract the actual apply link from LinkedIn job page"""
         try:
             if self.driver:
-                self.driver.get(job_url)
+                self.driver.get(rebase_url(job_url, self.base_url))
                 time.sleep(2)
                 
                 # Look for apply button/link
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Streaming Pipeline
+Overlapping stages connected by bounded queues.
+
+Each stage runs its own pool of threads; an item moves to the next stage as soon
+as it is processed, and a full downstream queue blocks the stage feeding it
+(backpressure) so a fast scraper cannot run far ahead of a slow enricher.
+
+    pipeline = StreamingPipeline([
+        Stage('scrape', scrape_query, flat=True),
+        Stage('enrich', enrich_job, concurrency=2),
+        Stage('analyze', analyze_job, concurrency=4),
+    ])
+    for job in pipeline.run(queries):
+        ...  # analyzed jobs arrive while later queries are still being scraped
+"""
+
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a streaming pipeline
+
+    fn(item) returns the item to pass downstream, or None to drop it. With
+    flat=True it returns an iterable and every element is passed on separately.
+    Exceptions drop the item and are recorded in `errors`.
+    """
+
+    def __init__(self, name, fn, concurrency=1, flat=False):
+        self.name = name
+        self.fn = fn
+        self.concurrency = concurrency
+        self.flat = flat
+        self.processed = 0
+        self.emitted = 0
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def stats(self):
+        with self._lock:
+            return {'processed': self.processed, 'emitted': self.emitted, 'errors': len(self.errors)}
+
+
+class StreamingPipeline:
+    """Runs items through stages concurrently, yielding results as they finish"""
+
+    def __init__(self, stages, maxsize=16):
+        self.stages = stages
+        self.maxsize = maxsize
+        self.first_result_seconds = None
+        self.source_error = None
+
+    def run(self, source):
+        """Feed `source` through all stages; yields final-stage outputs in completion order
+
+        If iterating `source` raises, the items already fed still finish and the
+        error is re-raised once they have.
+        """
+        self.source_error = None
+        queues = [queue.Queue(maxsize=self.maxsize) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0], self.stages[0]), daemon=True)]
+        for i, stage in enumerate(self.stages):
+            downstream_workers = self.stages[i + 1].concurrency if i + 1 < len(self.stages) else 1
+            remaining = [stage.concurrency]
+            for _ in range(stage.concurrency):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[i], queues[i + 1], remaining, downstream_workers),
+                    name=f'pipeline-{stage.name}',
+                    daemon=True,
+                ))
+        for thread in threads:
+            thread.start()
+
+        started = time.monotonic()
+        output = queues[-1]
+        while True:
+            item = output.get()
+            if item is _DONE:
+                break
+            if self.first_result_seconds is None:
+                self.first_result_seconds = time.monotonic() - started
+            yield item
+        for thread in threads:
+            thread.join()
+        if self.source_error is not None:
+            raise self.source_error
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def _feed(self, source, inbox, first_stage):
+        try:
+            for item in source:
+                inbox.put(item)
+        except BaseException as e:
+            self.source_error = e
+        finally:
+            for _ in range(first_stage.concurrency):
+                inbox.put(_DONE)
+
+    def _work(self, stage, inbox, outbox, remaining, downstream_workers):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            try:
+                result = stage.fn(item)
+                outputs = (result or ()) if stage.flat else ([] if result is None else [result])
+                for output in outputs:
+                    outbox.put(output)
+                    with stage._lock:
+                        stage.emitted += 1
+            except Exception as e:
+                with stage._lock:
+                    stage.errors.append((item, e))
+            with stage._lock:
+                stage.processed += 1
+
+        # The last worker of a stage to finish closes the downstream queue
+        with stage._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(downstream_workers):
+                outbox.put(_DONE)
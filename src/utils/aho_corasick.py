@@ -0,0 +1,81 @@
+"""
+Aho-Corasick matcher
+Finds every occurrence of any of a set of patterns in one left-to-right pass
+over the text, however many patterns there are. Used to spot city and company
+aliases in free text without testing each alias in turn.
+"""
+
+from collections import deque
+
+
+class AhoCorasick:
+    """Automaton over (pattern, value) pairs; patterns are matched as given (normalize case first)"""
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._size = 0
+        items = patterns.items() if hasattr(patterns, 'items') else patterns
+        for pattern, value in items:
+            if pattern:
+                self._add(pattern, value)
+        self._link()
+
+    def __len__(self):
+        return self._size
+
+    def _add(self, pattern, value):
+        state = 0
+        for char in pattern:
+            following = self._goto[state].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][char] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = following
+        self._out[state].append((len(pattern), value))
+        self._size += 1
+
+    def _link(self):
+        """Breadth-first failure links; each state also inherits its fallback's outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[following] = self._goto[fallback].get(char, 0)
+                self._out[following] = self._out[following] + self._out[self._fail[following]]
+
+    def iter_matches(self, text):
+        """Yield (start, end, value) for every pattern occurrence, overlapping ones included"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in out[state]:
+                yield i - length + 1, i + 1, value
+
+    def find_words(self, text):
+        """Matches that start and end on word boundaries, in order of position"""
+        matches = []
+        for start, end, value in self.iter_matches(text):
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            matches.append((start, end, value))
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        return matches
+
+    def first_word(self, text):
+        """Value of the leftmost (then longest) whole-word match, or None"""
+        matches = self.find_words(text)
+        return matches[0][2] if matches else None
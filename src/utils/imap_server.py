@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Local IMAP server
+A read-only IMAP4rev1 stand-in serving one folder of messages over local TCP,
+so the email monitor can be run and tested without a real mail account:
+
+    python src/utils/imap_server.py tests/fixtures/mail.mbox --port 1143
+    IMAP_PASSWORD=any python main.py emails --mailbox imap://127.0.0.1:1143/INBOX --imap-user any
+
+It speaks just enough of the protocol for imaplib: LOGIN (any credentials),
+SELECT/EXAMINE, UID SEARCH over UID ranges, and UID FETCH of UID, RFC822.SIZE,
+BODY.PEEK[HEADER.FIELDS (...)], BODY.PEEK[HEADER], BODY.PEEK[TEXT] and
+BODY.PEEK[] with optional <start.length> partials.
+"""
+
+import argparse
+import mailbox
+import re
+import socketserver
+import threading
+from pathlib import Path
+
+CAPABILITIES = 'IMAP4rev1'
+FETCH_ITEM = re.compile(r'UID|RFC822\.SIZE|BODY(?:\.PEEK)?\[([^\]]*)\](?:<(\d+)\.(\d+)>)?', re.IGNORECASE)
+
+
+def _split(raw):
+    """(header block incl. its blank line, body) of a raw message"""
+    match = re.search(rb'\r?\n\r?\n', raw)
+    if match is None:
+        return raw, b''
+    return raw[:match.end()], raw[match.end():]
+
+
+def _header_fields(header, names):
+    wanted = {name.lower() for name in names}
+    kept, keep = [], False
+    for line in header.splitlines(keepends=True):
+        if line[:1] in (b' ', b'\t'):
+            if keep:
+                kept.append(line)
+            continue
+        keep = line.split(b':', 1)[0].strip().lower().decode('ascii', 'replace') in wanted
+        if keep:
+            kept.append(line)
+    return b''.join(kept) + b'\r\n'
+
+
+def _uid_set(spec, uids):
+    """UIDs of the folder matching an IMAP sequence set like 1,4:7,9:*"""
+    highest = uids[-1] if uids else 0
+    selected = set()
+    for part in spec.split(','):
+        low, _, high = part.partition(':')
+        low = highest if low == '*' else int(low)
+        high = low if not high else highest if high == '*' else int(high)
+        low, high = min(low, high), max(low, high)
+        selected.update(uid for uid in uids if low <= uid <= high)
+    return sorted(selected)
+
+
+class LocalIMAPServer:
+    """Threaded local IMAP server over an in-memory folder
+
+    Messages are raw RFC 822 bytes; each gets the next UID. fetched records
+    every UID sent by UID FETCH, so tests can check what a client re-read.
+    """
+
+    def __init__(self, messages=(), host='127.0.0.1', port=0, folder='INBOX', uidvalidity=1):
+        self.folder = folder
+        self.uidvalidity = uidvalidity
+        self.messages = {}
+        self.fetched = []
+        self._next_uid = 1
+        self._lock = threading.Lock()
+        for raw in messages:
+            self.append(raw)
+        self._tcp = socketserver.ThreadingTCPServer((host, port), self._handler(), bind_and_activate=False)
+        self._tcp.allow_reuse_address = True
+        self._tcp.daemon_threads = True
+        self._tcp.server_bind()
+        self._tcp.server_activate()
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._tcp.server_address[:2]
+
+    def append(self, raw):
+        """Deliver a message; returns its UID"""
+        with self._lock:
+            uid = self._next_uid
+            self._next_uid += 1
+            self.messages[uid] = raw if isinstance(raw, bytes) else raw.encode()
+            return uid
+
+    def reset(self, uidvalidity):
+        """Renumber the folder under a new UIDVALIDITY, as servers do after rebuilding it"""
+        with self._lock:
+            self.uidvalidity = uidvalidity
+            self.messages = {uid: raw for uid, raw in enumerate(self.messages.values(), 1)}
+            self._next_uid = len(self.messages) + 1
+
+    def _fetch_items(self, uid, raw, items):
+        header, body = _split(raw)
+        parts = []
+        for match in FETCH_ITEM.finditer(items):
+            name = match.group(0).upper()
+            if name == 'UID':
+                parts.append(f'UID {uid}'.encode())
+                continue
+            if name == 'RFC822.SIZE':
+                parts.append(f'RFC822.SIZE {len(raw)}'.encode())
+                continue
+            section, start, length = match.groups()
+            spec = section.upper()
+            if spec.startswith('HEADER.FIELDS'):
+                data = _header_fields(header, re.findall(r'[\w-]+', section[len('HEADER.FIELDS'):]))
+            elif spec == 'HEADER':
+                data = header
+            elif spec == 'TEXT':
+                data = body
+            else:
+                data = raw
+            label = f'BODY[{section}]'
+            if start is not None:
+                data = data[int(start):int(start) + int(length)]
+                label += f'<{start}>'
+            parts.append(f'{label} {{{len(data)}}}\r\n'.encode() + data)
+        return b' '.join(parts)
+
+    def _handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def send(self, line):
+                self.wfile.write(line if isinstance(line, bytes) else line.encode() + b'\r\n')
+
+            def handle(self):
+                self.send('* OK IMAP4rev1 local stand-in ready')
+                selected = False
+                for raw_line in self.rfile:
+                    line = raw_line.decode('utf-8', 'replace').rstrip('\r\n')
+                    tag, _, rest = line.partition(' ')
+                    command, _, args = rest.partition(' ')
+                    command = command.upper()
+                    if command == 'UID':
+                        command, _, args = args.partition(' ')
+                        command = 'UID ' + command.upper()
+
+                    if command == 'CAPABILITY':
+                        self.send(f'* CAPABILITY {CAPABILITIES}')
+                        self.send(f'{tag} OK CAPABILITY completed')
+                    elif command == 'LOGIN':
+                        self.send(f'{tag} OK LOGIN completed')
+                    elif command in ('SELECT', 'EXAMINE'):
+                        if args.strip('"') != server.folder:
+                            self.send(f'{tag} NO No such folder')
+                            continue
+                        selected = True
+                        with server._lock:
+                            count, uidvalidity, next_uid = len(server.messages), server.uidvalidity, server._next_uid
+                        self.send(f'* {count} EXISTS')
+                        self.send('* 0 RECENT')
+                        self.send(f'* OK [UIDVALIDITY {uidvalidity}] UIDs valid')
+                        self.send(f'* OK [UIDNEXT {next_uid}] Predicted next UID')
+                        self.send(f'{tag} OK [READ-ONLY] {command} completed')
+                    elif command == 'UID SEARCH' and selected:
+                        match = re.search(r'UID (\S+)', args, re.IGNORECASE)
+                        with server._lock:
+                            uids = sorted(server.messages)
+                        found = _uid_set(match.group(1), uids) if match else uids
+                        self.send('* SEARCH' + ''.join(f' {uid}' for uid in found))
+                        self.send(f'{tag} OK SEARCH completed')
+                    elif command == 'UID FETCH' and selected:
+                        spec, _, items = args.partition(' ')
+                        with server._lock:
+                            uids = sorted(server.messages)
+                            messages = dict(server.messages)
+                        sequence = {uid: number for number, uid in enumerate(uids, 1)}
+                        # UID FETCH responses always carry the UID
+                        if not re.search(r'\bUID\b', items, re.IGNORECASE):
+                            items = 'UID ' + items
+                        for uid in _uid_set(spec, uids):
+                            with server._lock:
+                                server.fetched.append(uid)
+                            self.send(f'* {sequence[uid]} FETCH ('.encode()
+                                      + server._fetch_items(uid, messages[uid], items) + b')\r\n')
+                        self.send(f'{tag} OK FETCH completed')
+                    elif command in ('NOOP', 'CLOSE'):
+                        self.send(f'{tag} OK {command} completed')
+                    elif command == 'LOGOUT':
+                        self.send('* BYE Logging out')
+                        self.send(f'{tag} OK LOGOUT completed')
+                        return
+                    else:
+                        self.send(f'{tag} BAD Unsupported command')
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._tcp.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._tcp.shutdown()
+        self._tcp.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve an mbox file or Maildir as a local IMAP folder')
+    parser.add_argument('mailbox', help='mbox file or Maildir directory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1143)
+    parser.add_argument('--folder', default='INBOX')
+    args = parser.parse_args()
+
+    source = mailbox.Maildir(args.mailbox, create=False) if Path(args.mailbox).is_dir() else mailbox.mbox(args.mailbox)
+    server = LocalIMAPServer((message.as_bytes() for message in source), args.host, args.port, args.folder)
+    host, port = server.address
+    print(f"📬 Serving {len(server.messages)} messages from {args.mailbox} as imap://{host}:{port}/{args.folder}")
+    try:
+        server._tcp.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._tcp.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+Mailbox sources
+Stream messages from a local mbox file, a Maildir, or an IMAP server, resuming
+from the high-water mark of the previous run so only new mail is read.
+
+A watermark is a (validity, position) pair:
+    mbox     byte offset just past the last message read
+    Maildir  delivery mtime (ns) of the last message read
+    IMAP     last UID read, valid while the folder keeps its UIDVALIDITY
+
+Only the headers the tracker uses and the first BODY_BYTES of the body are
+parsed, however large the message or its attachments.
+"""
+
+import email
+import email.policy
+import hashlib
+import imaplib
+import os
+import re
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+HEADER_FIELDS = ('Message-ID', 'From', 'Subject', 'Date', 'Content-Type', 'Content-Transfer-Encoding', 'MIME-Version')
+BODY_BYTES = 4096
+
+MailMessage = namedtuple('MailMessage', 'message_id sender subject date body')
+
+
+def _header_block(raw_headers):
+    """Keep only HEADER_FIELDS of a raw header block (folded lines included)"""
+    wanted = {field.lower() for field in HEADER_FIELDS}
+    kept, keep = [], False
+    for line in raw_headers.splitlines(keepends=True):
+        if line[:1] in (b' ', b'\t'):
+            if keep:
+                kept.append(line)
+            continue
+        keep = line.split(b':', 1)[0].strip().lower().decode('ascii', 'replace') in wanted
+        if keep:
+            kept.append(line)
+    return b''.join(kept)
+
+
+def parse_message(raw_headers, body_prefix=b''):
+    """MailMessage from a message's raw header block and the start of its body
+
+    Messages without a Message-ID are keyed by a hash of their headers, so
+    re-reading one is still recognized as a duplicate.
+    """
+    headers = _header_block(raw_headers)
+    message = email.message_from_bytes(headers + b'\r\n' + body_prefix, policy=email.policy.default)
+    message_id = str(message.get('Message-ID') or '').strip() or 'sha1:' + hashlib.sha1(raw_headers).hexdigest()
+    try:
+        date = parsedate_to_datetime(str(message['Date'])).isoformat() if message['Date'] else None
+    except (TypeError, ValueError):
+        date = None
+    return MailMessage(message_id, str(message.get('From') or ''), str(message.get('Subject') or ''), date,
+                       _text_body(message))
+
+
+def _text_body(message):
+    """Decoded start of the first text/plain part ('' when none survives truncation)"""
+    try:
+        part = message.get_body(('plain',))
+        return part.get_content().strip() if part is not None else ''
+    except (LookupError, ValueError, AttributeError):
+        return ''
+
+
+def _split_headers(data):
+    """(headers, rest) at the first blank line, or None when data holds no blank line yet"""
+    match = re.search(rb'\r?\n\r?\n', data)
+    if match is None:
+        return None
+    return data[:match.start() + 1], data[match.end():]
+
+
+class MboxSource:
+    """An mbox file read from the byte offset where the previous run stopped
+
+    A file that ends at the saved offset has no new mail. One that shrank or no
+    longer has a message boundary at the saved offset was rewritten by a mail
+    client; it is read again from the start.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.name = f'mbox:{self.path.absolute()}'
+
+    def read(self, watermark=None):
+        """Yield (MailMessage, watermark) for every message past the watermark"""
+        position = watermark[1] if watermark else 0
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            if position == size:
+                return  # Nothing new since the last run
+            if position > size:
+                position = 0
+            f.seek(position)
+            if position and f.read(5) != b'From ':
+                position = 0
+            f.seek(position)
+
+            headers, body, body_size, in_headers, started = [], [], 0, True, False
+            previous_blank = True
+            offset = position
+            for line in f:
+                if line.startswith(b'From ') and previous_blank:
+                    if started:
+                        yield self._message(headers, body), (None, offset)
+                    headers, body, body_size, in_headers, started = [], [], 0, True, True
+                elif in_headers:
+                    if line.strip():
+                        headers.append(line)
+                    else:
+                        in_headers = False
+                elif body_size < BODY_BYTES:
+                    body.append(line)
+                    body_size += len(line)
+                previous_blank = not line.strip()
+                offset += len(line)
+            if started:
+                yield self._message(headers, body), (None, offset)
+
+    @staticmethod
+    def _message(headers, body):
+        return parse_message(b''.join(headers), b''.join(body)[:BODY_BYTES])
+
+
+class MaildirSource:
+    """A Maildir's new/ and cur/ messages delivered at or after the watermark mtime
+
+    Messages delivered in the same instant as the last one read are read again;
+    the tracker drops them by Message-ID.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.name = f'maildir:{self.path.absolute()}'
+
+    def read(self, watermark=None):
+        """Yield (MailMessage, watermark) in delivery order"""
+        since = watermark[1] if watermark else 0
+        entries = []
+        for folder in ('new', 'cur'):
+            if not (self.path / folder).is_dir():
+                continue
+            with os.scandir(self.path / folder) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.startswith('.'):
+                        mtime = entry.stat().st_mtime_ns
+                        if mtime >= since:
+                            entries.append((mtime, entry.name, entry.path))
+        for mtime, _, path in sorted(entries):
+            try:
+                message = self._read_file(path)
+            except FileNotFoundError:
+                # Moved between new/ and cur/ by a client since the scan; picked up next run
+                continue
+            yield message, (None, mtime)
+
+    @staticmethod
+    def _read_file(path):
+        data = b''
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(8192)
+                data += chunk
+                split = _split_headers(data)
+                if split is not None:
+                    headers, rest = split
+                    if len(rest) < BODY_BYTES and chunk:
+                        rest += f.read(BODY_BYTES - len(rest))
+                    return parse_message(headers, rest[:BODY_BYTES])
+                if not chunk:
+                    return parse_message(data)
+
+
+class IMAPSource:
+    """A folder on an IMAP server, read by UID above the last one seen
+
+    Messages are fetched in chunks with BODY.PEEK, so nothing is marked read,
+    and only HEADER_FIELDS plus the first BODY_BYTES of the body cross the wire.
+    """
+
+    FETCH = (f'(UID BODY.PEEK[HEADER.FIELDS ({" ".join(field.upper() for field in HEADER_FIELDS)})] '
+             f'BODY.PEEK[TEXT]<0.{BODY_BYTES}>)')
+
+    def __init__(self, host, user, password, folder='INBOX', port=None, ssl=True, chunk_size=200):
+        self.host = host
+        self.port = port or (993 if ssl else 143)
+        self.user = user
+        self.password = password
+        self.folder = folder
+        self.ssl = ssl
+        self.chunk_size = chunk_size
+        self.name = f'imap:{user}@{host}:{self.port}/{folder}'
+
+    def _connect(self):
+        conn = (imaplib.IMAP4_SSL if self.ssl else imaplib.IMAP4)(self.host, self.port)
+        conn.login(self.user, self.password)
+        return conn
+
+    def read(self, watermark=None):
+        """Yield (MailMessage, watermark) for messages with a UID above the watermark's"""
+        conn = self._connect()
+        try:
+            typ, _ = conn.select(self.folder, readonly=True)
+            if typ != 'OK':
+                raise imaplib.IMAP4.error(f'Cannot open {self.folder}')
+            validity = conn.response('UIDVALIDITY')[1][0].decode()
+            last_uid = watermark[1] if watermark and watermark[0] == validity else 0
+
+            # "n:*" always matches the newest message, even when its UID is below n
+            _, data = conn.uid('SEARCH', None, f'UID {last_uid + 1}:*')
+            uids = sorted(uid for uid in map(int, data[0].split()) if uid > last_uid)
+            for start in range(0, len(uids), self.chunk_size):
+                chunk = uids[start:start + self.chunk_size]
+                _, data = conn.uid('FETCH', ','.join(map(str, chunk)), self.FETCH)
+                for uid, message in sorted(self._parse_fetch(data)):
+                    yield message, (validity, uid)
+        finally:
+            try:
+                conn.logout()
+            except (imaplib.IMAP4.error, OSError):
+                pass
+
+    @staticmethod
+    def _parse_fetch(data):
+        """(uid, MailMessage) pairs from an imaplib FETCH response"""
+        messages, current = [], None
+        for item in data:
+            prefix, literal = item if isinstance(item, tuple) else (item, None)
+            if prefix is None:
+                continue
+            if re.match(rb'\d+ \(', prefix):
+                current = {'meta': b'', 'header': b'', 'text': b''}
+                messages.append(current)
+            if current is None:
+                continue
+            current['meta'] += prefix
+            if literal is not None:
+                current['header' if b'HEADER' in prefix.upper() else 'text'] = literal
+        pairs = []
+        for message in messages:
+            match = re.search(rb'UID (\d+)', message['meta'])
+            if match:
+                pairs.append((int(match.group(1)), parse_message(message['header'], message['text'])))
+        return pairs
+
+
+def open_source(spec, user=None, password=None):
+    """Source for a path (Maildir when it is a directory, else mbox) or imap[s]://host[:port]/folder
+
+    user and password are the IMAP login; local mailboxes ignore them.
+    """
+    if spec.startswith(('imap://', 'imaps://')):
+        match = re.match(r'imaps?://([^/:]+)(?::(\d+))?(?:/(.+))?$', spec)
+        if match is None:
+            raise ValueError(f'Bad IMAP source {spec!r}; expected imaps://host[:port]/folder')
+        host, port, folder = match.groups()
+        return IMAPSource(host, user, password, folder=folder or 'INBOX', port=int(port) if port else None,
+                          ssl=spec.startswith('imaps://'))
+    return MaildirSource(spec) if Path(spec).is_dir() else MboxSource(spec)
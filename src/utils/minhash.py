@@ -0,0 +1,73 @@
+"""
+MinHash / LSH
+Signatures estimating the Jaccard similarity of two texts' word shingles, and
+the banded keys that make near-duplicates land in a shared LSH bucket.
+
+With 128 permutations in 16 bands of 8 rows, two texts share a bucket with
+probability 1 - (1 - s^8)^16: ~0.98 at 80% shingle overlap and under 0.1 at
+50%, so bucket candidates only need a cheap signature comparison to confirm.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_SIZE = 5
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a < 2^31
+# keeps a * x + b inside uint64
+_PRIME = np.uint64(4294967311)
+_WORD = re.compile(r'\w+')
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of lowercase word n-grams; a shorter text is a single shingle"""
+    words = _WORD.findall((text or '').lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Fixed family of permutations; signatures are only comparable under the same seed"""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.num_perm = num_perm
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 31, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text):
+        """uint32 signature of a text's shingles, None when it has no words"""
+        grams = shingles(text)
+        if not grams:
+            return None
+        hashes = np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature):
+        """One signed 64-bit bucket key per band (SQLite INTEGER range)"""
+        return [
+            int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'big', signed=True)
+            for band in np.split(signature, self.bands)
+        ]
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+def to_blob(signature):
+    return signature.astype('<u4').tobytes()
+
+
+def from_blob(blob):
+    return np.frombuffer(blob, dtype='<u4')
@@ -0,0 +1,40 @@
+"""
+Rate limiter
+Thread-safe token bucket shared by every worker of a pipeline stage
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Allow at most `rate` acquisitions per second, with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def wrap(self, fn):
+        """Return fn rate-limited by this limiter"""
+        def limited(*args, **kwargs):
+            self.acquire()
+            return fn(*args, **kwargs)
+        return limited
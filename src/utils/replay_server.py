@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Replay server
+Serves recorded LinkedIn pages from a fixtures directory over local HTTP, so
+scrapers and enrichers can run against it instead of the network:
+
+    python src/utils/replay_server.py serve tests/fixtures/linkedin --port 8765
+    LINKEDIN_BASE_URL=http://127.0.0.1:8765 python main.py scrape
+
+and records new fixtures from the live site:
+
+    python src/utils/replay_server.py record tests/fixtures/linkedin \\
+        "https://www.linkedin.com/jobs/search?keywords=python+developer&location=Netherlands"
+
+The directory holds the pages plus a manifest.json of routes. A route matches
+a request when its path (fnmatch pattern) matches and every query parameter it
+lists has the given value; the first matching route wins. Unmatched requests
+get an empty 404, which the scrapers read as "no results".
+"""
+
+import argparse
+import fnmatch
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+MANIFEST = 'manifest.json'
+
+
+def load_routes(fixtures_dir):
+    """Routes from a fixtures directory's manifest, [] when it has none"""
+    manifest = Path(fixtures_dir) / MANIFEST
+    if not manifest.exists():
+        return []
+    return json.loads(manifest.read_text())['routes']
+
+
+def match_route(routes, path, params):
+    """First route matching a request path and its query parameters, or None"""
+    for route in routes:
+        if not fnmatch.fnmatchcase(path, route['path']):
+            continue
+        if all(params.get(key) == str(value) for key, value in route.get('params', {}).items()):
+            return route
+    return None
+
+
+class ReplayServer:
+    """Threaded local HTTP server replaying a fixtures directory
+
+    latency: seconds added to every response, to model network round trips
+    in benchmarks.
+    """
+
+    def __init__(self, fixtures_dir, host='127.0.0.1', port=0, latency=0.0):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.routes = load_routes(fixtures_dir)
+        self.latency = latency
+        self.hits = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = dict(parse_qsl(parts.query))
+                route = match_route(server.routes, parts.path, params)
+                with server._lock:
+                    server.hits.append((parts.path, params, route['file'] if route else None))
+                if server.latency:
+                    time.sleep(server.latency)
+
+                body = (server.fixtures_dir / route['file']).read_bytes() if route else b''
+                self.send_response(route.get('status', 200) if route else 404)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def record(url, fixtures_dir, name=None, match_params=('keywords', 'start')):
+    """Fetch a live page into the fixtures directory and add a route for it
+
+    The route matches the URL's path and those of its query parameters named
+    in match_params. Returns the route.
+    """
+    import requests
+
+    fixtures_dir = Path(fixtures_dir)
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    response = requests.get(url, headers={
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+    }, timeout=30)
+    response.raise_for_status()
+
+    if name is None:
+        slug = '-'.join([parts.path] + [params[key] for key in match_params if key in params])
+        name = re.sub(r'[^a-z0-9]+', '-', slug.lower()).strip('-') + '.html'
+    (fixtures_dir / name).parent.mkdir(parents=True, exist_ok=True)
+    (fixtures_dir / name).write_bytes(response.content)
+
+    route = {'path': parts.path, 'file': name}
+    matched = {key: params[key] for key in match_params if key in params}
+    if matched:
+        route['params'] = matched
+    routes = [r for r in load_routes(fixtures_dir) if (r['path'], r.get('params')) != (route['path'], route.get('params'))]
+    # Specific routes go before catch-all patterns
+    routes.insert(next((i for i, r in enumerate(routes) if '*' in r['path']), len(routes)), route)
+    (fixtures_dir / MANIFEST).write_text(json.dumps({'routes': routes}, indent=2) + '\n')
+    return route
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record and replay LinkedIn pages')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='Serve a fixtures directory')
+    serve.add_argument('fixtures_dir')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    rec = sub.add_parser('record', help='Record live pages into a fixtures directory')
+    rec.add_argument('fixtures_dir')
+    rec.add_argument('urls', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        for url in args.urls:
+            route = record(url, args.fixtures_dir)
+            print(f"📼 {url} -> {route['file']}")
+        return
+
+    server = ReplayServer(args.fixtures_dir, args.host, args.port, args.latency)
+    print(f"🔁 Replaying {args.fixtures_dir} on {server.url} ({len(server.routes)} routes)")
+    print(f"   export LINKEDIN_BASE_URL={server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -46,7 +46,7 @@ def main():
     if followup:
         for job in followup[:5]:
             print(f'   • {job["title"]} at {job["company"]}')
-            print(f'     Applied: {job["applied_date"][:10]} (ID: {job["id"]})')
+            print(f'     Applied: {job["applied_at"][:10]} (ID: {job["id"]})')
     else:
         print('   None (or no applications sent yet)')
     
@@ -55,7 +55,7 @@ def main():
     recent = tracker.get_recent_jobs(limit=5)
     for job in recent:
         print(f'   • {job["title"]} at {job["company"]}')
-        print(f'     Scraped: {job["scraped_date"][:10]} | Status: {job["status"]}')
+        print(f'     Scraped: {job["scraped_at"][:10]} | Status: {job["status"]}')
     
     print('\\n' + '='*70)
     print('\\n💡 Quick Commands:')
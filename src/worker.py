@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Task Worker
+Consumes the durable task queue (enrich / analyze / apply_link / cover_letter).
+
+Run any number of these alongside the UI; each claims one task at a time under a
+lease that is kept alive by heartbeats, so a crashed worker's task is retried by
+another one once its lease expires.
+
+Usage:
+    python main.py worker                      # all task types
+    python main.py worker --types analyze      # only analysis
+"""
+
+import json
+import logging
+import threading
+import time
+
+from company_research import CompanyResearch, company_context
+from database.rows import JOB_ANALYSIS_FIELDS
+from database.task_queue import TASK_TYPES, default_worker_id
+
+logger = logging.getLogger(__name__)
+
+# Seconds between lease/liveness heartbeats; well inside the queue's lease and live_workers() window
+HEARTBEAT_INTERVAL = 15
+
+
+class TaskHandlers:
+    """Default handlers; scrapers and the analyzer are created on first use"""
+
+    def __init__(self, db, analyzer=None):
+        self.db = db
+        self._analyzer = analyzer
+        self._enricher = None
+        self._link_extractor = None
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            from analyzers.analyzer_ai import AIJobAnalyzer
+            self._analyzer = AIJobAnalyzer()
+        return self._analyzer
+
+    @property
+    def enricher(self):
+        if self._enricher is None:
+            from scrapers.smart_description_enricher import SmartDescriptionEnricher
+            self._enricher = SmartDescriptionEnricher()
+        return self._enricher
+
+    @property
+    def link_extractor(self):
+        if self._link_extractor is None:
+            from scrapers.apply_link_extractor import ApplyLinkExtractor
+            self._link_extractor = ApplyLinkExtractor()
+        return self._link_extractor
+
+    def as_dict(self):
+        return {
+            'enrich': self.enrich,
+            'analyze': self.analyze,
+            'apply_link': self.apply_link,
+            'cover_letter': self.cover_letter,
+        }
+
+    def _job(self, job_id, fields):
+        rows = self.db.select_jobs(fields, where='id = ?', params=(job_id,))
+        if not rows:
+            raise LookupError(f'Job {job_id} no longer exists')
+        return rows[0]
+
+    def enrich(self, task):
+        job = self._job(task['job_id'], ('id', 'url'))
+        description = self.enricher.fetch_with_retry(job.url)
+        if not description or len(description) < 100:
+            raise RuntimeError('No usable description found')
+        self.db.update_job_description(job.id, description)
+        self.db.mark_job_enriched(job.id)
+        # Enriched jobs are ready for analysis
+        self.db.tasks.enqueue('analyze', job.id, priority=task['priority'])
+        return {'length': len(description)}
+
+    def analyze(self, task):
+        job = self._job(task['job_id'], JOB_ANALYSIS_FIELDS + ('company_id',))
+        # A near-duplicate may have been analyzed since this task was queued
+        reused = self.db.get_cluster_analysis(job.id)
+        if reused is not None:
+            return {'score': reused['score'], 'reused_from': reused['reused_from']}
+        company_info = CompanyResearch(self.db).contexts([job.company_id]).get(job.company_id)
+        analysis = self.analyzer.analyze_job_fit(dict(job.to_dict(), company_info=company_info) if company_info else job)
+        self.db.update_analysis(job.id, analysis)
+        return {'score': analysis.get('score')}
+
+    def apply_link(self, task):
+        job = self._job(task['job_id'], ('id', 'url'))
+        link = self.link_extractor.get_apply_link(job.url)
+        if link:
+            self.db.update_apply_link(job.id, link)
+        return {'link': link}
+
+    def cover_letter(self, task):
+        job = self._job(task['job_id'], JOB_ANALYSIS_FIELDS + (
+            'company_id', 'ai_score', 'ai_strengths', 'ai_concerns', 'ai_fit_assessment', 'ai_recommendation'
+        ))
+        analysis = None
+        if job.ai_score is not None:
+            analysis = {
+                'score': job.ai_score,
+                'strengths': json.loads(job.ai_strengths or '[]'),
+                'concerns': json.loads(job.ai_concerns or '[]'),
+                'fit_assessment': job.ai_fit_assessment or '',
+                'recommendation': job.ai_recommendation or '',
+            }
+        # Researches the company first if the cache has nothing current on it
+        company = CompanyResearch(self.db, self.analyzer).ensure([job.company_id]).get(job.company_id)
+        letter = self.analyzer.generate_cover_letter(job.to_dict(), analysis, company_context(company))
+        self.db.update_cover_letter(job.id, letter)
+        return {'length': len(letter)}
+
+
+class _LeaseKeeper:
+    """Heartbeats a claimed task's lease from a side thread while its handler runs"""
+
+    def __init__(self, queue, task_id, worker_id, interval):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(queue, task_id, worker_id, interval), daemon=True
+        )
+
+    def _run(self, queue, task_id, worker_id, interval):
+        while not self._stop.wait(interval):
+            queue.worker_heartbeat(worker_id)
+            if not queue.heartbeat(task_id, worker_id):
+                logger.warning('Lost lease on task %s', task_id)
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class Worker:
+    """Claims tasks from db.tasks and dispatches them to handlers"""
+
+    def __init__(self, db, handlers=None, task_types=None, worker_id=None,
+                 poll_interval=2.0, heartbeat_interval=HEARTBEAT_INTERVAL):
+        self.db = db
+        self.queue = db.tasks
+        self.handlers = handlers if handlers is not None else TaskHandlers(db).as_dict()
+        self.task_types = tuple(task_types or TASK_TYPES)
+        unknown = set(self.task_types) - set(self.handlers)
+        if unknown:
+            raise ValueError(f'No handler for task types: {", ".join(sorted(unknown))}')
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.processed = 0
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def run_one(self):
+        """Claim and process a single task; returns False if none was runnable"""
+        task = self.queue.claim(self.worker_id, self.task_types)
+        if task is None:
+            return False
+
+        logger.info('Task %s: %s job %s (attempt %s)', task['id'], task['task_type'], task['job_id'], task['attempts'])
+        try:
+            with _LeaseKeeper(self.queue, task['id'], self.worker_id, self.heartbeat_interval):
+                result = self.handlers[task['task_type']](task)
+        except Exception as e:
+            logger.warning('Task %s failed: %s', task['id'], e)
+            self.queue.fail(task['id'], self.worker_id, e)
+        else:
+            self.queue.complete(task['id'], self.worker_id, result)
+        self.processed += 1
+        return True
+
+    def run(self, max_tasks=None, exit_when_idle=False):
+        """Process tasks until stopped, max_tasks is reached, or (optionally) the queue is empty"""
+        self.queue.register_worker(self.worker_id, self.task_types)
+        last_beat = time.monotonic()
+        try:
+            while not self._stopping.is_set():
+                if max_tasks is not None and self.processed >= max_tasks:
+                    break
+                if time.monotonic() - last_beat >= self.heartbeat_interval:
+                    self.queue.worker_heartbeat(self.worker_id)
+                    last_beat = time.monotonic()
+                if not self.run_one():
+                    if exit_when_idle:
+                        break
+                    self._stopping.wait(self.poll_interval)
+        finally:
+            self.queue.unregister_worker(self.worker_id)
+        return self.processed
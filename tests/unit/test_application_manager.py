@@ -0,0 +1,83 @@
+"""Unit tests for batched application preparation."""
+
+import json
+import os
+import tempfile
+import time
+
+import pytest
+from analyzers.analyzer_ai import AIJobAnalyzer
+from analyzers.llm_client import FakeLLMClient, constant
+from application_manager import ApplicationManager
+from database.enhanced_database import JobDatabase
+
+COMPANIES = ['Adyen', 'Picnic', 'Mollie']
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    path = tmp_path / 'profile.json'
+    path.write_text(json.dumps({'name': 'Test', 'skills': ['Python'], 'experience': []}))
+    return AIJobAnalyzer(profile_path=str(path), client=FakeLLMClient(latency=constant(0.2)))
+
+
+def _add_jobs(db, count):
+    ids = []
+    for i in range(count):
+        job_id = db.add_job({
+            'title': f'Python Developer {i}', 'company': COMPANIES[i % len(COMPANIES)], 'location': 'Amsterdam',
+            'url': f'https://www.linkedin.com/jobs/view/{4300000000 + i}', 'description': 'Build Python services.',
+        })
+        db.update_analysis(job_id, {'score': 80, 'strengths': ['Python'], 'concerns': []})
+        ids.append(job_id)
+    return ids
+
+
+def _link(url):
+    time.sleep(0.2)
+    return f'https://jobs.lever.co/acme/{url.rsplit("/", 1)[-1]}'
+
+
+def test_batch_runs_concurrently_and_researches_each_company_once(db, analyzer):
+    ids = _add_jobs(db, 20)
+    manager = ApplicationManager(db, analyzer, link_extractor=_link, concurrency=20, link_concurrency=20)
+    started = time.monotonic()
+    prepared = manager.prepare_applications(ids)
+    # Serially: 3 research calls, 20 cover letters and 20 link extractions of 0.2s each
+    assert time.monotonic() - started < 2.0
+    assert analyzer.client.stats()['calls'] == len(COMPANIES) + 20
+    assert [application['job_id'] for application in prepared] == ids
+    assert prepared[0]['apply_url'] == 'https://jobs.lever.co/acme/4300000000'
+
+    assert prepared[0]['company_info']
+
+    rows = db.select_jobs(('id', 'status', 'cover_letter', 'application_link'), where='id = ?', params=(ids[0],))
+    assert rows[0].status == 'ready_to_apply'
+    assert rows[0].cover_letter
+    assert rows[0].application_link == prepared[0]['apply_url']
+
+
+def test_stored_research_is_reused(db, analyzer):
+    ids = _add_jobs(db, 6)
+    manager = ApplicationManager(db, analyzer, link_extractor=None)
+    manager.prepare_applications(ids[:3])
+    calls = analyzer.client.stats()['calls']
+    prepared = manager.prepare_applications(ids[3:])
+    assert analyzer.client.stats()['calls'] == calls + 3
+    assert all(application['company_info'] for application in prepared)
+
+
+def test_track_application(db, analyzer):
+    job_id, = _add_jobs(db, 1)
+    manager = ApplicationManager(db, analyzer, link_extractor=None)
+    assert manager.prepare_application(-1) is None
+    assert list(manager.track_application([job_id])) == [job_id]
+    assert db.select_jobs(('status',), where='id = ?', params=(job_id,))[0].status == 'applied'
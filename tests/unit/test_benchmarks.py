@@ -0,0 +1,30 @@
+"""Smoke test for the benchmark suite and its synthetic corpus."""
+
+import sqlite3
+
+from benchmarks.corpus import build_database, generate_jobs
+from benchmarks.run_benchmarks import run
+
+
+def test_corpus_is_deterministic():
+    first = list(generate_jobs(50, seed=3))
+    assert first == list(generate_jobs(50, seed=3))
+    assert all(300 <= len(job['description']) <= 12000 for job in first)
+    assert len({job['job_id'] for job in first}) == 50
+
+
+def test_build_database(tmp_path):
+    db_path = build_database(str(tmp_path / 'corpus.db'), 300)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 300
+    assert conn.execute('SELECT COUNT(*) FROM jobs_fts').fetchone()[0] == 300
+    conn.close()
+
+
+def test_run_writes_summaries(tmp_path):
+    results = run(200, db_path=str(tmp_path / 'bench.db'), sample=20, only=['dedup.', 'extract.', 'ui.jobs_page'])
+    assert results['meta']['rows'] == 200
+    assert set(results['results']) >= {'dedup.job_exists_advanced.hit', 'extract.detect_language', 'ui.jobs_page.first'}
+    summary = results['results']['dedup.job_exists_advanced.hit']
+    assert summary['ops'] == 20
+    assert summary['p50_ms'] <= summary['p95_ms']
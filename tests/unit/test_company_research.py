@@ -0,0 +1,122 @@
+"""Unit tests for the per-company research cache."""
+
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import timedelta
+
+import pytest
+from analyzers.analyzer_ai import AIJobAnalyzer
+from analyzers.llm_client import FakeLLMClient
+from company_research import CompanyResearch, company_context
+from database.enhanced_database import JobDatabase
+from database.migrations import migrate
+
+RESEARCH = '''ABOUT: Adyen builds a payments platform for global merchants.
+SIZE: 4000+
+CAREERS: https://careers.adyen.com
+VISA_SPONSOR: yes'''
+
+
+class ResearchClient(FakeLLMClient):
+    def __init__(self):
+        super().__init__()
+        self.researched = []
+
+    def complete(self, prompt, max_tokens=1000, temperature=None):
+        if 'VISA_SPONSOR:' in prompt:
+            self.researched.append(prompt.split('employer ', 1)[1].split('.\n', 1)[0])
+            return RESEARCH
+        return super().complete(prompt, max_tokens, temperature)
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    path = tmp_path / 'profile.json'
+    path.write_text(json.dumps({'name': 'Test', 'skills': ['Python'], 'experience': []}))
+    return AIJobAnalyzer(profile_path=str(path), client=ResearchClient())
+
+
+def _company_ids(db, companies):
+    for i, company in enumerate(companies):
+        db.add_job({
+            'title': f'Python Developer {i}', 'company': company, 'location': 'Amsterdam',
+            'url': f'https://www.linkedin.com/jobs/view/{4300000000 + i}', 'description': 'Build Python services.',
+        })
+    return list(dict.fromkeys(db.find_company_id(company) for company in companies))
+
+
+def test_research_is_cached_per_company(db, analyzer):
+    adyen, picnic = _company_ids(db, ['Adyen', 'Adyen N.V.', 'Adyen', 'Picnic'])
+    research = CompanyResearch(db, analyzer)
+    companies = research.ensure([adyen, picnic, adyen])
+    assert sorted(analyzer.client.researched) == ['Adyen', 'Picnic']
+    assert companies[adyen].visa_sponsor == 1
+    assert companies[adyen].careers_url == 'https://careers.adyen.com'
+    assert company_context(companies[adyen]).splitlines()[1:] == [
+        'Size: 4000+ employees', 'Recognised visa sponsor: yes', 'Careers page: https://careers.adyen.com',
+    ]
+
+    research.ensure([adyen, picnic])
+    assert len(analyzer.client.researched) == 2
+    assert set(CompanyResearch(db).contexts([adyen, picnic])) == {adyen, picnic}
+
+
+def test_refresh_redoes_expired_research_most_jobs_first(db, analyzer):
+    picnic, adyen, _ = _company_ids(db, ['Picnic', 'Adyen', 'Mollie', 'Adyen'])
+    research = CompanyResearch(db, analyzer)
+    assert research.refresh(limit=2) == 2
+    assert analyzer.client.researched == ['Adyen', 'Picnic']
+    assert research.refresh() == 1
+    assert research.refresh() == 0
+
+    expired = CompanyResearch(db, analyzer, ttl=timedelta(0))
+    assert expired.refresh() == 3
+    assert research.refresh([adyen], force=True) == 1
+
+
+def test_failed_research_keeps_the_previous_entry(db, analyzer):
+    adyen, = _company_ids(db, ['Adyen'])
+    CompanyResearch(db, analyzer).ensure([adyen])
+    analyzer.client.complete = lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError('down'))
+    assert CompanyResearch(db, analyzer, ttl=timedelta(0)).refresh() == 0
+    assert CompanyResearch(db).cached([adyen])[adyen].about.startswith('Adyen builds')
+
+
+def test_migration_moves_per_job_research_to_companies(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'old.db')
+    migrate(conn, target=15)
+    conn.execute("INSERT INTO companies (id, name) VALUES (1, 'Adyen')")
+    conn.execute("INSERT INTO jobs (title, company, url, company_id, company_info, updated_at) "
+                 "VALUES ('Dev', 'Adyen', 'u1', 1, 'Payments company', '2025-09-01')")
+    migrate(conn)
+    assert conn.execute('SELECT about, researched_at FROM companies').fetchone() == ('Payments company', '2025-09-01')
+
+
+def test_streaming_analysis_includes_cached_research(db, analyzer):
+    pytest.importorskip('selenium')
+    from pipeline_orchestrator import JobSearchPipeline
+
+    adyen, = _company_ids(db, ['Adyen'])
+    CompanyResearch(db, analyzer).ensure([adyen])
+
+    class Scraper:
+        def scrape_jobs(self, query, location, time_filter=None):
+            return [{'title': 'Backend Developer', 'company': 'Adyen', 'location': location,
+                     'url': 'https://www.linkedin.com/jobs/view/4300000100', 'description': 'Payments in Python. ' * 10}]
+
+    analyzed = []
+    analyzer.analyze_job_fit = lambda job: analyzed.append(job) or {'score': 70}
+    JobSearchPipeline(scraper=Scraper(), enricher=object(), analyzer=analyzer).run_streaming(
+        queries=['python'], db=db, skip_enrich=True
+    )
+    assert analyzed[0]['company_info'].startswith('Adyen builds')
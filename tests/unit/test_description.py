@@ -1,22 +1,22 @@
 """Unit tests for description enrichment validation logic."""
 
 import pytest
-import re
+from pathlib import Path
+
+from scrapers.guest_description_fetcher import GuestDescriptionFetcher
+from scrapers.requirement_extractor import extract_requirements
+from scrapers.linkedin_urls import rebase_url
+from utils.replay_server import ReplayServer
+
+FIXTURES = Path(__file__).parent.parent / 'fixtures' / 'linkedin'
 
 
 class TestLanguageDetection:
     """Test the language detection logic from ValidatedEnricher."""
 
     def _detect_language(self, text):
-        """Mirror the fixed ValidatedEnricher._detect_language: count occurrences."""
-        dutch_words = ['een', 'van', 'het', 'de', 'en', 'is', 'voor', 'met', 'aan', 'bij']
-        words = text.lower().split()
-        dutch_count = sum(1 for word in words if word in dutch_words)
-        if dutch_count > 15:
-            return 'dutch'
-        elif dutch_count > 5:
-            return 'mixed'
-        return 'english'
+        """Occurrence counting, as in the requirement extractor."""
+        return extract_requirements(text)['language']
 
     def test_english_text(self):
         text = "We are looking for a Python developer with Django experience to join our team."
@@ -39,16 +39,7 @@ class TestExperienceExtraction:
     """Test experience years extraction regex."""
 
     def _extract_years(self, text):
-        patterns = [
-            r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-            r'minimaal\s+(\d+)\s+jaar',
-            r'at\s+least\s+(\d+)\s+years?',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                return int(match.group(1))
-        return None
+        return extract_requirements(text)['experience_years']
 
     def test_standard_format(self):
         assert self._extract_years("3+ years of experience") == 3
@@ -59,6 +50,18 @@ class TestExperienceExtraction:
     def test_at_least_format(self):
         assert self._extract_years("at least 2 years") == 2
 
+    def test_range_takes_upper_bound(self):
+        assert self._extract_years("3-5 years of experience") == 5
+        assert self._extract_years("3 – 5 years experience") == 5
+        assert self._extract_years("3 - 5 years of experience") == 5
+        assert self._extract_years("minimaal 2-4 jaar ervaring") == 4
+
+    def test_typographic_apostrophes(self):
+        assert self._extract_years("5+ years’ experience") == 5
+        assert self._extract_years("5+ years' experience") == 5
+        assert extract_requirements("A Master’s degree in CS is required")['degree_requirement'] == 'masters'
+        assert extract_requirements("Bachelor’s degree required")['degree_requirement'] == 'bachelors'
+
     def test_no_experience(self):
         assert self._extract_years("Junior position, no experience needed") is None
 
@@ -67,17 +70,7 @@ class TestQualityScore:
     """Test description quality scoring logic."""
 
     def _quality_score(self, text):
-        score = 0
-        if len(text) > 2000: score += 30
-        elif len(text) > 1000: score += 20
-        elif len(text) > 500: score += 10
-        sections = ['requirements', 'responsibilities', 'qualifications', 'about']
-        for section in sections:
-            if section in text.lower():
-                score += 10
-        if text.count('\n') > 5: score += 10
-        if text.count('-') > 5: score += 10
-        return min(score, 100)
+        return extract_requirements(text)['quality_score']
 
     def test_short_text_low_score(self):
         assert self._quality_score("Short description") < 20
@@ -89,3 +82,75 @@ class TestQualityScore:
         text = text * 5  # Make it long enough
         score = self._quality_score(text)
         assert score >= 60
+
+
+class TestRequirementExtractor:
+    def test_degree_needs_required_context(self):
+        assert extract_requirements("Bachelor's degree in Computer Science is required")['degree_requirement'] == 'bachelors'
+        assert extract_requirements("Our team has people with a master's or a PhD.")['degree_requirement'] is None
+        assert extract_requirements("Een afgeronde WO opleiding")['degree_requirement'] == 'masters'
+
+    def test_highest_required_degree_wins(self):
+        text = "MSc required. A PhD is a must for the research track."
+        assert extract_requirements(text)['degree_requirement'] == 'phd'
+
+    def test_experience_pattern_priority(self):
+        assert self._years("At least 2 years in a team. 5+ years of experience with Python.") == 5
+        assert self._years("Minimaal 3 jaar ervaring") == 3
+        assert self._years("Experience with Python") is None
+
+    def _years(self, text):
+        return extract_requirements(text)['experience_years']
+
+    def test_requirement_flags(self):
+        result = extract_requirements("Must have: fluent Dutch. Visa sponsorship available, hybrid working.")
+        assert result['requirements_found']
+        assert result['flags'] == ['dutch_language', 'hybrid', 'visa_sponsorship']
+        assert not extract_requirements("We build things.")['requirements_found']
+
+    def test_numbered_list_counts_as_structure(self):
+        plain = "Tasks: build services and write tests"
+        numbered = "Tasks:\n1. build services\n2. write tests"
+        assert extract_requirements(numbered)['quality_score'] == extract_requirements(plain)['quality_score'] + 10
+        assert extract_requirements("Salary EUR 4.000 - 5.500")['quality_score'] == 0
+
+    def test_empty_text(self):
+        result = extract_requirements(None)
+        assert result['language'] == 'english'
+        assert result['quality_score'] == 0
+
+
+class TestRebaseUrl:
+    def test_live_base_leaves_urls_alone(self, monkeypatch):
+        monkeypatch.delenv('LINKEDIN_BASE_URL', raising=False)
+        url = 'https://nl.linkedin.com/jobs/view/python-developer-at-adyen-4300000222'
+        assert rebase_url(url) == url
+
+    def test_points_linkedin_urls_at_replay_host(self):
+        url = 'https://nl.linkedin.com/jobs/view/python-developer-at-adyen-4300000222?position=1'
+        assert rebase_url(url, 'http://127.0.0.1:8765') == \
+            'http://127.0.0.1:8765/jobs/view/python-developer-at-adyen-4300000222?position=1'
+        assert rebase_url('https://careers.example.com/apply/1', 'http://127.0.0.1:8765') == \
+            'https://careers.example.com/apply/1'
+
+
+@pytest.fixture(scope='module')
+def fetcher():
+    with ReplayServer(FIXTURES) as server:
+        yield GuestDescriptionFetcher(base_url=server.url, max_retries=1)
+
+
+class TestGuestDescriptionFetcher:
+    """Browserless enrichment against recorded job pages."""
+
+    def test_fetches_recorded_description(self, fetcher):
+        desc = fetcher.fetch_with_retry('https://nl.linkedin.com/jobs/view/python-developer-at-adyen-4300000222')
+        assert 'What we are looking for' in desc or 'Wat vragen wij' in desc
+        assert len(desc) > 500
+
+    def test_unrecorded_job_falls_back_to_generic_page(self, fetcher):
+        desc = fetcher.fetch_with_retry('https://www.linkedin.com/jobs/view/1')
+        assert 'Software Engineer' in desc
+
+    def test_missing_page_returns_empty(self, fetcher):
+        assert fetcher.fetch_with_retry('https://www.linkedin.com/company/adyen') == ""
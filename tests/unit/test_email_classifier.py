@@ -0,0 +1,57 @@
+"""Unit tests for the local email response classifier."""
+
+import pytest
+from analyzers.email_classifier import LABELS, EmailClassifier, classify_email, default_classifier
+
+# Held out from SEED_EMAILS
+EXAMPLES = [
+    ('Interview invitation', 'Thanks for applying', 'interview_invite'),
+    ('Update', 'We would love to set up a chat with the team next Tuesday. What times work for you?', 'interview_invite'),
+    ('Uitnodiging voor een gesprek', 'Wij willen je graag spreken over de functie.', 'interview_invite'),
+    ('Your offer letter', '', 'offer'),
+    ('Gefeliciteerd!', 'We bieden je graag de functie aan. Het contract volgt per mail.', 'offer'),
+    ('Application received', '', 'application_confirmed'),
+    ('Wij hebben je sollicitatie ontvangen', 'Je hoort binnen 5 werkdagen van ons.', 'application_confirmed'),
+    ('Status of your application', 'We have decided to pursue other applicants for this role.', 'rejection'),
+    ('Je sollicitatie bij Bol', 'Helaas hebben we gekozen voor iemand anders.', 'rejection'),
+    ('Your application to ACME', 'We regret that we cannot offer you the position.', 'rejection'),
+    ('Your application', 'Sadly we are not able to offer you an interview.', 'rejection'),
+    ('Backend Engineer at Mollie', 'We are unable to offer you this role.', 'rejection'),
+    ('Je sollicitatie bij ACME', 'Het spijt ons, maar we kunnen je geen aanbod doen.', 'rejection'),
+    ('Sollicitatie Backend Developer', 'Met spijt delen wij u mee dat wij u de functie niet kunnen aanbieden.', 'rejection'),
+    ('Weekly digest', '10 new jobs for you', 'other'),
+]
+
+
+@pytest.mark.parametrize('subject, body, label', EXAMPLES)
+def test_held_out_examples(subject, body, label):
+    assert classify_email(subject, body) == label
+
+
+def test_confirmation_subject_defers_to_a_rejection_body():
+    body = 'Unfortunately we decided to move on with other candidates.'
+    assert classify_email('Thank you for your application', body) == 'rejection'
+    assert classify_email('Your application at Adyen', body) == 'rejection'
+
+
+def test_bare_offer_only_counts_in_the_subject():
+    assert classify_email('Your application', 'We offer a great team.') == 'other'
+    assert classify_email('An offer for you') == 'offer'
+
+
+def test_batch_matches_single_emails():
+    subjects, bodies, _ = zip(*EXAMPLES)
+    classifier = default_classifier()
+    assert classifier.classify(list(subjects), list(bodies)) == [classify_email(s, b) for s, b in zip(subjects, bodies)]
+    probabilities = classifier.predict_proba(list(subjects), list(bodies))
+    assert probabilities.shape == (len(EXAMPLES), len(LABELS))
+    assert probabilities.sum(axis=1) == pytest.approx(1.0)
+    assert classifier.classify([]) == []
+
+
+def test_fit_learns_new_wording():
+    subjects = ['Assessment center', 'Assessment center', 'Company update', 'Company update']
+    bodies = ['Join our assessment day', 'Join our assessment day on Monday', 'Read our blog', 'Read our blog today']
+    labels = ['interview_invite', 'interview_invite', 'other', 'other']
+    classifier = EmailClassifier(phrases={}).fit(subjects, bodies, labels)
+    assert classifier.classify(['Assessment center'], ['Join our assessment day next week']) == ['interview_invite']
@@ -0,0 +1,122 @@
+"""Unit tests for the email-to-job matcher."""
+
+import os
+import tempfile
+from collections import namedtuple
+
+import pytest
+from database.company_senders import ats_tenant, registered_domain, sender_keys
+from database.enhanced_database import JobDatabase
+from email_matcher import MATCH_FIELDS, EmailMatcher
+from utils.mailbox_sources import MailMessage
+
+ALIASES = [('adyen', 1), ('booking com', 2), ('picnic', 3), ('mollie', 4)]
+
+Job = namedtuple('Job', MATCH_FIELDS)
+
+
+def _job(job_id, company_id, title='Backend Developer', status='new', applied_at=None, created_at='2025-08-01'):
+    return Job(job_id, company_id, title, status, applied_at, created_at, None)
+
+
+def _matcher(jobs, senders=()):
+    return EmailMatcher(ALIASES, senders, lambda company_ids: [job for job in jobs if job.company_id in company_ids])
+
+
+def _mail(sender, subject, body='', date='2025-09-01T10:00:00+02:00'):
+    return MailMessage('<id@x>', sender, subject, date, body)
+
+
+class TestLookups:
+    def test_registered_domain(self):
+        assert registered_domain('careers.adyen.com') == 'adyen.com'
+        assert registered_domain('mail.bbc.co.uk') == 'bbc.co.uk'
+
+    def test_ats_tenant(self):
+        assert ats_tenant('https://boards.greenhouse.io/adyen/jobs/123') == 'adyen'
+        assert ats_tenant('https://jobs.lever.co/mollie/abc') == 'mollie'
+        assert ats_tenant('https://picnic.wd3.myworkdayjobs.com/en-US/careers') == 'picnic'
+        assert ats_tenant('https://careers.adyen.com/vacancies') is None
+
+    def test_sender_keys(self):
+        assert sender_keys('https://boards.greenhouse.io/adyen/jobs/1', 'anna@adyen-recruit.nl') == [
+            'adyen-recruit.nl', 'ats:adyen'
+        ]
+        assert sender_keys('https://careers.adyen.com/vacancies/1') == ['adyen.com']
+        assert sender_keys('https://www.linkedin.com/jobs/view/1', 'someone@gmail.com') == []
+
+
+class TestMatcher:
+    def test_sender_domain_names_the_company(self):
+        matcher = _matcher([_job(10, 1), _job(20, 2)])
+        assert matcher.match(_mail('Recruiting <talent@adyen.com>', 'Hello')) == 10
+        assert matcher.match(_mail('jobs@email.booking.com', 'Hello')) == 20
+
+    def test_learned_senders(self):
+        matcher = _matcher([_job(10, 1), _job(30, 3)], senders=[('adyen-recruit.nl', 1), ('ats:pcnc', 3)])
+        assert matcher.match(_mail('anna@adyen-recruit.nl', 'Quick question')) == 10
+        assert matcher.match(_mail('pcnc@myworkday.com', 'Next steps')) == 30
+        assert matcher.match(_mail('picnic@myworkday.com', 'Next steps')) == 30
+
+    def test_ats_mail_is_matched_by_the_company_it_names(self):
+        matcher = _matcher([_job(10, 1), _job(40, 4)])
+        assert matcher.match(_mail('Mollie Hiring Team <no-reply@us.greenhouse-mail.io>', 'Your application')) == 40
+        assert matcher.match(_mail('no-reply@hire.lever.co', 'Update', body='The Adyen team')) == 10
+        assert matcher.match(_mail('no-reply@hire.lever.co', 'Update')) is None
+
+    def test_sender_outranks_mentions(self):
+        matcher = _matcher([_job(10, 1), _job(30, 3)])
+        assert matcher.match(_mail('talent@picnic.app', 'We met at the Adyen meetup')) == 30
+
+    def test_candidates_ranked_by_status_then_recency(self):
+        matcher = _matcher([
+            _job(10, 1, status='applied', applied_at='2025-08-10'),
+            _job(11, 1, created_at='2025-08-30'),
+            _job(12, 1, status='applied', applied_at='2025-08-20'),
+            _job(13, 1, status='applied', applied_at='2025-09-15'),
+        ])
+        assert matcher.match(_mail('talent@adyen.com', 'Your application')) == 12
+
+    def test_title_in_subject_picks_between_applications(self):
+        matcher = _matcher([
+            _job(10, 1, title='Data Engineer', status='applied', applied_at='2025-08-10'),
+            _job(11, 1, title='Backend Developer', status='applied', applied_at='2025-08-20'),
+        ])
+        assert matcher.match(_mail('talent@adyen.com', 'Interview: Data Engineer')) == 10
+
+    def test_match_batch(self):
+        matcher = _matcher([_job(10, 1)])
+        assert matcher.match_batch([
+            _mail('talent@adyen.com', 'Interview invitation'),
+            _mail('news@example.com', 'Weekly digest'),
+        ]) == [(10, 'interview_invite'), (None, 'other')]
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+def test_load_from_database(db):
+    booking, picnic = [db.add_job({
+        'title': 'Python Developer', 'company': company, 'location': 'Amsterdam',
+        'url': f'https://www.linkedin.com/jobs/view/{4300000000 + i}',
+    }) for i, company in enumerate(['Booking.com', 'Picnic'])]
+    db.mark_applied([booking])
+    db.update_apply_link(picnic, 'https://jobs.lever.co/picnic-technologies/123')
+    matcher = EmailMatcher.load(db)
+    assert matcher.match(_mail('noreply@booking.com', 'Your application for Python Developer')) == booking
+    assert matcher.match(_mail('picnic-technologies@hire.lever.co', 'Next steps')) == picnic
+
+
+def test_reply_candidates_skip_old_unapplied_postings(db):
+    ids = [db.add_job({
+        'title': f'Python Developer {i}', 'company': 'Adyen', 'location': 'Amsterdam',
+        'url': f'https://www.linkedin.com/jobs/view/{4300000000 + i}',
+    }) for i in range(8)]
+    db.mark_applied([ids[0]])
+    company_id = db.find_company_id('Adyen')
+    assert sorted(job.id for job in db.get_reply_candidates([company_id], newest=3)) == [ids[0]] + ids[-3:]
@@ -0,0 +1,202 @@
+"""Unit tests for mailbox sources and incremental email ingestion."""
+
+import os
+import tempfile
+from email.message import EmailMessage
+
+import pytest
+from database.enhanced_database import JobDatabase
+from email_monitor import EmailMonitor
+from utils.imap_server import LocalIMAPServer
+from utils.mailbox_sources import BODY_BYTES, IMAPSource, MaildirSource, MboxSource, parse_message
+
+
+def _raw(i, subject, sender='Adyen Recruiting <jobs@adyen.com>', body='Thanks for applying.', attachment=None):
+    message = EmailMessage()
+    message['From'] = sender
+    message['To'] = 'me@example.com'
+    message['Subject'] = subject
+    message['Date'] = f'Mon, {i + 1:02d} Sep 2025 10:00:00 +0200'
+    message['Message-ID'] = f'<msg-{i}@example.com>'
+    message.set_content(body)
+    if attachment is not None:
+        message.add_attachment(attachment, maintype='application', subtype='pdf', filename='offer.pdf')
+    return message.as_bytes()
+
+
+def _write_mbox(path, raws, mode='wb'):
+    with open(path, mode) as f:
+        for raw in raws:
+            f.write(b'From MAILER-DAEMON Mon Sep  1 10:00:00 2025\n' + raw.replace(b'\r\n', b'\n') + b'\n')
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+def _tracked(db):
+    return [tuple(row) for row in db.conn.execute(
+        'SELECT job_id, email_subject, email_type FROM email_tracking ORDER BY email_date'
+    )]
+
+
+class TestParsing:
+    def test_headers_and_text_body(self):
+        raw = _raw(0, 'Interview invitation', body='Can you talk on Friday?')
+        headers, _, body = raw.partition(b'\n\n')
+        message = parse_message(headers + b'\n', body)
+        assert message.message_id == '<msg-0@example.com>'
+        assert message.subject == 'Interview invitation'
+        assert message.date == '2025-09-01T10:00:00+02:00'
+        assert message.body == 'Can you talk on Friday?'
+
+    def test_missing_message_id_is_keyed_by_headers(self):
+        first = parse_message(b'From: a@b.nl\nSubject: Hi\n')
+        assert first.message_id.startswith('sha1:')
+        assert parse_message(b'From: a@b.nl\nSubject: Hi\n').message_id == first.message_id
+
+
+class TestSources:
+    def test_mbox_resumes_from_its_offset(self, tmp_path):
+        path = tmp_path / 'inbox.mbox'
+        _write_mbox(path, [_raw(0, 'One'), _raw(1, 'Two')])
+        source = MboxSource(path)
+        read = list(source.read())
+        assert [message.subject for message, _ in read] == ['One', 'Two']
+        watermark = read[-1][1]
+        assert watermark == (None, path.stat().st_size)
+        # No new mail: nothing is read again
+        assert list(source.read(watermark)) == []
+
+        _write_mbox(path, [_raw(2, 'Three')], mode='ab')
+        assert [message.subject for message, _ in source.read(watermark)] == ['Three']
+
+    def test_rewritten_mbox_is_read_again(self, tmp_path):
+        path = tmp_path / 'inbox.mbox'
+        _write_mbox(path, [_raw(0, 'One'), _raw(1, 'Two')])
+        watermark = list(MboxSource(path).read())[0][1]
+        # A different size than the offset read up to; an equally long rewrite reads as no new mail
+        _write_mbox(path, [_raw(1, 'Second')])
+        assert [message.subject for message, _ in MboxSource(path).read(watermark)] == ['Second']
+
+    def test_large_attachments_are_not_read(self, tmp_path):
+        path = tmp_path / 'inbox.mbox'
+        _write_mbox(path, [_raw(0, 'Offer', body='Welcome aboard', attachment=os.urandom(200_000))])
+        message = next(MboxSource(path).read())[0]
+        assert message.body == 'Welcome aboard'
+
+    def test_maildir_reads_new_and_cur_from_the_mtime(self, tmp_path):
+        for folder in ('new', 'cur', 'tmp'):
+            (tmp_path / folder).mkdir()
+        for i, folder in enumerate(('cur', 'new')):
+            (tmp_path / folder / f'{i}.host').write_bytes(_raw(i, f'Mail {i}', body='x' * (BODY_BYTES * 2)))
+            os.utime(tmp_path / folder / f'{i}.host', ns=(i * 10**9, i * 10**9))
+        source = MaildirSource(tmp_path)
+        read = list(source.read())
+        assert [message.subject for message, _ in read] == ['Mail 0', 'Mail 1']
+        assert len(read[0][0].body) <= BODY_BYTES
+        assert [message.subject for message, _ in source.read(read[-1][1])] == ['Mail 1']
+
+    def test_imap_fetches_only_new_uids(self):
+        with LocalIMAPServer([_raw(0, 'One'), _raw(1, 'Two')]) as server:
+            host, port = server.address
+            source = IMAPSource(host, 'me', 'secret', port=port, ssl=False)
+            read = list(source.read())
+            assert [message.subject for message, _ in read] == ['One', 'Two']
+            assert read[-1][1] == ('1', 2)
+
+            server.append(_raw(2, 'Three'))
+            server.fetched.clear()
+            assert [message.subject for message, _ in source.read(read[-1][1])] == ['Three']
+            assert server.fetched == [3]
+            assert list(source.read(('1', 3))) == []
+
+    def test_imap_uidvalidity_change_starts_over(self):
+        with LocalIMAPServer([_raw(0, 'One'), _raw(1, 'Two')]) as server:
+            host, port = server.address
+            source = IMAPSource(host, 'me', 'secret', port=port, ssl=False)
+            server.reset(uidvalidity=2)
+            assert [watermark for _, watermark in source.read(('1', 2))] == [('2', 1), ('2', 2)]
+
+
+class TestEmailMonitor:
+    def _add_job(self, db, i, company):
+        return db.add_job({
+            'title': f'Python Developer {i}', 'company': company, 'location': 'Amsterdam',
+            'url': f'https://www.linkedin.com/jobs/view/{4300000000 + i}',
+        })
+
+    def test_ingest_matches_jobs_and_records_responses(self, db, tmp_path):
+        adyen = self._add_job(db, 1, 'Adyen N.V.')
+        path = tmp_path / 'inbox.mbox'
+        _write_mbox(path, [
+            _raw(0, 'Application received'),
+            _raw(1, 'Interview invitation', sender='Talent <talent@picnic.app>'),
+            _raw(2, 'Your interview at Adyen', sender='noreply@greenhouse.io'),
+        ])
+        monitor = EmailMonitor(db, batch_size=2)
+        assert monitor.check_application_responses(MboxSource(path)) == 3
+        assert _tracked(db) == [
+            (adyen, 'Application received', 'application_confirmed'),
+            (None, 'Interview invitation', 'interview_invite'),
+            (adyen, 'Your interview at Adyen', 'interview_invite'),
+        ]
+        job = db.conn.execute('SELECT response_received, response_type FROM jobs WHERE id = ?', (adyen,)).fetchone()
+        assert tuple(job) == (1, 'Interview')
+
+    def test_responses_move_the_status_forward_only(self, db, tmp_path):
+        adyen = self._add_job(db, 1, 'Adyen')
+        path = tmp_path / 'inbox.mbox'
+        _write_mbox(path, [
+            _raw(0, 'Application received'),
+            _raw(2, 'Interview invitation'),
+            _raw(1, 'Thanks for applying'),
+        ])
+        EmailMonitor(db).check_application_responses(MboxSource(path))
+        job = db.conn.execute('SELECT status, applied_at FROM jobs WHERE id = ?', (adyen,)).fetchone()
+        assert job['status'] == 'interview_scheduled'
+        assert job['applied_at'] == '2025-09-01T10:00:00+02:00'
+        history = [row[0] for row in db.conn.execute(
+            'SELECT details FROM application_history WHERE job_id = ? ORDER BY id', (adyen,)
+        )]
+        assert history == [
+            'Status changed: new → applied | Email: Application received',
+            'Status changed: applied → interview_scheduled | Email: Interview invitation',
+        ]
+
+    def test_answered_applications_stay_tracked(self, db, tmp_path):
+        adyen = self._add_job(db, 1, 'Adyen')
+        db.mark_applied([adyen])
+        assert [job.id for job in db.get_applied_jobs()] == [adyen]
+        path = tmp_path / 'inbox.mbox'
+        _write_mbox(path, [_raw(2, 'Interview invitation')])
+        EmailMonitor(db).check_application_responses(MboxSource(path))
+        assert [job.id for job in db.get_applied_jobs()] == [adyen]
+        analytics = db.get_analytics()
+        assert analytics['response_rate'] == 100.0
+
+    def test_reruns_only_read_new_mail(self, db, tmp_path):
+        path = tmp_path / 'inbox.mbox'
+        _write_mbox(path, [_raw(0, 'Application received')])
+        monitor = EmailMonitor(db)
+        source = MboxSource(path)
+        assert monitor.check_application_responses(source) == 1
+        assert monitor.check_application_responses(source) == 0
+        _write_mbox(path, [_raw(1, 'Unfortunately')], mode='ab')
+        assert monitor.check_application_responses(source) == 1
+        assert db.get_mail_watermark(source.name) == (None, path.stat().st_size)
+
+    def test_reread_messages_are_not_duplicated(self, db):
+        with LocalIMAPServer([_raw(0, 'Application received'), _raw(1, 'Interview')]) as server:
+            host, port = server.address
+            source = IMAPSource(host, 'me', 'secret', port=port, ssl=False)
+            monitor = EmailMonitor(db)
+            assert monitor.check_application_responses(source) == 2
+            server.reset(uidvalidity=7)
+            assert monitor.check_application_responses(source) == 0
+        assert db.conn.execute('SELECT COUNT(*) FROM email_tracking').fetchone()[0] == 2
+        assert db.get_mail_watermark(source.name) == ('7', 2)
@@ -0,0 +1,63 @@
+"""Unit tests for the FTS5 job search index."""
+
+import os
+import tempfile
+
+import pytest
+from database.enhanced_database import JobDatabase
+from database.fts import MARK_END, MARK_START, build_match_query, to_html
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        database.writer.executemany(
+            'INSERT INTO jobs (title, company, location, url, description) VALUES (?, ?, ?, ?, ?)',
+            [
+                ('Senior Python Developer', 'Booking', 'Amsterdam',
+                 'https://www.linkedin.com/jobs/view/1001',
+                 'Build backend services in Python and Django for millions of travellers.'),
+                ('Frontend Engineer', 'Adyen', 'Amsterdam',
+                 'https://www.linkedin.com/jobs/view/1002',
+                 'React and TypeScript. Some Python scripting is a plus.'),
+            ]
+        ).result()
+        yield database
+        database.close()
+
+
+class TestMatchQuery:
+    def test_prefix_terms(self):
+        assert build_match_query('pyth dev') == '"pyth"* "dev"*'
+
+    def test_phrase_kept(self):
+        assert build_match_query('"machine learning" engineer') == '"machine learning" "engineer"*'
+
+    def test_operators_are_neutralised(self):
+        assert build_match_query('python OR -java (') == '"python"* "OR"* "java"*'
+
+    def test_empty(self):
+        assert build_match_query('  ?! ') == ''
+
+
+class TestSearch:
+    def test_title_match_ranks_first(self, db):
+        results = db.search_jobs('python')
+        assert [r['id'] for r in results][0] == 1
+        assert len(results) == 2
+
+    def test_prefix_query(self, db):
+        assert [r['id'] for r in db.search_jobs('djan')] == [1]
+
+    def test_snippet_highlight(self, db):
+        result = db.search_jobs('django')[0]
+        assert f'{MARK_START}Django{MARK_END}' in result['snippet']
+        assert '<mark>Django</mark>' in to_html(result['snippet'])
+
+    def test_index_follows_updates_and_deletes(self, db):
+        db.update_job_description(2, 'Kotlin and Rust only.')
+        assert [r['id'] for r in db.search_jobs('python')] == [1]
+        db.writer.execute('DELETE FROM jobs WHERE id = 1').result()
+        assert db.search_jobs('python') == []
+        assert [r['id'] for r in db.search_jobs('rust')] == [2]
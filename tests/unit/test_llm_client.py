@@ -0,0 +1,85 @@
+"""Unit tests for the LLM clients and the analyzer's client injection."""
+
+import json
+
+import pytest
+from analyzers.analyzer_ai import AIJobAnalyzer
+from analyzers.llm_client import FakeLLMClient, RateLimitError, constant, create_client, lognormal, uniform
+
+JOB = {'title': 'Python Developer', 'company': 'Acme', 'location': 'Amsterdam',
+       'description': 'Build Python services. ' * 20}
+
+
+@pytest.fixture
+def profile(tmp_path):
+    path = tmp_path / 'profile.json'
+    path.write_text(json.dumps({'name': 'Test', 'skills': ['Python'], 'experience': []}))
+    return str(path)
+
+
+class TestFakeLLMClient:
+    def test_canned_analysis_is_deterministic(self):
+        client = FakeLLMClient()
+        first = client.complete('Rate this job. SCORE: [number 0-100] Acme')
+        assert first == FakeLLMClient().complete('Rate this job. SCORE: [number 0-100] Acme')
+        assert first.startswith('SCORE: ')
+        assert 'STRENGTHS:' in first and 'RECOMMENDATION:' in first
+        assert client.stats()['calls'] == 1
+
+    def test_rate_limit_injection(self):
+        client = FakeLLMClient(rate_limit_rate=0.5, retry_after=0.01, seed=1)
+        outcomes = []
+        for _ in range(200):
+            try:
+                client.complete('SCORE:')
+                outcomes.append(True)
+            except RateLimitError as e:
+                assert e.retry_after == 0.01
+                outcomes.append(False)
+        assert 60 < outcomes.count(False) < 140
+        assert client.stats()['rate_limited'] == outcomes.count(False)
+
+    def test_latency_distributions(self):
+        import random
+        rng = random.Random(0)
+        assert constant(0.2)(rng) == 0.2
+        assert all(0.1 <= uniform(0.1, 0.3)(rng) <= 0.3 for _ in range(100))
+        samples = sorted(lognormal(0.5, 0.5)(rng) for _ in range(1001))
+        assert 0.4 < samples[500] < 0.6
+
+    def test_create_client_from_environment(self, monkeypatch):
+        monkeypatch.setenv('LLM_CLIENT', 'fake')
+        assert isinstance(create_client(), FakeLLMClient)
+        monkeypatch.setenv('LLM_CLIENT', 'anthropic')
+        monkeypatch.delenv('ANTHROPIC_API_KEY', raising=False)
+        with pytest.raises((ValueError, ImportError)):
+            create_client()
+
+
+class TestAnalyzerWithInjectedClient:
+    def test_no_api_key_needed(self, profile, monkeypatch):
+        monkeypatch.delenv('ANTHROPIC_API_KEY', raising=False)
+        analyzer = AIJobAnalyzer(profile_path=profile, client=FakeLLMClient())
+        analysis = analyzer.analyze_job_fit(JOB)
+        assert 40 <= analysis['score'] <= 95
+        assert len(analysis['strengths']) == 3
+        assert len(analysis['concerns']) == 2
+
+    def test_retries_rate_limited_calls(self, profile):
+        class Flaky(FakeLLMClient):
+            def complete(self, prompt, max_tokens=1000, temperature=None):
+                self.calls += 1
+                if self.calls <= 2:
+                    raise RateLimitError(retry_after=0)
+                return self.respond(prompt)
+
+        client = Flaky()
+        analyzer = AIJobAnalyzer(profile_path=profile, client=client)
+        assert analyzer.analyze_job_fit(JOB)['strengths'] != ['Unable to analyze - API error']
+        assert client.calls == 3
+
+    def test_gives_up_after_max_retries(self, profile):
+        client = FakeLLMClient(rate_limit_rate=1.0)
+        analyzer = AIJobAnalyzer(profile_path=profile, client=client, max_retries=1)
+        assert analyzer.analyze_job_fit(JOB)['strengths'] == ['Unable to analyze - API error']
+        assert client.stats()['calls'] == 2
@@ -0,0 +1,119 @@
+"""Unit tests for the schema migration runner."""
+
+import os
+import sqlite3
+import tempfile
+
+import pytest
+from database.enhanced_database import JobDatabase
+from database.migrations import SCHEMA_VERSION, compute_job_hash, get_version, migrate, table_columns
+
+
+@pytest.fixture
+def db_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield os.path.join(tmpdir, 'test.db')
+
+
+def _legacy_tracker_db(path):
+    """Old JobTracker schema with scraped_date/applied_date and no job_hash"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT UNIQUE,
+            title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            location TEXT,
+            url TEXT UNIQUE NOT NULL,
+            description TEXT,
+            scraped_date TIMESTAMP,
+            applied_date TIMESTAMP,
+            status TEXT DEFAULT 'scraped',
+            ai_score INTEGER
+        )
+    ''')
+    conn.execute(
+        "INSERT INTO jobs (title, company, location, url, scraped_date, applied_date, status) "
+        "VALUES ('Python Dev', 'Acme', 'Utrecht', 'https://x/1', '2025-09-01', '2025-09-03', 'scraped')"
+    )
+    conn.commit()
+    return conn
+
+
+class TestMigrations:
+    def test_fresh_database_reaches_latest_version(self, db_path):
+        conn = sqlite3.connect(db_path)
+        assert migrate(conn) == SCHEMA_VERSION
+        columns = table_columns(conn, 'jobs')
+        assert {'job_hash', 'enriched_at', 'application_link', 'scraped_at', 'applied_at'} <= columns
+
+    def test_rerun_is_noop(self, db_path):
+        conn = sqlite3.connect(db_path)
+        migrate(conn)
+        conn.execute('PRAGMA user_version = 0')
+        assert migrate(conn) == SCHEMA_VERSION
+
+    def test_legacy_data_is_converged(self, db_path):
+        conn = _legacy_tracker_db(db_path)
+        migrate(conn)
+        row = conn.execute('SELECT scraped_at, applied_at, status, job_hash FROM jobs').fetchone()
+        assert row == ('2025-09-01', '2025-09-03', 'new', compute_job_hash('Python Dev', 'Acme', 'Utrecht'))
+        assert get_version(conn) == SCHEMA_VERSION
+
+    def test_job_database_writes_on_legacy_schema(self, db_path):
+        _legacy_tracker_db(db_path).close()
+        db = JobDatabase(db_path=db_path)
+        job_id = db.add_job({
+            'title': 'Data Engineer',
+            'company': 'Acme',
+            'location': 'Utrecht',
+            'url': 'https://www.linkedin.com/jobs/view/42?trk=abc',
+        })
+        assert job_id is not None
+        db.mark_job_enriched(job_id)
+        db.update_apply_link(job_id, 'EASY_APPLY')
+        assert db.job_exists_advanced({'title': 'data engineer', 'company': 'ACME', 'url': 'https://other/7'})
+        db.close()
+
+    def test_inserts_into_legacy_schema_are_new(self, db_path):
+        # The legacy table keeps its DEFAULT 'scraped'; inserts must not rely on the default
+        _legacy_tracker_db(db_path).close()
+        db = JobDatabase(db_path=db_path)
+        job_id = db.add_job({'title': 'Data Engineer', 'company': 'Acme', 'location': 'Utrecht',
+                             'url': 'https://www.linkedin.com/jobs/view/42'})
+        assert db.conn.execute('SELECT status FROM jobs WHERE id = ?', (job_id,)).fetchone()[0] == 'new'
+        assert db.get_statistics()['new'] == 2
+        db.close()
+
+    def test_scrape_watermarks_round_trip(self, db_path):
+        db = JobDatabase(db_path=db_path)
+        assert db.get_watermark('python', 'Netherlands') is None
+        watermark = {'newest_posting_id': 4294348465, 'newest_posted_at': '2025-10-01', 'last_run_at': '2025-10-02T08:00:00'}
+        db.save_watermark('python', 'Netherlands', watermark)
+        assert db.get_watermark('python', 'Netherlands') == watermark
+        assert db.get_watermark('python', 'Belgium') is None
+        db.close()
+
+    def test_legacy_rows_need_requirements(self, db_path):
+        conn = _legacy_tracker_db(db_path)
+        conn.execute("UPDATE jobs SET description = 'Python role in Utrecht'")
+        conn.commit()
+        migrate(conn)
+        assert {'description_hash', 'requirements_hash', 'degree_requirement', 'experience_years'} <= table_columns(conn, 'jobs')
+        conn.close()
+
+        db = JobDatabase(db_path=db_path)
+        assert [tuple(row) for row in db.get_jobs_needing_requirements()] == [(1, 'Python role in Utrecht', None)]
+        db.close()
+
+    def test_description_change_without_hash_resets_it(self, db_path):
+        db = JobDatabase(db_path=db_path)
+        job_id = db.add_job({'title': 'Python Dev', 'company': 'Acme', 'url': 'https://x/1', 'description': 'old'})
+        db.writer.execute('UPDATE jobs SET requirements_hash = description_hash').result()
+        assert db.count_jobs_needing_requirements() == 0
+
+        db.writer.execute("UPDATE jobs SET description = 'new' WHERE id = ?", (job_id,)).result()
+        assert db.conn.execute('SELECT description_hash FROM jobs').fetchone()[0] is None
+        assert db.count_jobs_needing_requirements() == 1
+        db.close()
@@ -0,0 +1,123 @@
+"""Unit tests for MinHash signatures and near-duplicate clustering."""
+
+import os
+import random
+import tempfile
+
+import pytest
+from database import near_duplicates
+from database.enhanced_database import JobDatabase
+from utils.minhash import MinHasher, from_blob, shingles, similarity, to_blob
+
+WORDS = ('python django postgres docker kubernetes team product data platform backend services api design '
+         'testing reviews ownership delivery cloud aws monitoring growth learning budget office hybrid').split()
+
+
+def _text(seed, length=300):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def _edit(text, changes, seed=0):
+    """Replace a few words, like a recruiter tweaking a repost"""
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = 'amsterdam'
+    return ' '.join(words)
+
+
+def _job(i, description, city='Amsterdam'):
+    return {
+        'title': f'Backend Developer {i}',
+        'company': f'Company {i}',
+        'location': city,
+        'url': f'https://www.linkedin.com/jobs/view/{1000 + i}',
+        'description': description,
+    }
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+class TestMinHash:
+    def test_shingles(self):
+        assert shingles('One two three four five six') == {'one two three four five', 'two three four five six'}
+        assert shingles('Short text') == {'short text'}
+        assert shingles('  ') == set()
+
+    def test_similarity_tracks_jaccard(self):
+        hasher = MinHasher()
+        text = _text(1)
+        assert similarity(hasher.signature(text), hasher.signature(text)) == 1.0
+        assert similarity(hasher.signature(text), hasher.signature(_edit(text, 3))) >= 0.8
+        assert similarity(hasher.signature(text), hasher.signature(_text(2))) < 0.2
+
+    def test_signatures_are_stable_across_instances(self):
+        text = _text(3)
+        first, second = MinHasher().signature(text), MinHasher().signature(text)
+        assert (first == second).all()
+        assert MinHasher().band_keys(first) == MinHasher().band_keys(second)
+        assert (from_blob(to_blob(first)) == first).all()
+
+    def test_no_words_has_no_signature(self):
+        assert MinHasher().signature('') is None
+        assert MinHasher().signature(None) is None
+
+
+class TestClustering:
+    def test_reposts_join_the_first_jobs_cluster(self, db):
+        original = _text(1)
+        first = db.add_job(_job(1, original))
+        repost = db.add_job(_job(2, _edit(original, 3), city='Utrecht'))
+        other = db.add_job(_job(3, _text(2)))
+        clusters = dict(db.conn.execute('SELECT id, cluster_id FROM jobs'))
+        assert clusters == {first: first, repost: first, other: other}
+
+    def test_enriched_description_is_clustered(self, db):
+        first = db.add_job(_job(1, _text(1)))
+        later = db.add_job(_job(2, ''))
+        assert db.conn.execute('SELECT cluster_id FROM jobs WHERE id = ?', (later,)).fetchone()[0] is None
+        db.update_job_description(later, _edit(_text(1), 2))
+        assert db.conn.execute('SELECT cluster_id FROM jobs WHERE id = ?', (later,)).fetchone()[0] == first
+
+    def test_analysis_is_shared_with_the_cluster(self, db):
+        first = db.add_job(_job(1, _text(1)))
+        repost = db.add_job(_job(2, _edit(_text(1), 3)))
+        assert [job.id for job in db.get_jobs_for_analysis(fields=('id',))] == [first]
+
+        db.update_analysis(first, {'score': 84, 'strengths': ['Django']})
+        row = db.conn.execute('SELECT ai_score, ai_strengths, analyzed_from FROM jobs WHERE id = ?', (repost,)).fetchone()
+        assert tuple(row) == (84, '["Django"]', first)
+        assert db.get_jobs_for_analysis(fields=('id',)) == []
+
+    def test_late_repost_gets_the_existing_analysis(self, db):
+        first = db.add_job(_job(1, _text(1)))
+        db.update_analysis(first, {'score': 77})
+        repost = db.add_job(_job(2, _edit(_text(1), 3)))
+        assert db.get_cluster_analysis(repost)['score'] == 77
+        assert db.conn.execute('SELECT ai_score FROM jobs WHERE id = ?', (repost,)).fetchone()[0] == 77
+
+    def test_unclustered_job_has_no_cluster_analysis(self, db):
+        job_id = db.add_job(_job(1, _text(1)))
+        assert db.get_cluster_analysis(job_id) is None
+
+    def test_backfill_indexes_unsigned_descriptions(self, db):
+        original = _text(1)
+        ids = [db.add_job(_job(i, '')) for i in range(3)]
+        for job_id, description in zip(ids, [original, _edit(original, 2), _text(2)]):
+            db.writer.execute('UPDATE jobs SET description = ? WHERE id = ?', (description, job_id)).result()
+
+        assert near_duplicates.backfill(db, batch_size=2) == 3
+        assert dict(db.conn.execute('SELECT id, cluster_id FROM jobs')) == {ids[0]: ids[0], ids[1]: ids[0], ids[2]: ids[2]}
+        assert near_duplicates.backfill(db) == 0
+
+    def test_clear_jobs_drops_signatures(self, db):
+        db.add_job(_job(1, _text(1)))
+        db.clear_jobs()
+        assert db.conn.execute('SELECT COUNT(*) FROM job_signature_bands').fetchone()[0] == 0
@@ -0,0 +1,159 @@
+"""Unit tests for the alias matcher and city / company normalization."""
+
+import os
+import random
+import sqlite3
+import tempfile
+
+import pytest
+from database.enhanced_database import JobDatabase
+from database.migrations import migrate
+from database.normalization import normalize_company
+from utils.aho_corasick import AhoCorasick
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+def _job(i, company, location):
+    return {
+        'title': f'Python Developer {i}',
+        'company': company,
+        'location': location,
+        'url': f'https://www.linkedin.com/jobs/view/{4300000000 + i}',
+    }
+
+
+def _city(db, name):
+    return db.conn.execute('SELECT id FROM cities WHERE name = ?', (name,)).fetchone()[0]
+
+
+class TestAhoCorasick:
+    def test_finds_overlapping_patterns(self):
+        matcher = AhoCorasick({'he': 1, 'she': 2, 'his': 3, 'hers': 4})
+        assert sorted(matcher.iter_matches('ushers')) == [(1, 4, 2), (2, 4, 1), (2, 6, 4)]
+        assert len(matcher) == 4
+
+    def test_whole_words_only(self):
+        matcher = AhoCorasick({'ing': 'ING', 'delft': 'Delft'})
+        assert matcher.find_words('engineering in delft') == [(15, 20, 'Delft')]
+        assert matcher.find_words('ing, delft') == [(0, 3, 'ING'), (5, 10, 'Delft')]
+
+    def test_first_word_prefers_leftmost_then_longest(self):
+        matcher = AhoCorasick([('den', 'x'), ('den haag', 'The Hague'), ('delft', 'Delft')])
+        assert matcher.first_word('delft / den haag') == 'Delft'
+        assert matcher.first_word('den haag, delft') == 'The Hague'
+        assert matcher.first_word('netherlands') is None
+
+
+class TestNormalizeCompany:
+    def test_legal_forms_and_punctuation(self):
+        assert normalize_company('Adyen N.V.') == 'adyen'
+        assert normalize_company('ASML Netherlands B.V.') == 'asml'
+        assert normalize_company('ABN AMRO Group') == 'abn amro'
+        assert normalize_company('Booking.com') == 'booking com'
+
+    def test_suffix_alone_is_kept(self):
+        assert normalize_company('Group') == 'group'
+        assert normalize_company('') == ''
+
+
+class TestIngest:
+    def test_city_and_company_ids_are_stored(self, db):
+        first = db.add_job(_job(1, 'Adyen N.V.', 'Amsterdam, North Holland, Netherlands'))
+        second = db.add_job(_job(2, 'adyen', 'Den Haag, Zuid-Holland'))
+        third = db.add_job(_job(3, 'Picnic', 'Netherlands'))
+        rows = {row['id']: row for row in db.conn.execute('SELECT id, city_id, company_id FROM jobs')}
+        assert rows[first]['city_id'] == _city(db, 'Amsterdam')
+        assert rows[second]['city_id'] == _city(db, 'The Hague')
+        assert rows[third]['city_id'] is None
+        assert rows[first]['company_id'] == rows[second]['company_id'] != rows[third]['company_id']
+
+    def test_city_counts_average_every_job(self, db):
+        for i, score in enumerate([90, 60, None]):
+            job_id = db.add_job(_job(i, f'Company {i}', 'Utrecht, Netherlands'))
+            if score is not None:
+                db.update_analysis(job_id, {'score': score})
+        db.add_job(_job(9, 'Company 9', 'Delft'))
+        counts = {row['name']: (row['count'], row['avg_score']) for row in db.get_city_job_counts()}
+        assert counts['Utrecht'] == (3, 75.0)
+        assert counts['Delft'] == (1, None)
+        assert counts['Groningen'] == (0, None)
+
+    def test_find_job_by_company(self, db):
+        db.add_job(_job(1, 'Mollie B.V.', 'Amsterdam'))
+        latest = db.add_job(_job(2, 'Mollie', 'Amsterdam'))
+        assert db.find_job_by_company('MOLLIE').id == latest
+        assert db.find_job_by_company('Unknown Corp') is None
+
+    def test_find_companies_in_text_sees_new_companies(self, db):
+        db.add_job(_job(1, 'Picnic', 'Amsterdam'))
+        picnic = db.find_company_id('Picnic')
+        assert db.find_companies_in('Your application at Picnic!') == [picnic]
+        db.add_job(_job(2, 'Coolblue', 'Rotterdam'))
+        assert db.find_companies_in('Coolblue and Picnic') == [db.find_company_id('coolblue'), picnic]
+
+
+class TestCityStats:
+    def _recomputed(self, db):
+        return {
+            row[0]: tuple(row[1:]) for row in db.conn.execute('''
+                SELECT city_id, COUNT(*), COUNT(ai_score), IFNULL(SUM(ai_score), 0), IFNULL(SUM(ai_score >= 80), 0)
+                FROM jobs WHERE city_id IS NOT NULL GROUP BY city_id
+            ''')
+        }
+
+    def _stored(self, db):
+        return {
+            row[0]: tuple(row[1:]) for row in db.conn.execute(
+                'SELECT city_id, job_count, scored_count, score_sum, high_match_count FROM city_stats WHERE job_count > 0'
+            )
+        }
+
+    def test_aggregate_follows_inserts_scores_moves_and_deletes(self, db):
+        rng = random.Random(7)
+        cities = ['Amsterdam', 'Utrecht', 'Delft', 'Nowhere']
+        ids = [db.add_job(_job(i, f'Company {i}', rng.choice(cities))) for i in range(40)]
+        for job_id in rng.sample(ids, 25):
+            db.update_analysis(job_id, {'score': rng.randint(40, 99)})
+        for job_id in rng.sample(ids, 5):
+            db.writer.execute('UPDATE jobs SET city_id = ? WHERE id = ?', (_city(db, 'Groningen'), job_id)).result()
+        for job_id in rng.sample(ids, 5):
+            db.writer.execute('DELETE FROM jobs WHERE id = ?', (job_id,)).result()
+        assert self._stored(db) == self._recomputed(db)
+
+    def test_version_changes_only_with_the_numbers(self, db):
+        job_id = db.add_job(_job(1, 'Picnic', 'Amsterdam'))
+        version = db.city_stats_version()
+        db.update_notes(job_id, 'Call back Monday')
+        db.add_job(_job(2, 'Bunq', 'Remote'))
+        assert db.city_stats_version() == version
+        db.update_analysis(job_id, {'score': 85})
+        assert db.city_stats_version() > version
+
+        amsterdam = {row['name']: row for row in db.get_city_job_counts()}['Amsterdam']
+        assert (amsterdam['count'], amsterdam['avg_score'], amsterdam['high_matches']) == (1, 85.0, 1)
+
+
+class TestMigration:
+    def test_existing_rows_are_backfilled(self, tmp_path):
+        path = str(tmp_path / 'legacy.db')
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE jobs (id INTEGER PRIMARY KEY, title TEXT, company TEXT, location TEXT, url TEXT)')
+        conn.executemany('INSERT INTO jobs (title, company, location, url) VALUES (?, ?, ?, ?)', [
+            ('A', 'Bol.com B.V.', 'Utrecht, Netherlands', 'u1'),
+            ('B', 'bol.com', 'Eindhoven Area', 'u2'),
+        ])
+        conn.commit()
+        migrate(conn)
+        rows = conn.execute('''
+            SELECT c.name, j.company_id FROM jobs j JOIN cities c ON c.id = j.city_id ORDER BY j.id
+        ''').fetchall()
+        conn.close()
+        assert [name for name, _ in rows] == ['Utrecht', 'Eindhoven']
+        assert rows[0][1] == rows[1][1] is not None
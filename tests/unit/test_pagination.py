@@ -0,0 +1,68 @@
+"""Unit tests for keyset pagination of job listings."""
+
+import os
+import tempfile
+
+import pytest
+from database.enhanced_database import JobDatabase
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        scores = [95, 80, 80, 80, 72, 60, None, None]
+        companies = ['Mollie', 'Adyen', 'Bol', 'Adyen', 'Picnic', 'Bol', 'Elastic', 'Adyen']
+        dates = ['2025-09-03', '2025-09-01', None, '2025-09-05', '2025-09-01', '2025-09-02', '2025-09-04', None]
+        database.writer.executemany(
+            'INSERT INTO jobs (title, company, url, ai_score, scraped_at, status) VALUES (?, ?, ?, ?, ?, ?)',
+            [(f'Job {i}', company, f'u{i}', score, date, 'applied' if i % 3 == 0 else 'new')
+             for i, (score, company, date) in enumerate(zip(scores, companies, dates))]
+        ).result()
+        yield database
+        database.close()
+
+
+def _walk(db, limit, **kwargs):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = db.get_jobs_page(cursor, limit, **kwargs)
+        pages.append([row.id for row in rows])
+        if cursor is None:
+            return pages
+
+
+class TestKeysetPagination:
+    def test_pages_cover_every_job_once_in_order(self, db):
+        pages = _walk(db, 3)
+        assert pages == [[1, 4, 3], [2, 5, 6], [8, 7]]
+
+    def test_min_score_filter(self, db):
+        assert _walk(db, 2, min_score=80) == [[1, 4], [3, 2]]
+
+    def test_exact_page_boundary_has_no_empty_trailing_page(self, db):
+        assert _walk(db, 4, min_score=72) == [[1, 4, 3, 2], [5]]
+        assert _walk(db, 5, min_score=72) == [[1, 4, 3, 2, 5]]
+
+    def test_status_filter(self, db):
+        assert _walk(db, 2, statuses=('applied',)) == [[1, 4], [7]]
+
+    def test_date_order_puts_undated_last(self, db):
+        assert _walk(db, 3, order='date') == [[4, 7, 1], [6, 5, 2], [8, 3]]
+
+    def test_company_order_is_ascending(self, db):
+        assert _walk(db, 3, order='company') == [[2, 4, 8], [3, 6, 7], [1, 5]]
+        assert _walk(db, 2, order='company', min_score=80) == [[2, 4], [3, 1]]
+
+    def test_projection_always_carries_cursor_fields(self, db):
+        rows, cursor = db.get_jobs_page(None, 2, fields=('title',))
+        assert rows[0].keys() == ('title', 'id', 'ai_score')
+        assert cursor == (80, 4)
+
+    def test_query_uses_score_index(self, db):
+        plan = db.conn.execute(
+            'EXPLAIN QUERY PLAN SELECT id FROM jobs WHERE IFNULL(ai_score, -1) <= ? '
+            'AND (IFNULL(ai_score, -1), id) < (?, ?) ORDER BY IFNULL(ai_score, -1) DESC, id DESC LIMIT 10',
+            (80, 80, 3)
+        ).fetchall()
+        assert 'idx_jobs_score_key' in ' '.join(row[3] for row in plan)
@@ -0,0 +1,41 @@
+"""Unit tests for the token-bucket rate limiter."""
+
+import threading
+import time
+
+import pytest
+from utils.rate_limiter import RateLimiter
+
+
+class TestRateLimiter:
+    def test_spaces_out_acquisitions(self):
+        limiter = RateLimiter(rate=20)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        # First token is immediate, the other four wait 1/20 s each
+        assert time.monotonic() - start >= 0.18
+
+    def test_burst_allows_immediate_tokens(self):
+        limiter = RateLimiter(rate=1, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        assert time.monotonic() - start < 0.1
+
+    def test_shared_across_threads(self):
+        limiter = RateLimiter(rate=50)
+        calls = []
+        wrapped = limiter.wrap(lambda: calls.append(time.monotonic()))
+        threads = [threading.Thread(target=wrapped) for _ in range(10)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 10
+        assert max(calls) - start >= 0.17
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            RateLimiter(rate=0)
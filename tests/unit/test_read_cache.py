@@ -0,0 +1,59 @@
+"""Unit tests for the version-invalidated read cache."""
+
+import os
+import sqlite3
+import tempfile
+
+import pytest
+from database.enhanced_database import JobDatabase
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+def _insert(db, i):
+    db.writer.execute(
+        'INSERT INTO jobs (title, company, url, ai_score) VALUES (?, ?, ?, ?)', (f'Job {i}', 'Co', f'u{i}', 85)
+    ).result()
+
+
+class TestReadCache:
+    def test_idle_reads_hit_the_cache(self, db):
+        _insert(db, 1)
+        first = db.cached(db.get_statistics)
+        assert db.cached(db.get_statistics) is first
+        assert db.read_cache.hits == 1
+
+    def test_arguments_are_part_of_the_key(self, db):
+        _insert(db, 1)
+        assert len(db.cached(db.get_jobs_by_score, 80)) == 1
+        assert db.cached(db.get_jobs_by_score, 90) == []
+
+    def test_writer_commit_invalidates(self, db):
+        _insert(db, 1)
+        assert db.cached(db.get_statistics)['total'] == 1
+        _insert(db, 2)
+        assert db.cached(db.get_statistics)['total'] == 2
+
+    def test_commit_from_another_process_invalidates(self, db):
+        assert db.cached(db.get_analytics)['high_matches'] == 0
+        other = sqlite3.connect(db.db_path)
+        other.execute("INSERT INTO jobs (title, company, url, ai_score) VALUES ('X', 'Y', 'u9', 92)")
+        other.commit()
+        other.close()
+        assert db.cached(db.get_analytics)['high_matches'] == 1
+
+    def test_analytics_response_rate(self, db):
+        for i in range(4):
+            _insert(db, i)
+        db.mark_applied([1, 2])
+        db.update_response_type(1, 'Interview')
+        analytics = db.get_analytics()
+        assert analytics['response_rate'] == 50.0
+        assert analytics['interviews'] == 1
+        assert analytics['scores'] == [85, 85, 85, 85]
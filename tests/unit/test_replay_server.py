@@ -0,0 +1,40 @@
+"""Unit tests for the replay server's routing."""
+
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+from utils.replay_server import ReplayServer, match_route
+
+ROUTES = [
+    {'path': '/jobs/search', 'params': {'keywords': 'python', 'start': 0}, 'file': 'python-0.html'},
+    {'path': '/jobs/search', 'file': 'any.html'},
+    {'path': '/jobs/view/*-42', 'file': '42.html'},
+    {'path': '/jobs/view/*', 'file': 'generic.html', 'status': 200},
+]
+
+
+def test_match_route_is_first_match():
+    assert match_route(ROUTES, '/jobs/search', {'keywords': 'python', 'start': '0'})['file'] == 'python-0.html'
+    assert match_route(ROUTES, '/jobs/search', {'keywords': 'python', 'start': '25'})['file'] == 'any.html'
+    assert match_route(ROUTES, '/jobs/view/dev-at-acme-42', {})['file'] == '42.html'
+    assert match_route(ROUTES, '/jobs/view/dev-at-acme-43', {})['file'] == 'generic.html'
+    assert match_route(ROUTES, '/company/acme', {}) is None
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / 'page.html').write_text('<p>recorded</p>')
+    (tmp_path / 'manifest.json').write_text(json.dumps({'routes': [{'path': '/page', 'file': 'page.html'}]}))
+    with ReplayServer(tmp_path) as server:
+        yield server
+
+
+def test_serves_recorded_pages(server):
+    with urllib.request.urlopen(f'{server.url}/page?x=1') as response:
+        assert response.read() == b'<p>recorded</p>'
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        urllib.request.urlopen(f'{server.url}/missing')
+    assert exc.value.code == 404
+    assert server.hits == [('/page', {'x': '1'}, 'page.html'), ('/missing', {}, None)]
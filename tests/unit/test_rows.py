@@ -0,0 +1,57 @@
+"""Unit tests for column-projected job rows."""
+
+import os
+import pickle
+import tempfile
+
+import pytest
+from database.enhanced_database import JobDatabase
+from database.rows import row_class
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        job_id = database.add_job({
+            'title': 'ML Engineer',
+            'company': 'Picnic',
+            'location': 'Amsterdam',
+            'url': 'https://www.linkedin.com/jobs/view/77',
+            'description': 'PyTorch ' * 100,
+        })
+        database.update_analysis(job_id, {'score': 91, 'strengths': ['Thesis'], 'concerns': []})
+        yield database
+        database.close()
+
+
+class TestJobRow:
+    def test_projection_selects_only_named_fields(self, db):
+        job = db.get_jobs_by_score(80, fields=('id', 'title', 'ai_score'))[0]
+        assert job.keys() == ('id', 'title', 'ai_score')
+        assert (job.title, job['ai_score']) == ('ML Engineer', 91)
+        assert job.get('status', 'missing') == 'missing'
+        with pytest.raises(KeyError):
+            job['status']
+
+    def test_large_text_is_loaded_lazily(self, db):
+        job = db.get_jobs_by_score(80)[0]
+        assert 'description' not in job
+        assert job['description'].startswith('PyTorch')
+        assert job.get('description') is job.description
+
+    def test_rows_are_slotted_and_read_only(self, db):
+        job = db.get_jobs_by_score(80)[0]
+        assert not hasattr(job, '__dict__')
+        with pytest.raises(AttributeError):
+            job.title = 'Other'
+
+    def test_to_dict_and_pickle(self, db):
+        job = db.get_jobs_by_score(80, fields=('id', 'title'))[0]
+        assert dict(job) == {'id': 1, 'title': 'ML Engineer'}
+        assert pickle.loads(pickle.dumps(job)).to_dict() == job.to_dict()
+
+    def test_row_classes_are_cached_and_validated(self):
+        assert row_class(('id', 'title')) is row_class(['id', 'title'])
+        with pytest.raises(ValueError):
+            row_class(('id', 'title; DROP TABLE jobs'))
@@ -0,0 +1,135 @@
+"""Unit tests for the pipeline run ledger and resumable runs."""
+
+import os
+import tempfile
+
+import pytest
+from database.enhanced_database import JobDatabase
+from database.run_ledger import RunLedger
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+@pytest.fixture
+def ledger(db):
+    ledger = RunLedger(db.db_path, writer=db.writer)
+    yield ledger
+    ledger.close()
+
+
+class TestRunLedger:
+    def test_start_and_finish(self, ledger):
+        run_id = ledger.start('streaming', {'queries': ['python']})
+        assert ledger.get_run(run_id)['status'] == 'running'
+        assert ledger.get_run(run_id)['params'] == {'queries': ['python']}
+        ledger.finish(run_id)
+        assert ledger.get_run(run_id)['status'] == 'completed'
+        assert ledger.get_run(run_id + 1) is None
+
+    def test_record_keeps_latest_stage_per_item(self, ledger):
+        run_id = ledger.start('streaming')
+        ledger.record(run_id, 'job:a', 'scraped', data={'title': 'A'})
+        ledger.record(run_id, 'job:a', 'stored', job_id=7)
+        ledger.record(run_id, 'job:b', 'scraped')
+        items = ledger.items(run_id)
+        assert [(i['item_key'], i['stage'], i['job_id']) for i in items] == [('job:a', 'stored', 7), ('job:b', 'scraped', None)]
+        # Later checkpoints without data keep the earlier payload
+        assert items[0]['data'] == {'title': 'A'}
+        assert ledger.progress(run_id) == {('stored', 'ok'): 1, ('scraped', 'ok'): 1}
+
+    def test_items_filtering(self, ledger):
+        run_id = ledger.start('enrich_file')
+        ledger.record(run_id, 'u1', 'enriched', data={'description': 'x'})
+        ledger.record(run_id, 'u2', 'enriched', status='failed', error='timeout')
+        assert [i['item_key'] for i in ledger.items(run_id, stage='enriched', status='ok')] == ['u1']
+        assert ledger.items(run_id, status='failed')[0]['error'] == 'timeout'
+
+    def test_resume_checks_kind(self, ledger):
+        run_id = ledger.start('enrich_file', {'jobs_file': 'jobs.json'})
+        ledger.finish(run_id, 'failed')
+        with pytest.raises(ValueError):
+            ledger.resume(run_id, 'streaming')
+        with pytest.raises(ValueError):
+            ledger.resume(run_id + 1, 'enrich_file')
+        assert ledger.resume(run_id, 'enrich_file') == {'jobs_file': 'jobs.json'}
+        assert ledger.get_run(run_id)['status'] == 'running'
+
+    def test_writes_go_through_the_writer(self, db, ledger):
+        commits = db.writer.commits
+        run_id = ledger.start('streaming')
+        ledger.record(run_id, 'job:a', 'scraped')
+        ledger.finish(run_id)
+        assert db.writer.commits == commits + 3
+        assert ledger.get_run(run_id)['status'] == 'completed'
+
+    def test_works_on_unmigrated_database(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ledger = RunLedger(os.path.join(tmpdir, 'plain.db'))
+            run_id = ledger.start('enrich_file')
+            ledger.record(run_id, 'u1', 'enriched')
+            assert len(ledger.items(run_id)) == 1
+            ledger.close()
+
+
+class TestResumableStreamingRun:
+    @pytest.fixture
+    def pipeline(self):
+        pytest.importorskip('selenium')
+        pytest.importorskip('anthropic')
+        pytest.importorskip('requests')
+        pytest.importorskip('bs4')
+        from pipeline_orchestrator import JobSearchPipeline
+
+        class Scraper:
+            def scrape_jobs(self, query, location, time_filter=None):
+                return [
+                    {'title': f'{query} {i}', 'company': f'Co {query} {i}', 'location': location,
+                     'url': f'https://www.linkedin.com/jobs/view/{query}{i}'}
+                    for i in range(3)
+                ]
+
+        class Enricher:
+            def fetch_with_retry(self, url):
+                # Distinct per job, so no two jobs are near-duplicates
+                return f'description of {url} ' * 20
+
+        class Analyzer:
+            def __init__(self):
+                self.analyzed = []
+                self.fail_on = None
+
+            def analyze_job_fit(self, job):
+                if job['title'] == self.fail_on:
+                    raise RuntimeError('api down')
+                self.analyzed.append(job['title'])
+                return {'score': 75}
+
+        return JobSearchPipeline(scraper=Scraper(), enricher=Enricher(), analyzer=Analyzer())
+
+    def test_resume_only_redoes_unfinished_jobs(self, pipeline, db, ledger):
+        pipeline.analyzer.fail_on = 'b 1'
+        first = pipeline.run_streaming(queries=['a', 'b'], db=db, analyze_concurrency=1)
+        run_id = ledger.runs()[0]['id']
+        done_before = set(pipeline.analyzer.analyzed)
+        assert len(first) == 5
+        assert ledger.get_run(run_id)['status'] == 'completed_with_errors'
+
+        pipeline.analyzer.fail_on = None
+        pipeline.analyzer.analyzed = []
+        pipeline.run_streaming(db=db, run_id=run_id)
+        assert set(pipeline.analyzer.analyzed) == {'b 1'}
+        assert done_before | {'b 1'} == {f'{q} {i}' for q in 'ab' for i in range(3)}
+        assert ledger.get_run(run_id)['status'] == 'completed'
+
+    def test_report_is_written_next_to_the_database(self, pipeline, db):
+        pipeline.run_streaming(queries=['a'], db=db, analyze_concurrency=1)
+        reports = [name for name in os.listdir(os.path.dirname(db.db_path)) if name.startswith('pipeline_report_')]
+        assert len(reports) == 1
+        # The streaming run never opens the default JobTracker database
+        assert pipeline._database is None
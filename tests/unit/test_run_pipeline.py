@@ -0,0 +1,106 @@
+"""Unit tests for the stage-oriented pipeline runner."""
+
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip('requests')
+pytest.importorskip('bs4')
+
+from run_pipeline import parse_since
+
+
+class TestParseSince:
+    def test_units(self):
+        assert parse_since('12h') == timedelta(hours=12)
+        assert parse_since('3d') == timedelta(days=3)
+        assert parse_since('2w') == timedelta(weeks=2)
+        assert parse_since('30m') == timedelta(minutes=30)
+
+    def test_linkedin_names(self):
+        assert parse_since('day') == timedelta(days=1)
+        assert parse_since('week') == timedelta(weeks=1)
+
+    def test_none_passes_through(self):
+        assert parse_since(None) is None
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_since('yesterday')
+
+
+class _Analyzer:
+    """Candidate with a bachelor's degree and two years of experience"""
+
+    def __init__(self):
+        self.analyzed = []
+
+    def qualification(self):
+        return {'excluded_degrees': ['masters', 'phd'], 'max_experience_years': 2}
+
+    def analyze_job_fit(self, job):
+        self.analyzed.append(job.title)
+        return {'score': 70}
+
+
+DESCRIPTIONS = {
+    'Junior': 'Requirements\n- Bachelor degree is required\n- 1+ years of experience with Python\n' * 5,
+    'Medior': 'Requirements\n- 5+ years of experience with Python and Django\n' * 5,
+    'Research': "Requirements\n- A Master's degree is required\n- Python\n" * 5,
+}
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    from run_pipeline import JobPipeline
+
+    monkeypatch.chdir(tmp_path)
+    pipeline = JobPipeline(db_path=str(tmp_path / 'jobs.db'), concurrency=2)
+    for i, (title, description) in enumerate(DESCRIPTIONS.items()):
+        pipeline.db.add_job({'title': title, 'company': 'Acme', 'url': f'https://x/{i}', 'description': description})
+    yield pipeline
+    pipeline.close()
+
+
+class TestExtractStage:
+    def test_stores_requirements(self, pipeline):
+        assert pipeline.extract() == 3
+        rows = {row['title']: row for row in pipeline.db.conn.execute(
+            'SELECT title, degree_requirement, experience_years, language, requirement_flags FROM jobs')}
+        assert rows['Junior']['degree_requirement'] == 'bachelors'
+        assert rows['Medior']['experience_years'] == 5
+        assert rows['Research']['degree_requirement'] == 'masters'
+        assert rows['Junior']['language'] == 'english'
+        assert rows['Junior']['requirement_flags'] == '[]'
+
+    def test_reruns_only_changed_descriptions(self, pipeline):
+        pipeline.extract()
+        assert pipeline.extract() == 0
+
+        job_id = pipeline.db.conn.execute("SELECT id FROM jobs WHERE title = 'Medior'").fetchone()[0]
+        pipeline.db.update_job_description(job_id, 'Requirements\n- at least 1 years with Python\n' * 5)
+        assert pipeline.db.count_jobs_needing_requirements() == 1
+        assert pipeline.extract() == 1
+        assert pipeline.db.conn.execute('SELECT experience_years FROM jobs WHERE id = ?', (job_id,)).fetchone()[0] == 1
+
+    def test_limit(self, pipeline):
+        assert pipeline.extract(limit=2, batch_size=1) == 2
+        assert pipeline.db.count_jobs_needing_requirements() == 1
+
+    def test_stale_results_are_not_stored(self, pipeline):
+        from run_pipeline import _extract_batch
+
+        rows = [tuple(row) for row in pipeline.db.get_jobs_needing_requirements()]
+        results = _extract_batch(rows)
+        pipeline.db.update_job_description(rows[0][0], 'rewritten while extracting')
+        assert pipeline.db.save_requirements(results) == 2
+
+    def test_analyze_skips_disqualified_jobs(self, pipeline):
+        pipeline._analyzer = _Analyzer()
+        pipeline.extract()
+        assert pipeline.analyze() == 1
+        assert pipeline._analyzer.analyzed == ['Junior']
+        statuses = dict(pipeline.db.conn.execute('SELECT title, status FROM jobs'))
+        assert statuses == {'Junior': 'new', 'Medior': 'skipped', 'Research': 'skipped'}
+        assert pipeline.db.get_statistics()['need_analysis'] == 0
+        assert pipeline.analyze() == 0
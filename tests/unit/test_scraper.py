@@ -1,42 +1,169 @@
 """Unit tests for LinkedInScraper."""
 
+from datetime import datetime
+from pathlib import Path
+
 import pytest
 from scrapers.linkedin_scraper import LinkedInScraper
+from utils.replay_server import ReplayServer
+
+FIXTURES = Path(__file__).parent.parent / 'fixtures' / 'linkedin'
+
+
+@pytest.fixture(scope='module')
+def replay():
+    with ReplayServer(FIXTURES) as server:
+        yield server
 
 
 class TestLinkedInScraper:
+    @pytest.fixture
+    def scraper(self, replay):
+        return LinkedInScraper(base_url=replay.url)
+
     def test_init(self):
         scraper = LinkedInScraper()
         assert scraper.headers is not None
         assert 'User-Agent' in scraper.headers
+        assert scraper.base_url == 'https://www.linkedin.com'
 
-    def test_scrape_returns_list(self):
-        scraper = LinkedInScraper()
+    def test_base_url_from_environment(self, monkeypatch):
+        monkeypatch.setenv('LINKEDIN_BASE_URL', 'http://127.0.0.1:8765/')
+        assert LinkedInScraper().base_url == 'http://127.0.0.1:8765'
+        assert LinkedInScraper(base_url='http://localhost:1').base_url == 'http://localhost:1'
+
+    def test_scrape_returns_list(self, scraper):
         jobs = scraper.scrape_jobs('python developer', 'Netherlands')
         assert isinstance(jobs, list)
+        # 20 cards kept from the first page, one of them a duplicate
+        assert len(jobs) == 19
 
-    def test_scrape_with_time_filter(self):
-        scraper = LinkedInScraper()
+    def test_scrape_with_time_filter(self, scraper, replay):
         jobs = scraper.scrape_jobs('python developer', 'Netherlands', time_filter='week')
         assert isinstance(jobs, list)
+        assert replay.hits[-1][1]['f_TPR'] == 'r604800'
+
+    def test_unknown_query_returns_empty(self, scraper):
+        assert scraper.scrape_jobs('cobol mainframe', 'Netherlands') == []
 
-    def test_scrape_job_structure(self):
+    def test_time_filter_params(self):
         scraper = LinkedInScraper()
+        assert 'f_TPR' not in scraper.search_params('python', 'Netherlands')
+        assert scraper.search_params('python', 'Netherlands', 'week')['f_TPR'] == 'r604800'
+        assert scraper.search_params('python', 'Netherlands', 3600)['f_TPR'] == 'r3600'
+        with pytest.raises(ValueError):
+            scraper.search_params('python', 'Netherlands', 'fortnight')
+
+    def test_scrape_job_structure(self, scraper):
         jobs = scraper.scrape_jobs('python developer', 'Netherlands')
-        if jobs:  # May be empty if LinkedIn blocks
-            job = jobs[0]
-            assert 'title' in job
-            assert 'company' in job
-            assert 'location' in job
-            assert 'url' in job
-            assert 'source' in job
-            assert job['source'] == 'linkedin'
-
-    def test_deduplication(self):
-        scraper = LinkedInScraper()
+        job = jobs[0]
+        assert 'title' in job
+        assert 'company' in job
+        assert 'location' in job
+        assert 'url' in job
+        assert 'source' in job
+        assert job['source'] == 'linkedin'
+        assert job['job_id'] == '4300000222'
+        assert job['posted_at'] == '2025-10-17'
+        assert job['location'].startswith(('Amsterdam', 'Rotterdam', 'Utrecht', 'Eindhoven', 'The Hague', 'Netherlands'))
+        # Stored URLs stay on linkedin.com, whichever host served them
+        assert job['url'].startswith('https://nl.linkedin.com/jobs/view/')
+
+    def test_deduplication(self, scraper):
         jobs = scraper.scrape_jobs('python developer', 'Netherlands')
         keys = set()
         for job in jobs:
             key = f"{job['title']}|{job['company']}".lower()
             assert key not in keys, f"Duplicate found: {key}"
             keys.add(key)
+
+
+def _card_jobs(ids):
+    return [
+        {'title': f'Job {i}', 'company': f'Co {i}', 'location': 'Amsterdam',
+         'url': f'https://www.linkedin.com/jobs/view/{i}', 'job_id': str(i), 'posted_at': f'2025-10-{i % 28 + 1:02d}'}
+        for i in ids
+    ]
+
+
+class TestIncrementalScrape:
+    @pytest.fixture
+    def scraper(self, monkeypatch):
+        scraper = LinkedInScraper()
+        # Newest first, 25 per page: ids 200, 199, ... 101
+        pages = [_card_jobs(range(200 - 25 * p, 175 - 25 * p, -1)) for p in range(4)]
+        scraper.requests = []
+        scraper.failing_pages = set()
+
+        def fetch(url, params, location):
+            scraper.requests.append(params)
+            if params['start'] // 25 in scraper.failing_pages:
+                raise ConnectionError('connection reset')
+            return pages[params['start'] // 25] if params['start'] // 25 < len(pages) else []
+
+        monkeypatch.setattr(scraper, '_fetch_page', fetch)
+        return scraper
+
+    def test_first_run_paginates_to_the_end(self, scraper):
+        jobs, watermark = scraper.scrape_incremental('python', 'Netherlands')
+        assert len(jobs) == 100
+        assert watermark['newest_posting_id'] == 200
+        assert 'f_TPR' not in scraper.requests[0]
+        assert scraper.requests[0]['sortBy'] == 'DD'
+
+    def test_stops_at_known_postings(self, scraper):
+        watermark = {'newest_posting_id': 180, 'newest_posted_at': None, 'last_run_at': datetime.now().isoformat()}
+        jobs, new_watermark = scraper.scrape_incremental('python', 'Netherlands', watermark)
+        assert [int(job['job_id']) for job in jobs] == list(range(200, 180, -1))
+        assert len(scraper.requests) == 1
+        assert new_watermark['newest_posting_id'] == 200
+        # Time filter covers the time since the last run plus slack
+        assert scraper.requests[0]['f_TPR'] == 'r3600'
+
+    def test_nothing_new_keeps_watermark(self, scraper):
+        watermark = {'newest_posting_id': 200, 'newest_posted_at': '2025-10-05', 'last_run_at': datetime.now().isoformat()}
+        jobs, new_watermark = scraper.scrape_incremental('python', 'Netherlands', watermark)
+        assert jobs == []
+        assert new_watermark['newest_posting_id'] == 200
+        assert new_watermark['newest_posted_at'] == '2025-10-05'
+
+    def test_limit_keeps_oldest_and_advances_over_them_only(self, scraper):
+        last_run = datetime.now().isoformat()
+        watermark = {'newest_posting_id': 150, 'newest_posted_at': None, 'last_run_at': last_run}
+        jobs, new_watermark = scraper.scrape_incremental('python', 'Netherlands', watermark, limit=10)
+        assert [int(job['job_id']) for job in jobs] == list(range(160, 150, -1))
+        assert new_watermark['newest_posting_id'] == 160
+        # Postings 161-200 are still newer than the watermark, so the window is not narrowed past them
+        assert new_watermark['last_run_at'] == last_run
+
+    def test_fetch_error_keeps_watermark(self, scraper):
+        last_run = datetime.now().isoformat()
+        watermark = {'newest_posting_id': 150, 'newest_posted_at': None, 'last_run_at': last_run}
+        scraper.failing_pages = {1}
+        jobs, new_watermark = scraper.scrape_incremental('python', 'Netherlands', watermark)
+        assert len(jobs) == 25
+        assert new_watermark['newest_posting_id'] == 150
+        assert new_watermark['last_run_at'] == last_run
+
+    def test_max_pages_exhausted_keeps_watermark(self, scraper):
+        jobs, new_watermark = scraper.scrape_incremental('python', 'Netherlands', max_pages=2)
+        assert len(jobs) == 50
+        assert new_watermark['newest_posting_id'] is None
+        assert new_watermark['last_run_at'] is None
+
+
+class TestIncrementalScrapeReplay:
+    def test_paginates_recorded_pages(self, replay):
+        scraper = LinkedInScraper(base_url=replay.url)
+        jobs, watermark = scraper.scrape_incremental('python developer', 'Netherlands')
+        assert len(jobs) == len({f"{j['title']}|{j['company']}".lower() for j in jobs})
+        assert watermark['pages'] == 3
+        assert watermark['newest_posting_id'] == 4300000160
+
+    def test_second_run_stops_at_watermark(self, replay):
+        scraper = LinkedInScraper(base_url=replay.url)
+        watermark = {'newest_posting_id': 4300000150, 'newest_posted_at': None,
+                     'last_run_at': datetime.now().isoformat()}
+        jobs, _ = scraper.scrape_incremental('python developer', 'Netherlands', watermark)
+        assert all(int(job['job_id']) > 4300000150 for job in jobs)
+        assert replay.hits[-1][1]['start'] == '0'
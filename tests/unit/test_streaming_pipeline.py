@@ -0,0 +1,98 @@
+"""Unit tests for the streaming pipeline."""
+
+import threading
+import time
+
+import pytest
+from streaming_pipeline import Stage, StreamingPipeline
+
+
+class TestStreamingPipeline:
+    def test_items_flow_through_all_stages(self):
+        pipeline = StreamingPipeline([
+            Stage('expand', lambda n: range(n), flat=True),
+            Stage('double', lambda x: x * 2, concurrency=3),
+        ])
+        assert sorted(pipeline.run([2, 3])) == [0, 0, 2, 2, 4]
+        assert pipeline.stats()['expand'] == {'processed': 2, 'emitted': 5, 'errors': 0}
+
+    def test_none_drops_and_errors_are_isolated(self):
+        def check(x):
+            if x == 3:
+                raise ValueError('bad item')
+            return x if x % 2 else None
+
+        stage = Stage('check', check, concurrency=2)
+        results = list(StreamingPipeline([stage]).run(range(6)))
+        assert sorted(results) == [1, 5]
+        assert len(stage.errors) == 1
+        assert stage.errors[0][0] == 3
+
+    def test_failing_source_finishes_fed_items_then_raises(self):
+        def source():
+            yield from range(3)
+            raise ConnectionError('search page failed')
+
+        pipeline = StreamingPipeline([Stage('double', lambda x: x * 2, concurrency=2)])
+        results = []
+        with pytest.raises(ConnectionError):
+            for item in pipeline.run(source()):
+                results.append(item)
+        assert sorted(results) == [0, 2, 4]
+        assert isinstance(pipeline.source_error, ConnectionError)
+
+    def test_first_result_arrives_before_source_is_exhausted(self):
+        produced = []
+
+        def source():
+            for i in range(5):
+                produced.append(i)
+                yield i
+                time.sleep(0.05)
+
+        results = StreamingPipeline([Stage('slow', lambda x: x)]).run(source())
+        assert next(results) == 0
+        assert len(produced) < 5
+        assert list(results) == [1, 2, 3, 4]
+
+    def test_stage_concurrency_overlaps_work(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def work(x):
+            with lock:
+                active.append(x)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(x)
+            return x
+
+        start = time.monotonic()
+        list(StreamingPipeline([Stage('work', work, concurrency=4)]).run(range(8)))
+        assert max(peak) == 4
+        assert time.monotonic() - start < 0.35
+
+    def test_bounded_queues_apply_backpressure(self):
+        produced = []
+        release = threading.Event()
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        def blocked(x):
+            release.wait()
+            return x
+
+        results = StreamingPipeline([Stage('blocked', blocked)], maxsize=4).run(source())
+        consumer = threading.Thread(target=lambda: list(results))
+        consumer.start()
+        time.sleep(0.1)
+        # One item in the stage plus one full queue; the source is held back
+        assert len(produced) <= 6
+        release.set()
+        consumer.join()
+        assert len(produced) == 100
@@ -0,0 +1,184 @@
+"""Unit tests for the durable task queue and worker."""
+
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+from database.enhanced_database import JobDatabase
+from database.task_queue import TaskQueue
+from worker import Worker
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+def _add_jobs(db, count):
+    db.writer.executemany(
+        'INSERT INTO jobs (title, company, url) VALUES (?, ?, ?)',
+        [(f'Engineer {i}', f'Company {i}', f'u{i}') for i in range(count)]
+    ).result()
+
+
+class TestTaskQueue:
+    def test_enqueue_is_idempotent_while_active(self, db):
+        _add_jobs(db, 2)
+        assert len(db.tasks.enqueue_many('analyze', [1, 2])) == 2
+        assert db.tasks.enqueue_many('analyze', [1, 2]) == []
+        # A different task type for the same job is a separate task
+        assert db.tasks.enqueue('enrich', 1) is not None
+
+    def test_unknown_task_type_rejected(self, db):
+        with pytest.raises(ValueError):
+            db.tasks.enqueue('scrape', 1)
+
+    def test_claim_orders_by_priority_then_age(self, db):
+        _add_jobs(db, 3)
+        db.tasks.enqueue('analyze', 1)
+        db.tasks.enqueue('analyze', 2, priority=5)
+        db.tasks.enqueue('analyze', 3)
+        claimed = [db.tasks.claim('w')['job_id'] for _ in range(3)]
+        assert claimed == [2, 1, 3]
+        assert db.tasks.claim('w') is None
+
+    def test_database_queue_writes_through_the_writer(self, db):
+        _add_jobs(db, 1)
+        commits = db.writer.commits
+        db.tasks.enqueue('analyze', 1)
+        task = db.tasks.claim('w')
+        assert db.tasks.complete(task['id'], 'w')
+        assert db.writer.commits == commits + 3
+        assert db.tasks.stats() == {'done': 1}
+
+    def test_claim_filters_by_type(self, db):
+        _add_jobs(db, 1)
+        db.tasks.enqueue('enrich', 1)
+        assert db.tasks.claim('w', ['analyze']) is None
+        assert db.tasks.claim('w', ['enrich'])['task_type'] == 'enrich'
+
+    def test_failure_retries_with_backoff_then_gives_up(self, db):
+        _add_jobs(db, 1)
+        queue = TaskQueue(db.db_path, retry_backoff=0)
+        queue.enqueue('analyze', 1, max_attempts=2)
+
+        task = queue.claim('w')
+        assert queue.fail(task['id'], 'w', 'boom')
+        assert queue.stats() == {'queued': 1}
+
+        task = queue.claim('w')
+        assert task['attempts'] == 2
+        queue.fail(task['id'], 'w', 'boom again')
+        assert queue.stats() == {'failed': 1}
+        assert queue.recent_errors()[0]['last_error'] == 'boom again'
+        queue.close()
+
+    def test_expired_lease_is_reclaimed_by_another_worker(self, db):
+        _add_jobs(db, 1)
+        queue = TaskQueue(db.db_path, lease_seconds=0.05)
+        queue.enqueue('analyze', 1)
+        task = queue.claim('crashed')
+        time.sleep(0.1)
+
+        reclaimed = queue.claim('survivor')
+        assert reclaimed['id'] == task['id']
+        assert reclaimed['attempts'] == 2
+        # The original owner can no longer settle it
+        assert not queue.heartbeat(task['id'], 'crashed')
+        assert not queue.complete(task['id'], 'crashed')
+        assert queue.complete(task['id'], 'survivor')
+        queue.close()
+
+    def test_expired_lease_gives_up_after_max_attempts(self, db):
+        _add_jobs(db, 1)
+        queue = TaskQueue(db.db_path, lease_seconds=0.05)
+        task_id = queue.enqueue('analyze', 1, max_attempts=1)
+        queue.claim('crashed')
+        time.sleep(0.1)
+        assert queue.claim('survivor') is None
+        row = queue.conn.execute('SELECT status, finished_at FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        assert row['status'] == 'failed'
+        assert row['finished_at'] is not None
+        queue.close()
+
+    def test_heartbeat_extends_lease(self, db):
+        _add_jobs(db, 1)
+        queue = TaskQueue(db.db_path, lease_seconds=0.2)
+        queue.enqueue('analyze', 1)
+        task = queue.claim('w')
+        for _ in range(3):
+            time.sleep(0.1)
+            assert queue.heartbeat(task['id'], 'w')
+        assert queue.claim('other') is None
+        queue.close()
+
+    def test_cancel_only_affects_queued(self, db):
+        _add_jobs(db, 2)
+        db.tasks.enqueue_many('analyze', [1, 2])
+        db.tasks.claim('w')
+        assert db.tasks.cancel('analyze') == 1
+        assert db.tasks.stats('analyze') == {'running': 1, 'cancelled': 1}
+
+    def test_each_task_claimed_once_across_queues(self, db):
+        _add_jobs(db, 50)
+        db.tasks.enqueue_many('analyze', range(1, 51))
+        claimed = []
+        lock = threading.Lock()
+
+        def consume(name):
+            queue = TaskQueue(db.db_path)
+            while (task := queue.claim(name)) is not None:
+                with lock:
+                    claimed.append(task['id'])
+            queue.close()
+
+        threads = [threading.Thread(target=consume, args=(f'w{i}',)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(claimed) == list(range(1, 51))
+
+
+class TestWorker:
+    def test_worker_runs_handlers_and_settles_tasks(self, db):
+        _add_jobs(db, 3)
+        db.tasks.enqueue_many('analyze', [1, 2, 3])
+        seen = []
+
+        def analyze(task):
+            if task['job_id'] == 2:
+                raise RuntimeError('api down')
+            seen.append(task['job_id'])
+            return {'score': 80}
+
+        worker = Worker(db, {'analyze': analyze}, task_types=['analyze'], poll_interval=0)
+        assert worker.run(exit_when_idle=True) == 3
+        assert seen == [1, 3]
+        counts = db.tasks.stats('analyze')
+        assert counts['done'] == 2
+        assert counts['queued'] == 1  # retry scheduled after backoff
+        assert db.tasks.live_workers() == []
+
+    def test_worker_requires_handlers_for_its_types(self, db):
+        with pytest.raises(ValueError):
+            Worker(db, {'analyze': lambda task: None}, task_types=['enrich'])
+
+    def test_live_workers_while_running(self, db):
+        worker = Worker(db, {'analyze': lambda task: None}, task_types=['analyze'], poll_interval=0.01)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        try:
+            deadline = time.time() + 2
+            while not db.tasks.live_workers('analyze') and time.time() < deadline:
+                time.sleep(0.01)
+            assert db.tasks.live_workers('analyze')
+            assert db.tasks.live_workers('enrich') == []
+        finally:
+            worker.stop()
+            thread.join()
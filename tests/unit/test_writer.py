@@ -0,0 +1,129 @@
+"""Unit tests for the single-writer database queue."""
+
+import os
+import sqlite3
+import tempfile
+import threading
+
+import pytest
+from database.enhanced_database import JobDatabase
+from database.writer import DatabaseWriter, Execute
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = JobDatabase(db_path=os.path.join(tmpdir, 'test.db'))
+        yield database
+        database.close()
+
+
+def _job(i):
+    return {
+        'title': f'Engineer {i}',
+        'company': f'Company {i}',
+        'location': 'Amsterdam',
+        'url': f'https://www.linkedin.com/jobs/view/{i}',
+        'description': 'x' * 200,
+    }
+
+
+class TestDatabaseWriter:
+    def test_results_come_back_through_futures(self, db):
+        result = db.writer.execute(
+            "INSERT INTO jobs (title, company, url) VALUES ('A', 'B', 'u1')"
+        ).result()
+        assert result.lastrowid == 1
+        assert result.rowcount == 1
+        assert db.writer.transaction(lambda conn: conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]).result() == 1
+
+    def test_failed_command_does_not_poison_batch(self, db):
+        ok = db.writer.execute("INSERT INTO jobs (title, company, url) VALUES ('A', 'B', 'u1')")
+        bad = db.writer.execute("INSERT INTO jobs (title, company, url) VALUES ('A', 'B', 'u1')")
+        also_ok = db.writer.execute("INSERT INTO jobs (title, company, url) VALUES ('C', 'D', 'u2')")
+        assert ok.result().rowcount == 1
+        with pytest.raises(sqlite3.IntegrityError):
+            bad.result()
+        assert also_ok.result().rowcount == 1
+        assert db.conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 2
+
+    def test_concurrent_writes_are_group_committed(self, db):
+        threads = [
+            threading.Thread(target=lambda i=i: db.add_job(_job(i)))
+            for i in range(50)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert db.get_statistics()['total'] == 50
+        assert db.writer.commits < 50
+
+    def test_async_update_is_visible_after_flush(self, db):
+        job_id = db.add_job(_job(1))
+        future = db.update_analysis(job_id, {'score': 88, 'strengths': ['Python']}, wait=False)
+        db.writer.flush()
+        assert future.done()
+        assert db.conn.execute('SELECT ai_score FROM jobs WHERE id = ?', (job_id,)).fetchone()[0] == 88
+
+    def test_reader_connection_is_read_only(self, db):
+        with pytest.raises(sqlite3.OperationalError):
+            db.conn.execute("INSERT INTO jobs (title, company, url) VALUES ('A', 'B', 'u1')")
+
+    def test_job_ids_match_whole_path_segments(self, db):
+        assert db.add_job(_job(10)) is not None
+        assert db.add_job(_job(1)) is not None
+        assert db.add_job(dict(_job(2), url='https://www.linkedin.com/jobs/view/10?trk=feed')) is None
+        db.writer.execute("INSERT INTO jobs (title, company, url) VALUES ('Old', 'Row', 'https://example.com/jobs/77/?ref=x')").result()
+        assert db.add_job(dict(_job(3), url='https://example.com/jobs/77')) is None
+        assert db.add_job(dict(_job(4), url='https://example.com/jobs/7')) is not None
+
+    def test_ui_write_helpers(self, db):
+        first, second = db.add_job(_job(1)), db.add_job(_job(2))
+        db.mark_applied([first, second])
+        db.update_response_type(first, 'Interview')
+        db.update_notes(second, 'Call back Monday')
+        db.update_status(second, 'skipped')
+        rows = db.conn.execute('SELECT status, applied_at, response_type, notes FROM jobs ORDER BY id').fetchall()
+        assert rows[0]['status'] == 'applied' and rows[0]['applied_at']
+        assert rows[0]['response_type'] == 'Interview'
+        assert (rows[1]['status'], rows[1]['notes']) == ('skipped', 'Call back Monday')
+        db.clear_jobs()
+        assert db.get_statistics()['total'] == 0
+
+    def test_close_commits_pending_work(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'test.db')
+            JobDatabase(db_path=path).close()
+            writer = DatabaseWriter(path, batch_ms=1000)
+            futures = [writer.submit(Execute(
+                'INSERT INTO jobs (title, company, url) VALUES (?, ?, ?)', ('T', 'C', f'u{i}')
+            )) for i in range(10)]
+            writer.close()
+            assert all(f.done() for f in futures)
+            assert sqlite3.connect(path).execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 10
+
+    def test_connect_failure_fails_every_submission(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer = DatabaseWriter(os.path.join(tmpdir, 'missing', 'test.db'))
+            first = writer.execute("INSERT INTO jobs (title, company, url) VALUES ('A', 'B', 'u1')")
+            with pytest.raises(sqlite3.OperationalError):
+                first.result(timeout=5)
+            with pytest.raises(sqlite3.OperationalError):
+                writer.flush(timeout=5)
+            writer.close()
+
+    def test_dead_writer_fails_pending_futures(self, db):
+        def release_savepoint(conn):
+            conn.execute('RELEASE write_command')
+            raise ValueError('rolled back past its savepoint')
+
+        # The failed ROLLBACK TO kills the writer thread
+        broken = db.writer.transaction(release_savepoint)
+        queued = db.writer.execute("INSERT INTO jobs (title, company, url) VALUES ('A', 'B', 'u1')")
+        with pytest.raises(sqlite3.OperationalError):
+            broken.result(timeout=5)
+        with pytest.raises(sqlite3.OperationalError):
+            queued.result(timeout=5)
+        with pytest.raises(sqlite3.OperationalError):
+            db.writer.execute("INSERT INTO jobs (title, company, url) VALUES ('C', 'D', 'u2')").result(timeout=5)
@@ -19,16 +19,17 @@ from scrapers.apply_link_extractor import ApplyLinkExtractor
 
 
 from database.enhanced_database import JobDatabase
+from database.fts import to_html
+from database.rows import JOB_CARD_FIELDS
 from analyzers.analyzer_ai import AIJobAnalyzer
+from company_research import CompanyResearch, company_context
 from scrapers.linkedin_scraper import LinkedInScraper
 from scrapers.smart_description_enricher import SmartDescriptionEnricher
 
 def apply_with_feedback(db, job_id):
     """Apply to job with visual feedback"""
     with st.spinner("Submitting application..."):
-        db.conn.execute("UPDATE jobs SET status = 'applied', applied_at = ? WHERE id = ?", 
-                       (datetime.now().isoformat(), job_id))
-        db.conn.commit()
+        db.mark_applied([job_id])
         st.success("✅ Applied successfully!")
         st.balloons()
         
@@ -53,6 +54,70 @@ def init_components():
 def get_apply_extractor():
     return ApplyLinkExtractor()
 
+# st.fragment reruns only the decorated function on its own timer (Streamlit >= 1.37)
+fragment = getattr(st, 'fragment', None) or st.experimental_fragment
+
+@fragment(run_every=2)
+def analysis_progress():
+    """Progress widget for background analysis; polls in-memory counters, never the DB"""
+    analysis_status = BackgroundAnalyzer.get_status()
+    if not analysis_status['running']:
+        # One full-page rerun when a run finishes so the new scores show up
+        if st.session_state.pop('analysis_was_running', False):
+            st.rerun()
+        return
+    
+    st.session_state['analysis_was_running'] = True
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        if analysis_status['total'] > 0:
+            progress = analysis_status['current'] / analysis_status['total']
+            st.progress(progress)
+            st.caption(f"Analyzing job {analysis_status['current']} of {analysis_status['total']}")
+            if analysis_status['failed']:
+                st.caption(f"⚠️ {analysis_status['failed']} failed")
+    
+    with col2:
+        if analysis_status['start_time']:
+            elapsed = (datetime.now() - analysis_status['start_time']).seconds
+            st.metric("Time", f"{elapsed}s")
+    
+    with col3:
+        if st.button("❌ Cancel"):
+            BackgroundAnalyzer.cancel_analysis(db)
+
+TOP_MATCHES_PAGE_SIZE = 10
+ALL_JOBS_PAGE_SIZE = 200
+# Top Matches filters: statuses shown per Status choice, get_jobs_page order per Sort By choice
+STATUS_FILTERS = {
+    'All': None,
+    'New': ('new',),
+    'Applied': ('applied',),
+    'Interview': ('interview_scheduled', 'interviewed'),
+    'Rejected': ('rejected',),
+}
+SORT_ORDERS = {'Score': 'score', 'Date': 'date', 'Company': 'company'}
+
+def keyset_pager(key, fetch_page, page_size):
+    """Render prev/next controls for a keyset-paginated query and return the current page"""
+    # Stack of cursors: the last one is the start of the page being shown
+    stack = st.session_state.setdefault(f'pager_{key}', [None])
+    rows, next_cursor = fetch_page(stack[-1], page_size)
+    
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("◀ Previous", key=f'prev_{key}', disabled=len(stack) == 1, use_container_width=True):
+            stack.pop()
+            st.rerun()
+    with page_col:
+        st.caption(f"Page {len(stack)}")
+    with next_col:
+        if st.button("Next ▶", key=f'next_{key}', disabled=next_cursor is None, use_container_width=True):
+            stack.append(next_cursor)
+            st.rerun()
+    return rows
+
 components = init_components()
 db = components['db']
 analyzer = components['analyzer']
@@ -165,7 +230,7 @@ st.markdown("""
 # Sidebar - Control Center
 with st.sidebar:
     st.title("🎯 Job Search")
-    stats = db.get_statistics()
+    stats = db.cached(db.get_statistics)
     
     # Define these OUTSIDE the expander
     search_terms = st.text_area("Keywords", value="Python Developer", height=60)
@@ -198,24 +263,18 @@ with st.sidebar:
     
     with st.expander("Advanced Actions"):
         if st.button("🔄 Enrich Descriptions"):
-            jobs_to_enrich = db.get_jobs_needing_description(20)
+            jobs_to_enrich = db.get_jobs_needing_description(20, fields=('id',))
             if not jobs_to_enrich:
                 st.info("All jobs already enriched!")
             else:
-                progress = st.progress(0)
-                for i, job in enumerate(jobs_to_enrich):
-                    progress.progress((i+1)/len(jobs_to_enrich))
-                    desc = enricher.fetch_with_retry(job['url'])
-                    if desc:
-                        db.update_job_description(job['id'], desc)
-                st.success(f"Enriched {len(jobs_to_enrich)} jobs!")
+                # Picked up by `python main.py worker`; enriched jobs are queued for analysis
+                queued = db.tasks.enqueue_many('enrich', [job.id for job in jobs_to_enrich])
+                st.success(f"Queued {len(queued)} jobs for enrichment")
 
         if st.button("🧠 Analyze All"):
             success, message = BackgroundAnalyzer.analyze_jobs_async(db, analyzer)
             if success:
                 st.success(message)
-                time.sleep(1)
-                st.rerun()
             else:
                 st.info(message)
 
@@ -233,36 +292,14 @@ with st.sidebar:
         # Check confirmation outside the button
         if st.session_state.get("confirm_delete", False):
             if st.button("⚠️ Yes, DELETE ALL", type="secondary"):
-                db.conn.execute("DELETE FROM jobs")
-                db.conn.commit()
+                db.clear_jobs()
                 st.success("Database cleared!")
                 st.session_state["confirm_delete"] = False
                 st.rerun()
                 
-         # Add this right after the sidebar, before the tabs:
-        analysis_status = BackgroundAnalyzer.get_status()
-        if analysis_status['running']:
-            col1, col2, col3 = st.columns([2, 1, 1])
-            
-            with col1:
-                if analysis_status['total'] > 0:
-                    progress = analysis_status['current'] / analysis_status['total']
-                    st.progress(progress)
-                    st.caption(f"Analyzing job {analysis_status['current']} of {analysis_status['total']}")
-            
-            with col2:
-                if analysis_status['start_time']:
-                    elapsed = (datetime.now() - analysis_status['start_time']).seconds
-                    st.metric("Time", f"{elapsed}s")
-            
-            with col3:
-                if st.button("❌ Cancel"):
-                    BackgroundAnalyzer.cancel_analysis()
-                    st.rerun()
-            
-            # Auto-refresh every 2 seconds
-            time.sleep(2)
-            st.rerun()
+        BackgroundAnalyzer.resume(db, analyzer)
+        analysis_progress()
+
 # Main Content Area
 st.title("🚀 AI Job Search Platform")
 
@@ -284,12 +321,19 @@ with tab1:
     with col1:
         min_score = st.slider("Minimum Score", 0, 100, 70)
     with col2:
-        status_filter = st.selectbox("Status", ["All", "New", "Applied", "Interview", "Rejected"])
+        status_filter = st.selectbox("Status", list(STATUS_FILTERS))
     with col3:
-        sort_by = st.selectbox("Sort By", ["Score", "Date", "Company"])
+        sort_by = st.selectbox("Sort By", list(SORT_ORDERS))
     
-    # Get filtered jobs
-    jobs = db.get_jobs_by_score(min_score)
+    # Get one page of filtered jobs (pager resets when a filter or the sort order changes)
+    jobs = keyset_pager(
+        f'top_{min_score}_{status_filter}_{sort_by}',
+        lambda after, limit: db.cached(
+            db.get_jobs_page, after, limit, min_score=min_score, fields=JOB_CARD_FIELDS,
+            statuses=STATUS_FILTERS[status_filter], order=SORT_ORDERS[sort_by]
+        ),
+        TOP_MATCHES_PAGE_SIZE
+    )
     
     
     if not jobs:
@@ -381,11 +425,7 @@ with tab1:
                                     result = extractor.get_apply_link(job['url'])
                                     
                                     if result:
-                                        db.conn.execute(
-                                            "UPDATE jobs SET application_link = ? WHERE id = ?",
-                                            (result, job['id'])
-                                        )
-                                        db.conn.commit()
+                                        db.update_apply_link(job['id'], result)
                                         st.success(f"Found: {result[:50] if len(result) > 50 else result}")
                                         time.sleep(1)
                                         st.rerun()
@@ -403,11 +443,7 @@ with tab1:
 
                     if apply_link:  # Show mark applied button if we have any apply method (ONLY ONCE!)
                         if st.button("✅ Mark Applied", key=f"mark_{job['id']}", use_container_width=True):
-                            db.conn.execute(
-                                "UPDATE jobs SET status = 'applied', applied_at = ? WHERE id = ?",
-                                (datetime.now().isoformat(), job['id'])
-                            )
-                            db.conn.commit()
+                            db.mark_applied([job['id']])
                             st.success("Marked as applied!")
                             time.sleep(0.5)
                             st.rerun()
@@ -426,7 +462,8 @@ with tab1:
                                 'recommendation': job.get('ai_recommendation', '')
                             }
                             
-                            cover = analyzer.generate_cover_letter(job, analysis)
+                            company = CompanyResearch(db, analyzer).ensure([job['company_id']]).get(job['company_id'])
+                            cover = analyzer.generate_cover_letter(job, analysis, company_context(company))
                             
                             st.text_area(
                                 "Generated Cover Letter",
@@ -454,8 +491,7 @@ with tab1:
                             st.session_state[f'show_job_{job["id"]}'] = True
                         
                         if st.button("❌ Not Interested", key=f"skip_{job['id']}", use_container_width=True):
-                            db.conn.execute("UPDATE jobs SET status = 'skipped' WHERE id = ?", (job['id'],))
-                            db.conn.commit()
+                            db.update_status(job['id'], 'skipped')
                             st.rerun()
                 
                 # Show cover letter if it's in session state
@@ -480,29 +516,40 @@ with tab2:
     with col2:
         if st.button("Bulk Apply Selected"):
             if 'bulk_select' in st.session_state:
-                for job_id in st.session_state['bulk_select']:
-                    db.conn.execute(
-                        "UPDATE jobs SET status = 'applied', applied_at = ? WHERE id = ?",
-                        (datetime.now().isoformat(), job_id[0])
-                    )
-                db.conn.commit()
+                db.mark_applied([row[0] for row in st.session_state['bulk_select']])
                 st.success(f"Applied to {len(st.session_state['bulk_select'])} jobs!")
     
+    # Full-text search (ranked, prefix matching)
+    search_query = st.text_input("🔎 Search jobs", placeholder="e.g. python backend amsterdam")
+    if search_query:
+        results = db.cached(db.search_jobs, search_query, limit=50)
+        st.caption(f"{len(results)} matching jobs")
+        for result in results:
+            st.markdown(
+                f"**#{result['id']}** {to_html(result['title'])} · {to_html(result['company'])}<br>"
+                f"<span style='color: #94a3b8;'>{to_html(result['snippet'])}</span>",
+                unsafe_allow_html=True
+            )
+        st.divider()
+    
     # Job table
-    jobs_df = pd.DataFrame(db.conn.execute(
-        "SELECT title, company, location, ai_score, status, scraped_at FROM jobs ORDER BY ai_score DESC"
-    ).fetchall())
+    page = keyset_pager(
+        'all_jobs',
+        lambda after, limit: db.cached(db.get_jobs_page, after, limit),
+        ALL_JOBS_PAGE_SIZE
+    )
+    jobs_df = pd.DataFrame(
+        [(job.title, job.company, job.location, job.ai_score, job.status, job.scraped_at) for job in page],
+        columns=['Title', 'Company', 'Location', 'Score', 'Status', 'Scraped']
+    )
     
     if not jobs_df.empty:
-        jobs_df.columns = ['Title', 'Company', 'Location', 'Score', 'Status', 'Scraped']
         st.dataframe(jobs_df, use_container_width=True, height=600)
 
 with tab3:
     st.header("Application Tracker")
     
-    applied_jobs = db.conn.execute(
-        "SELECT * FROM jobs WHERE status = 'applied' ORDER BY applied_at DESC"
-    ).fetchall()
+    applied_jobs = db.get_applied_jobs()
     
     if applied_jobs:
         for job in applied_jobs:
@@ -519,11 +566,7 @@ with tab3:
                     key=f"response_{job['id']}"
                 )
                 if st.button("Update", key=f"update_{job['id']}"):
-                    db.conn.execute(
-                        "UPDATE jobs SET response_type = ? WHERE id = ?",
-                        (response, job['id'])
-                    )
-                    db.conn.commit()
+                    db.update_response_type(job['id'], response)
             
             with col3:
                 if st.button("Add Note", key=f"note_{job['id']}"):
@@ -532,11 +575,7 @@ with tab3:
             if st.session_state.get(f'show_note_{job["id"]}'):
                 note = st.text_area("Note", key=f"note_text_{job['id']}")
                 if st.button("Save Note", key=f"save_note_{job['id']}"):
-                    db.conn.execute(
-                        "UPDATE jobs SET notes = ? WHERE id = ?",
-                        (note, job['id'])
-                    )
-                    db.conn.commit()
+                    db.update_notes(job['id'], note)
                     st.success("Note saved!")
             
             st.divider()
@@ -561,9 +600,9 @@ with tab4:
             with st.spinner("Thinking..."):
                 # Get context about jobs
                 context = {
-                    'total_jobs': db.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0],
-                    'top_matches': db.get_jobs_by_score(80),
-                    'applied': db.conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'applied'").fetchone()[0]
+                    'total_jobs': stats['total'],
+                    'top_matches': db.cached(db.get_jobs_by_score, 80, fields=('title', 'company', 'ai_score')),
+                    'applied': stats['applied']
                 }
                 
                 # Generate response using Claude
@@ -574,32 +613,29 @@ with tab4:
 with tab5:
     st.header("Analytics Dashboard")
     
+    analytics = db.cached(db.get_analytics)
+    
     # Metrics row
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        avg_score = db.conn.execute("SELECT AVG(ai_score) FROM jobs WHERE ai_score IS NOT NULL").fetchone()[0]
+        avg_score = analytics['avg_score']
         st.metric("Average Match Score", f"{avg_score:.1f}" if avg_score else "N/A")
     
     with col2:
-        high_matches = db.conn.execute("SELECT COUNT(*) FROM jobs WHERE ai_score >= 80").fetchone()[0]
-        st.metric("High Matches (80+)", high_matches)
+        st.metric("High Matches (80+)", analytics['high_matches'])
     
     with col3:
-        response_rate = db.conn.execute(
-            "SELECT COUNT(*) * 100.0 / COUNT(*) FROM jobs WHERE status = 'applied' AND response_type IS NOT NULL"
-        ).fetchone()[0]
+        response_rate = analytics['response_rate']
         st.metric("Response Rate", f"{response_rate:.1f}%" if response_rate else "0%")
     
     with col4:
-        interviews = db.conn.execute("SELECT COUNT(*) FROM jobs WHERE response_type = 'Interview'").fetchone()[0]
-        st.metric("Interviews", interviews)
+        st.metric("Interviews", analytics['interviews'])
     
     # Charts
     st.subheader("Score Distribution")
-    scores = db.conn.execute("SELECT ai_score FROM jobs WHERE ai_score IS NOT NULL").fetchall()
+    scores = analytics['scores']
     if scores:
-        import pandas as pd
         df = pd.DataFrame(scores, columns=['Score'])
         st.bar_chart(df['Score'].value_counts().sort_index())
 
@@ -616,16 +652,16 @@ with tab6:
     # Create and display map
     try:
         job_map = create_job_map(db)
-        map_data = st_folium(job_map, width=900, height=600)
+        # Only marker clicks come back to the app, so panning and zooming don't rerun the script
+        map_data = st_folium(job_map, width=900, height=600, returned_objects=['last_object_clicked_tooltip'])
         
         # If a location was clicked, offer to filter jobs
-        if map_data['last_object_clicked']:
-            clicked_popup = map_data['last_object_clicked'].get('popup', '')
-            if clicked_popup:
-                city_name = clicked_popup.split('<b>')[1].split('</b>')[0]
-                if st.button(f"Filter jobs in {city_name}"):
-                    st.session_state['location_filter'] = city_name
-                    st.rerun()
+        clicked_tooltip = map_data.get('last_object_clicked_tooltip')
+        if clicked_tooltip:
+            city_name = clicked_tooltip.split(':')[0]
+            if st.button(f"Filter jobs in {city_name}"):
+                st.session_state['location_filter'] = city_name
+                st.rerun()
     except Exception as e:
         st.error(f"Error loading map: {e}")
 
@@ -1,83 +1,113 @@
-import streamlit as st
 from datetime import datetime
 import threading
 import time
 
+from worker import TaskHandlers, Worker
+
 class BackgroundAnalyzer:
+    """Enqueues analysis tasks and mirrors their progress into memory for the UI.
+
+    The work itself lives in the durable task queue, so it survives UI restarts and
+    is shared with any `python main.py worker` processes. When no worker is alive,
+    tasks are consumed in-process so the button still works on its own.
+    """
     # Class-level storage that persists across reruns
     _analysis_state = {
         'running': False,
         'current': 0,
         'total': 0,
         'start_time': None,
-        'errors': []
+        'failed': 0
     }
     _lock = threading.Lock()
-    
+    POLL_SECONDS = 2
+
     @classmethod
     def get_status(cls):
         """Thread-safe status getter"""
         with cls._lock:
             return cls._analysis_state.copy()
-    
+
     @classmethod
     def analyze_jobs_async(cls, db, analyzer):
-        """Run analysis without blocking the UI"""
-        
+        """Queue every unanalyzed job and track the batch without blocking the UI"""
+
         # Check if already running
         with cls._lock:
             if cls._analysis_state['running']:
                 return False, "Analysis already running"
-        
-        # Get jobs needing analysis
-        jobs = db.get_jobs_for_analysis()
-        
+
+        # Get jobs needing analysis, after skipping those their stored requirements rule out
+        qualification = analyzer.qualification()
+        db.skip_unqualified(**qualification)
+        jobs = db.get_jobs_for_analysis(fields=('id',), qualification=qualification)
+
         if not jobs:
             return False, "No jobs need analysis"
-        
-        # Initialize state
+
+        task_ids = db.tasks.enqueue_many('analyze', [job.id for job in jobs])
+        if not task_ids:
+            return False, "All jobs are already queued for analysis"
+
+        cls._observe(db, analyzer, min(task_ids))
+        return True, f"Queued {len(task_ids)} jobs for analysis"
+
+    @classmethod
+    def resume(cls, db, analyzer):
+        """Re-attach to analysis tasks left queued by a previous UI process"""
+        if cls.get_status()['running']:
+            return
+        first_task_id = db.tasks.first_active_id('analyze')
+        if first_task_id is not None:
+            cls._observe(db, analyzer, first_task_id)
+
+    @classmethod
+    def _observe(cls, db, analyzer, first_task_id):
+        """Poll queue counters for tasks >= first_task_id into the in-memory state"""
         with cls._lock:
+            if cls._analysis_state['running']:
+                return
             cls._analysis_state = {
                 'running': True,
                 'current': 0,
-                'total': len(jobs),
+                'total': 0,
                 'start_time': datetime.now(),
-                'errors': []
+                'failed': 0
             }
-        
-        def run_analysis():
+
+        def observe():
             """This runs in background thread"""
-            for i, job in enumerate(jobs):
-                # Check if cancelled
+            local_worker = None
+            while True:
+                counts = db.tasks.stats('analyze', since_id=first_task_id)
+                pending = counts.get('queued', 0) + counts.get('running', 0)
                 with cls._lock:
                     if not cls._analysis_state['running']:
                         break
-                    cls._analysis_state['current'] = i + 1
-                
-                try:
-                    # Analyze job
-                    analysis = analyzer.analyze_job_fit(job)
-                    db.update_analysis(job['id'], analysis)
-                    
-                except Exception as e:
-                    with cls._lock:
-                        cls._analysis_state['errors'].append({
-                            'job': job.get('title', 'Unknown'),
-                            'error': str(e)
-                        })
-            
+                    cls._analysis_state['total'] = sum(counts.values())
+                    cls._analysis_state['current'] = cls._analysis_state['total'] - pending
+                    cls._analysis_state['failed'] = counts.get('failed', 0)
+                if not pending:
+                    break
+
+                if db.tasks.live_workers('analyze'):
+                    time.sleep(cls.POLL_SECONDS)
+                else:
+                    if local_worker is None:
+                        local_worker = Worker(db, TaskHandlers(db, analyzer).as_dict(), task_types=['analyze'])
+                    if not local_worker.run_one():
+                        time.sleep(cls.POLL_SECONDS)
+
             # Mark complete
             with cls._lock:
                 cls._analysis_state['running'] = False
-        
-        # Start background thread
-        thread = threading.Thread(target=run_analysis, daemon=True)
+
+        thread = threading.Thread(target=observe, daemon=True)
         thread.start()
-        
-        return True, f"Started analyzing {len(jobs)} jobs"
-    
+
     @classmethod
-    def cancel_analysis(cls):
-        """Cancel running analysis"""
+    def cancel_analysis(cls, db):
+        """Cancel running analysis; tasks already claimed by a worker still finish"""
+        db.tasks.cancel('analyze')
         with cls._lock:
-            cls._analysis_state['running'] = False
\ No newline at end of file
+            cls._analysis_state['running'] = False